@@ -1,10 +1,18 @@
-from fastapi import APIRouter, UploadFile, WebSocket, HTTPException, Form, File
+from fastapi import APIRouter, UploadFile, WebSocket, WebSocketDisconnect, HTTPException, Form, File, Request, Query
+from fastapi.responses import Response, StreamingResponse
 from ...services.audio.task_manager import AudioTaskManager
-from ...schemas.audio import AudioAnalysisRequest, AudioAnalysisResponse, AudioFeatureType
+from ...services.audio.upload import UploadSink
+from ...services.audio.streaming import PCMDecoder, StreamingFeatureExtractor
+from ...services.audio.broadcast import encode_message
+from ...services.audio.feature_table import TABLE_MEDIA_TYPES, arrow_available, is_feature_path, iter_table_bytes
+from ...schemas.audio import AudioAnalysisRequest, AudioAnalysisResponse, AudioChunk, AudioFeatureType, AudioStatusPage, TaskPriority
+from ...core.config import settings
+from typing import List, Literal, Optional
+import asyncio
 import os
 import json
+import uuid
 from tempfile import NamedTemporaryFile
-import shutil
 import logging
 
 router = APIRouter()
@@ -18,38 +26,36 @@ os.makedirs(UPLOAD_DIR, exist_ok=True)
 async def analyze_audio(
     file: UploadFile = File(...),
     feature_types: str = Form(...),
-    chunk_duration: float = Form(60.0)
+    chunk_duration: float = Form(60.0),
+    priority: TaskPriority = Form(TaskPriority.NORMAL),
+    align_to_pauses: bool = Form(False)
 ):
     """
     Upload and analyze an audio file.
     The analysis will be performed in chunks of 1 minute each, and results will be streamed via WebSocket.
+    With `align_to_pauses`, chunk boundaries are moved to the nearest pause in speech.
     """
     try:
         logger.info(f"Received analysis request for file: {file.filename}")
         logger.info(f"Feature types: {feature_types}")
         
-        # Parse feature types from JSON string
-        try:
-            feature_types_list = [AudioFeatureType(ft) for ft in json.loads(feature_types)]
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON for feature_types: {feature_types}")
-            raise HTTPException(status_code=422, detail=f"Invalid feature types format: {str(e)}")
-        except ValueError as e:
-            logger.error(f"Invalid feature type value: {str(e)}")
-            raise HTTPException(status_code=422, detail=f"Invalid feature type: {str(e)}")
+        feature_types_list = _parse_feature_types(feature_types)
         
         # Validate file
         if not file.filename:
             raise HTTPException(status_code=422, detail="No file provided")
         
         # Create a unique filename to prevent conflicts
-        file_extension = os.path.splitext(file.filename)[1]
-        temp_file = NamedTemporaryFile(delete=False, suffix=file_extension, dir=UPLOAD_DIR)
+        temp_file = _upload_path(file.filename)
         
         try:
-            # Save the uploaded file
-            with temp_file as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            # Save the uploaded file without blocking the event loop, hashing and
+            # sniffing its format in the same pass
+            sink = UploadSink(temp_file.name)
+            await sink.open()
+            while block := await file.read(settings.UPLOAD_BLOCK_SIZE):
+                await sink.write(block)
+            await sink.finish()
             
             logger.info(f"File saved successfully at: {temp_file.name}")
             
@@ -57,11 +63,15 @@ async def analyze_audio(
             task_id = await task_manager.create_task(
                 file_path=temp_file.name,
                 feature_types=feature_types_list,
-                chunk_duration=chunk_duration
+                chunk_duration=chunk_duration,
+                content_hash=sink.content_hash,
+                audio_format=sink.format,
+                priority=priority,
+                align_to_pauses=align_to_pauses
             )
             
             logger.info(f"Analysis task created with ID: {task_id}")
-            return task_manager.get_task_status(task_id)
+            return task_manager.task_response(task_id)
             
         except Exception as e:
             # Clean up the temp file if task creation fails
@@ -75,21 +85,338 @@ async def analyze_audio(
         logger.error(f"Error processing request: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/status/{task_id}", response_model=AudioAnalysisResponse)
-async def get_analysis_status(task_id: str):
-    """Get the current status of an audio analysis task"""
+@router.post("/analyze/stream", response_model=AudioAnalysisResponse)
+async def analyze_audio_stream(
+    request: Request,
+    feature_types: List[AudioFeatureType] = Query(...),
+    chunk_duration: float = Query(60.0),
+    filename: str = Query("upload"),
+    upload_id: Optional[uuid.UUID] = Query(None),
+    priority: TaskPriority = Query(TaskPriority.NORMAL),
+    align_to_pauses: bool = Query(False)
+):
+    """
+    Upload the raw audio file as the request body and analyze it while it is still arriving.
+
+    Decoding starts as soon as the file header has been received, so the first
+    chunks are analyzed before the upload completes. Pass a client-generated
+    `upload_id` to use it as the task id; the WebSocket for that id can then be
+    opened before this request returns.
+    """
+    task_id = str(upload_id) if upload_id is not None else str(uuid.uuid4())
+    if task_manager.is_known_task(task_id):
+        raise HTTPException(status_code=409, detail="Task already exists")
+    
+    content_length = request.headers.get("content-length")
+    temp_file = _upload_path(filename)
+    sink = UploadSink(temp_file.name, expected_size=int(content_length) if content_length else None)
+    task_manager.expect_task(task_id)
+    creation = None
+    
+    def start_task():
+        return asyncio.create_task(task_manager.create_task(
+            file_path=temp_file.name,
+            feature_types=feature_types,
+            chunk_duration=chunk_duration,
+            upload=sink,
+            task_id=task_id,
+            priority=priority,
+            align_to_pauses=align_to_pauses
+        ))
+    
+    try:
+        await sink.open()
+        async for block in request.stream():
+            if not block:
+                continue
+            await sink.write(block)
+            if creation is None and sink.bytes_written >= settings.UPLOAD_HEADER_BYTES:
+                creation = start_task()
+        await sink.finish()
+        logger.info(f"Streamed upload saved at: {temp_file.name} ({sink.bytes_written} bytes)")
+        
+        if creation is None:
+            creation = start_task()
+        await creation
+        return task_manager.task_response(task_id)
+        
+    except Exception as e:
+        logger.error(f"Error processing streamed upload: {str(e)}", exc_info=True)
+        if not sink.complete:
+            await sink.abort(e)
+        if creation is not None:
+            try:
+                await creation
+            except Exception:
+                pass
+        else:
+            task_manager.cancel_expected_task(task_id)
+        if task_manager.get_task_status(task_id) is None:
+            try:
+                os.unlink(temp_file.name)
+            except OSError:
+                pass
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _parse_feature_types(feature_types: str) -> List[AudioFeatureType]:
+    """Parse feature types from a JSON string"""
+    try:
+        return [AudioFeatureType(ft) for ft in json.loads(feature_types)]
+    except json.JSONDecodeError as e:
+        logger.error(f"Invalid JSON for feature_types: {feature_types}")
+        raise HTTPException(status_code=422, detail=f"Invalid feature types format: {str(e)}")
+    except ValueError as e:
+        logger.error(f"Invalid feature type value: {str(e)}")
+        raise HTTPException(status_code=422, detail=f"Invalid feature type: {str(e)}")
+
+def _upload_path(filename: str):
+    """Reserve a uniquely named file in the upload directory, keeping the extension"""
+    file_extension = os.path.splitext(filename)[1]
+    temp_file = NamedTemporaryFile(delete=False, suffix=file_extension, dir=UPLOAD_DIR)
+    temp_file.close()
+    return temp_file
+
+# The page is encoded directly (chunks may be projected), so AudioStatusPage only documents it
+@router.get("/status/{task_id}", response_model=None, responses={200: {"model": AudioStatusPage}})
+async def get_analysis_status(
+    task_id: str,
+    request: Request,
+    since: int = Query(0, ge=0, description="Only chunks changed after this task version"),
+    cursor: Optional[int] = Query(None, description="Only chunks after this chunk id (the previous page's next_cursor)"),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    fields: Optional[List[str]] = Query(
+        None, description="Chunk attributes and feature paths to return, e.g. status,acoustic.energy"
+    )
+):
+    """
+    Get the current status of an audio analysis task.
+
+    Without parameters every chunk is returned with all of its features. Large
+    tasks can be read in pages (`limit` with `cursor` or `offset`; the response
+    carries `next_cursor`), restricted to chunks changed since a known
+    `version`, and projected to a few `fields`; see `AudioStatusPage`. The
+    response has an ETag that changes with the task version (and differs
+    between pages and projections), so a poll with `If-None-Match` returns 304
+    until something changed.
+    """
     task = task_manager.get_task_status(task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    return task
+    
+    query = {"since": since, "cursor": cursor, "offset": offset, "limit": limit, "fields": _parse_fields(fields)}
+    etag = task_manager.status_etag(task, **query)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    page = task_manager.status_page(task_id, **query)
+    return Response(encode_message(page), media_type="application/json", headers=headers)
+
+def _parse_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """Split comma-separated `fields` values and reject unknown names"""
+    if not fields:
+        return None
+    names = [name.strip() for value in fields for name in value.split(",") if name.strip()]
+    unknown = [
+        name for name in names
+        if name != "features" and name not in AudioChunk.model_fields and not is_feature_path(name)
+    ]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(unknown)}")
+    return names
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison, as for GET requests
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+@router.get("/tasks/{task_id}/features")
+async def export_features(task_id: str, format: Literal["arrow", "parquet", "npz"] = "arrow"):
+    """
+    Download the features of a task's completed chunks as a table with one row per chunk.
+
+    `arrow` is an Arrow IPC stream and `parquet` a Parquet file (both need
+    pyarrow on the server); `npz` is a NumPy archive. Scalar features are
+    float32 columns named like `acoustic.spectral.centroid`, MFCCs and formants
+    are fixed-width blocks, and missing values are NaN.
+    """
+    columns = task_manager.feature_columns(task_id)
+    if columns is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if format != "npz" and not arrow_available():
+        raise HTTPException(status_code=501, detail=f"{format} export needs pyarrow; use format=npz")
+    
+    # Encoded batch by batch in the threadpool while the response is being sent
+    return StreamingResponse(
+        iter_table_bytes(columns, format),
+        media_type=TABLE_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{task_id}.{format}"'}
+    )
+
+@router.get("/tasks/{task_id}/overview")
+async def get_overview(task_id: str):
+    """
+    Zoom levels of a task's waveform and spectrogram overview.
+
+    Each level lists its column count and the seconds each column covers; use
+    them to pick the level and time range to fetch from
+    `/tasks/{task_id}/overview/{kind}`. Spectrogram bytes map linearly onto
+    `min_db`..`max_db`.
+    """
+    overview = await asyncio.to_thread(task_manager.get_overview, task_id)
+    if overview is None:
+        raise HTTPException(status_code=404, detail="Overview not found")
+    return overview.describe()
+
+@router.get("/tasks/{task_id}/overview/{kind}")
+async def get_overview_tile(
+    task_id: str,
+    kind: Literal["waveform", "spectrogram"],
+    start: float = Query(0.0, ge=0),
+    end: Optional[float] = Query(None, ge=0),
+    width: int = Query(1024, ge=1, le=16384, description="Columns wanted; picks the level when none is given"),
+    level: Optional[int] = Query(None, ge=0)
+):
+    """
+    Overview columns between `start` and `end` seconds, as raw bytes.
+
+    Waveform columns are int8 `(min, max)` pairs (columns not decoded yet have
+    min > max); spectrogram columns are `mel_bands` uint8 values from low to
+    high frequency. The `X-Level`, `X-First-Column`, `X-Columns` and
+    `X-Seconds-Per-Column` headers place the columns in time.
+    """
+    overview = await asyncio.to_thread(task_manager.get_overview, task_id)
+    if overview is None:
+        raise HTTPException(status_code=404, detail="Overview not found")
+    end = overview.duration if end is None else end
+    if level is None:
+        level = overview.choose_level(kind, start, end, width)
+    elif level >= len(overview.columns[kind]):
+        raise HTTPException(status_code=422, detail=f"{kind} has {len(overview.columns[kind])} levels")
+    
+    first, columns = overview.read(kind, level, start, end)
+    return Response(columns.tobytes(), media_type="application/octet-stream", headers={
+        "X-Level": str(level),
+        "X-First-Column": str(first),
+        "X-Columns": str(len(columns)),
+        "X-Seconds-Per-Column": str(overview.samples_per_column[kind][level] / overview.sample_rate)
+    })
+
+@router.delete("/tasks/{task_id}", response_model=AudioAnalysisResponse)
+async def cancel_analysis(task_id: str):
+    """Cancel a running analysis task; chunks that are not finished yet are marked CANCELLED"""
+    if task_manager.get_task_status(task_id) is None:
+        raise HTTPException(status_code=404, detail="Task not found")
+    if not await task_manager.cancel_task(task_id):
+        raise HTTPException(status_code=409, detail="Task is not running")
+    return task_manager.task_response(task_id)
+
+@router.get("/scheduler/stats")
+async def get_scheduler_stats():
+    """Chunk jobs in flight and waiting per priority lane"""
+    return task_manager.scheduler.stats()
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters and sizes of the feature cache, and the size of the decoded-audio cache"""
+    return {**task_manager.feature_cache.stats(), "decoded_audio": task_manager.decoded_cache.stats()}
+
+@router.websocket("/ws/stream")
+async def stream_endpoint(
+    websocket: WebSocket,
+    sample_rate: int = 16000,
+    encoding: str = "pcm_s16le",
+    channels: int = 1,
+    feature_types: List[AudioFeatureType] = Query([AudioFeatureType.ACOUSTIC, AudioFeatureType.PARALINGUISTIC])
+):
+    """
+    Live analysis of raw PCM audio.
+
+    Send binary messages of interleaved `pcm_s16le` or `pcm_f32le` samples. Every
+    `STREAM_EMIT_INTERVAL` seconds of audio the server answers with a `features`
+    message summarizing the last `STREAM_WINDOW_SECONDS`. Send `{"type": "end"}`
+    to receive the features of the remaining audio before the socket is closed.
+    """
+    await websocket.accept()
+    
+    if not 8000 <= sample_rate <= 192000 or not 1 <= channels <= 8:
+        await websocket.close(code=1008, reason="Invalid sample_rate or channels")
+        return
+    try:
+        decoder = PCMDecoder(encoding, channels)
+    except ValueError as e:
+        await websocket.close(code=1003, reason=str(e))
+        return
+    
+    extractor = StreamingFeatureExtractor(
+        sample_rate,
+        feature_types,
+        window_seconds=settings.STREAM_WINDOW_SECONDS,
+        emit_interval=settings.STREAM_EMIT_INTERVAL,
+        n_fft=settings.STFT_N_FFT,
+        hop_length=settings.STFT_HOP_LENGTH
+    )
+    await websocket.send_text(encode_message({
+        "type": "ready",
+        "window_seconds": settings.STREAM_WINDOW_SECONDS,
+        "emit_interval": settings.STREAM_EMIT_INTERVAL
+    }))
+    
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            
+            data = message.get("bytes")
+            if data is None:
+                try:
+                    control = json.loads(message.get("text") or "")
+                except json.JSONDecodeError:
+                    continue
+                if isinstance(control, dict) and control.get("type") == "end":
+                    update = extractor.flush()
+                    if update is not None:
+                        await websocket.send_text(encode_message({"type": "features", **update}))
+                    await websocket.close()
+                    break
+                continue
+            
+            if len(data) > settings.STREAM_MAX_MESSAGE_BYTES:
+                await websocket.close(code=1009, reason="Message too large")
+                break
+            
+            # Work per message is proportional to its length, so latency stays bounded
+            for update in extractor.feed(decoder.decode(data)):
+                await websocket.send_text(encode_message({"type": "features", **update}))
+                
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Error in audio stream: {str(e)}", exc_info=True)
+        try:
+            await websocket.close(code=1011, reason="Analysis failed")
+        except Exception:
+            pass
 
 @router.websocket("/ws/{task_id}")
-async def websocket_endpoint(websocket: WebSocket, task_id: str):
-    """WebSocket endpoint for receiving real-time updates about the analysis"""
+async def websocket_endpoint(websocket: WebSocket, task_id: str, since: int = 0):
+    """
+    WebSocket endpoint for receiving real-time updates about the analysis.
+
+    The first message is a full `snapshot` of the task (or, when reconnecting with
+    `?since=<version>`, a `patch` with the chunks changed after that version).
+    Every processed chunk is then sent as a single `chunk` message carrying the new
+    task version. Clients that notice a gap in versions can send
+    `{"type": "resync", "since": <version>}` to receive the missing chunks.
+    """
     await websocket.accept()
     
-    task = task_manager.get_task_status(task_id)
-    if not task:
+    # The task of a streamed upload may not exist yet
+    if not await task_manager.wait_for_task(task_id, settings.UPLOAD_WAIT_TIMEOUT):
         await websocket.close(code=4004, reason="Task not found")
         return
     
@@ -98,14 +425,24 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
         task_manager.register_client(task_id, websocket)
         
         # Send initial state
-        await websocket.send_json(task.model_dump())
+        task_manager.send_message(task_id, websocket, task_manager.changes_since(task_id, since))
         
-        # Keep the connection alive and handle disconnection
+        # Keep the connection alive, answer resync requests and handle disconnection
         while True:
             try:
-                await websocket.receive_text()
+                text = await websocket.receive_text()
             except Exception:
                 break
+            
+            try:
+                message = json.loads(text)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(message, dict) and message.get("type") == "resync":
+                since = message.get("since")
+                task_manager.send_message(
+                    task_id, websocket, task_manager.changes_since(task_id, since if isinstance(since, int) else 0)
+                )
                 
     finally:
-        task_manager.unregister_client(task_id, websocket) 
\ No newline at end of file
+        task_manager.unregister_client(task_id, websocket)
@@ -0,0 +1,312 @@
+"""
+Analyze a directory or manifest of audio files without the API server.
+
+    python -m app.cli.batch recordings/ --output results/
+    python -m app.cli.batch manifest.txt --output results/ --features acoustic --chunk-duration 10
+
+Files are split into ranges of chunks that are decoded and extracted in a
+process pool, so a single long file keeps every core busy as well as many
+short ones. Files only audioread can decode (m4a, aac, ...) cannot seek, so
+each of them is a single job. Results are written in bulk as columnar part files (Parquet when
+pyarrow is installed, NPZ otherwise) with one row per chunk. Every file whose
+rows are safely on disk is recorded in `checkpoint.jsonl`; running the same
+command again skips them and continues with the rest.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from ..core.config import settings
+from ..schemas.audio import AudioFeatureType
+from ..services.audio.decoder import AudioStreamReader
+from ..services.audio.feature_extractor import EXTRACTED_FEATURE_TYPES, extract_chunk_features_batch
+from ..services.audio.feature_table import FeatureTable, arrow_available, concat_columns, speech_ratio_column, write_columns
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".ogg", ".mp3", ".m4a", ".aac", ".webm", ".mp4", ".aiff", ".aif")
+CHECKPOINT_FILE = "checkpoint.jsonl"
+
+def find_audio_files(source: str, extensions: Tuple[str, ...] = AUDIO_EXTENSIONS) -> List[str]:
+    """Audio files under a directory (recursively), or the paths listed in a manifest file"""
+    if os.path.isdir(source):
+        paths = []
+        for root, _, names in os.walk(source):
+            paths.extend(os.path.join(root, name) for name in names if name.lower().endswith(extensions))
+        return sorted(paths)
+
+    # Manifest: one path per line (or the first CSV column), relative to the manifest
+    base = os.path.dirname(os.path.abspath(source))
+    paths = []
+    with open(source) as f:
+        for line in f:
+            entry = line.strip().split(",")[0].strip()
+            if not entry or entry.startswith("#") or entry == "path":
+                continue
+            paths.append(entry if os.path.isabs(entry) else os.path.join(base, entry))
+    return paths
+
+def analyze_chunk_range(path: str, first: int, stop: int, chunk_duration: float,
+                        feature_types: List[AudioFeatureType], sample_rate: int,
+                        batch_chunks: Optional[int] = None) -> List[Tuple[int, float, float, Dict[str, Any]]]:
+    """
+    Process-pool job: decode chunks `first` to `stop - 1` of a file and extract their features.
+
+    Chunks are extracted together in batches of `batch_chunks` (all at once by
+    default) as they are decoded.
+    """
+    reader = AudioStreamReader(path, target_rate=sample_rate)
+    chunk_size = int(chunk_duration * reader.sample_rate)
+    total = reader.total_chunks(chunk_size)
+    skip = frozenset(range(first)) | frozenset(range(stop, total))
+    batch_chunks = batch_chunks or stop - first
+
+    rows = []
+    indices, chunks = [], []
+
+    def extract():
+        features, _ = extract_chunk_features_batch(chunks, feature_types, reader.sample_rate)
+        rows.extend(
+            (index, index * chunk_duration, min((index + 1) * chunk_duration, reader.duration), chunk_features)
+            for index, chunk_features in zip(indices, features)
+        )
+        indices.clear()
+        chunks.clear()
+
+    for index, chunk in reader.iter_chunks(chunk_size, skip=skip):
+        indices.append(index)
+        chunks.append(chunk)
+        if len(chunks) >= batch_chunks:
+            extract()
+        if index >= stop - 1:
+            break
+    if chunks:
+        extract()
+    return rows
+
+class Checkpoint:
+    """Append-only record of finished files; lines are flushed and synced as they are written"""
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, CHECKPOINT_FILE)
+        self.done: Set[str] = set()
+        self.failed: Set[str] = set()
+        self.parts = 0
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by a crash
+                        continue
+                    if entry.get("status") == "done":
+                        self.done.add(entry["file"])
+                        self.failed.discard(entry["file"])
+                    else:
+                        self.failed.add(entry["file"])
+                    if entry.get("part") is not None:
+                        self.parts = max(self.parts, entry["part"] + 1)
+        self._file = open(self.path, "a")
+
+    def record(self, entries: List[Dict[str, Any]]):
+        for entry in entries:
+            self._file.write(json.dumps(entry) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+class BatchRunner:
+    """Feeds chunk-range jobs of many files to a process pool and writes finished files in bulk"""
+
+    def __init__(self, output_dir: str, feature_types: List[AudioFeatureType], chunk_duration: float,
+                 workers: int, chunks_per_job: int, rows_per_part: int, format: str, retry_failed: bool = False):
+        self.output_dir = output_dir
+        self.feature_types = feature_types
+        self.chunk_duration = chunk_duration
+        self.workers = workers
+        self.chunks_per_job = chunks_per_job
+        self.rows_per_part = rows_per_part
+        self.format = format
+        self.retry_failed = retry_failed
+        self.sample_rate = settings.ANALYSIS_SAMPLE_RATE
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.checkpoint = Checkpoint(output_dir)
+
+        # Per file: chunk ranges still running, rows collected so far, first error
+        self._remaining: Dict[str, int] = {}
+        self._rows: Dict[str, List[Tuple[int, float, float, Dict[str, Any]]]] = {}
+        self._errors: Dict[str, str] = {}
+        # Finished files waiting to be written in the next part, with their speech ratios when silence is skipped
+        self._finished: List[Tuple[str, FeatureTable, Optional[Any]]] = []
+        self._finished_rows = 0
+        self.files_done = 0
+        self.chunks_done = 0
+        self.audio_seconds = 0.0
+
+    def run(self, paths: List[str]):
+        skip = self.checkpoint.done | (set() if self.retry_failed else self.checkpoint.failed)
+        todo = [path for path in paths if path not in skip]
+        logger.info(f"{len(paths)} files, {len(paths) - len(todo)} already done, {len(todo)} to analyze")
+
+        started = time.perf_counter()
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        running: Dict[Future, str] = {}
+        # Enough queued jobs to keep every worker busy without decoding headers far ahead
+        max_running = 2 * self.workers
+        try:
+            jobs = self._jobs(todo)
+            exhausted = False
+            while running or not exhausted:
+                while not exhausted and len(running) < max_running:
+                    job = next(jobs, None)
+                    if job is None:
+                        exhausted = True
+                        break
+                    path, first, stop = job
+                    future = executor.submit(
+                        analyze_chunk_range, path, first, stop, self.chunk_duration, self.feature_types,
+                        self.sample_rate, self.chunks_per_job
+                    )
+                    running[future] = path
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._collect(running.pop(future), future)
+            self._write_part()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self.checkpoint.close()
+
+        elapsed = time.perf_counter() - started
+        logger.info(
+            f"Analyzed {self.files_done} files ({self.chunks_done} chunks, {self.audio_seconds:.0f}s of audio) "
+            f"in {elapsed:.1f}s, {self.audio_seconds / max(elapsed, 1e-9):.1f}x real time"
+        )
+
+    def _jobs(self, paths: List[str]) -> Iterator[Tuple[str, int, int]]:
+        """Chunk ranges of every file; reads each header just before its jobs are queued"""
+        for path in paths:
+            try:
+                reader = AudioStreamReader(path, target_rate=self.sample_rate)
+                total = reader.total_chunks(int(self.chunk_duration * reader.sample_rate))
+            except Exception as e:
+                logger.error(f"Cannot read {path}: {str(e)}")
+                self._errors[path] = str(e) or type(e).__name__
+                self._remaining[path] = 0
+                self._rows[path] = []
+                self._file_finished(path)
+                continue
+            if reader.seekable:
+                ranges = [(first, min(first + self.chunks_per_job, total)) for first in range(0, total, self.chunks_per_job)]
+            else:
+                # audioread decodes from the start of the file for every range, so
+                # such files are one job, still extracted `chunks_per_job` at a time
+                ranges = [(0, total)]
+            self._remaining[path] = len(ranges)
+            self._rows[path] = []
+            for first, stop in ranges:
+                yield path, first, stop
+
+    def _collect(self, path: str, future: Future):
+        try:
+            self._rows[path].extend(future.result())
+        except Exception as e:
+            logger.error(f"Error analyzing {path}: {str(e)}")
+            self._errors.setdefault(path, str(e) or type(e).__name__)
+        self._remaining[path] -= 1
+        if self._remaining[path] == 0:
+            self._file_finished(path)
+
+    def _file_finished(self, path: str):
+        rows = sorted(self._rows.pop(path), key=lambda row: row[0])
+        del self._remaining[path]
+        error = self._errors.pop(path, None)
+        if error is not None:
+            self.checkpoint.record([{"file": path, "status": "failed", "error": error}])
+            return
+
+        table = FeatureTable(self.feature_types, capacity=len(rows))
+        for chunk_id, start_time, end_time, features in rows:
+            table.append(chunk_id, start_time, end_time, features)
+        speech_ratio = speech_ratio_column([row[3].get("speech") for row in rows]) if settings.VAD_ENABLED else None
+        self._finished.append((path, table, speech_ratio))
+        self._finished_rows += len(table)
+        self.files_done += 1
+        self.chunks_done += len(table)
+        self.audio_seconds += rows[-1][2] if rows else 0.0
+        if self._finished_rows >= self.rows_per_part:
+            self._write_part()
+
+    def _write_part(self):
+        """Write the finished files as one part, then checkpoint them"""
+        if not self._finished:
+            return
+        import numpy as np
+
+        part = self.checkpoint.parts
+        parts = []
+        for path, table, speech_ratio in self._finished:
+            columns = table.columns()
+            if speech_ratio is not None:
+                columns["speech_ratio"] = speech_ratio
+            columns["path"] = np.full(len(table), path)
+            parts.append(columns)
+        part_path = os.path.join(self.output_dir, f"part-{part:05d}.{self.format}")
+        temp_path = part_path + ".tmp"
+        write_columns(concat_columns(parts), temp_path, self.format)
+        os.replace(temp_path, part_path)
+
+        self.checkpoint.record([
+            {"file": path, "status": "done", "part": part, "chunks": len(table)} for path, table, _ in self._finished
+        ])
+        self.checkpoint.parts += 1
+        logger.info(f"Wrote {part_path} ({self._finished_rows} rows, {len(self._finished)} files)")
+        self._finished = []
+        self._finished_rows = 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="directory to scan for audio files, or a manifest with one path per line")
+    parser.add_argument("--output", required=True, help="directory for part files and the checkpoint")
+    parser.add_argument(
+        "--features", nargs="+", choices=[ft.value for ft in EXTRACTED_FEATURE_TYPES],
+        default=[ft.value for ft in EXTRACTED_FEATURE_TYPES]
+    )
+    parser.add_argument("--chunk-duration", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunks-per-job", type=int, default=12, help="chunks decoded and extracted together in one job")
+    parser.add_argument("--rows-per-part", type=int, default=50000, help="chunk rows collected before a part file is written")
+    parser.add_argument("--format", choices=["parquet", "npz"], default="parquet" if arrow_available() else "npz")
+    parser.add_argument("--retry-failed", action="store_true", help="analyze files that failed in an earlier run again")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    if args.format == "parquet" and not arrow_available():
+        parser.error("parquet output needs pyarrow; install it or use --format npz")
+
+    runner = BatchRunner(
+        output_dir=args.output,
+        feature_types=[AudioFeatureType(ft) for ft in args.features],
+        chunk_duration=args.chunk_duration,
+        workers=args.workers,
+        chunks_per_job=args.chunks_per_job,
+        rows_per_part=args.rows_per_part,
+        format=args.format,
+        retry_failed=args.retry_failed
+    )
+    runner.run(find_audio_files(args.source))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,76 @@ class Settings(BaseSettings):
     BACKEND_CORS_ORIGINS: List[str] = eval(os.getenv("BACKEND_CORS_ORIGINS", '["http://localhost:5173"]'))
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./app.db")
 
+    # Feature extraction runs in a process pool so it never blocks the event loop
+    FEATURE_WORKERS: int = int(os.getenv("FEATURE_WORKERS", os.cpu_count() or 1))
+    # Chunks a single task may have decoded but not yet extracted (backpressure on the decoder)
+    MAX_PENDING_CHUNKS: int = int(os.getenv("MAX_PENDING_CHUNKS", 2 * (os.cpu_count() or 1)))
+    # Chunk jobs of all tasks together that may be decoding or extracting at once
+    MAX_IN_FLIGHT_CHUNKS: int = int(os.getenv("MAX_IN_FLIGHT_CHUNKS", 2 * (os.cpu_count() or 1)))
+
+    # Uploads are resampled once, while decoding, to this rate before analysis
+    ANALYSIS_SAMPLE_RATE: int = int(os.getenv("ANALYSIS_SAMPLE_RATE", 22050))
+
+    # STFT framing used for spectral features
+    STFT_N_FFT: int = int(os.getenv("STFT_N_FFT", 2048))
+    STFT_HOP_LENGTH: int = int(os.getenv("STFT_HOP_LENGTH", 512))
+    # Include per-frame spectral time series in chunk results
+    SPECTRAL_TIME_SERIES: bool = os.getenv("SPECTRAL_TIME_SERIES", "false").lower() == "true"
+
+    # Voice activity detection before extraction: pitch, paralinguistic features and
+    # transcripts are computed from the speech regions of each chunk only
+    VAD_ENABLED: bool = os.getenv("VAD_ENABLED", "true").lower() == "true"
+    VAD_ENERGY_DB: float = float(os.getenv("VAD_ENERGY_DB", -50.0))
+    VAD_NOISE_MARGIN_DB: float = float(os.getenv("VAD_NOISE_MARGIN_DB", 6.0))
+    VAD_MAX_FLATNESS: float = float(os.getenv("VAD_MAX_FLATNESS", 0.45))
+    VAD_MIN_SPEECH: float = float(os.getenv("VAD_MIN_SPEECH", 0.1))
+    VAD_MIN_SILENCE: float = float(os.getenv("VAD_MIN_SILENCE", 0.3))
+    VAD_PADDING: float = float(os.getenv("VAD_PADDING", 0.1))
+    # How far (seconds) a chunk boundary may move to land on a pause, for tasks that align chunks to pauses
+    VAD_ALIGN_TOLERANCE: float = float(os.getenv("VAD_ALIGN_TOLERANCE", 1.0))
+
+    # WebSocket fan-out: clients that fall this far behind or stall a send are dropped
+    WS_MAX_QUEUED_MESSAGES: int = int(os.getenv("WS_MAX_QUEUED_MESSAGES", 256))
+    WS_SEND_TIMEOUT: float = float(os.getenv("WS_SEND_TIMEOUT", 10.0))
+
+    # Task results are persisted to DATABASE_URL; finished tasks stay in memory only while recently used
+    TASK_CACHE_SIZE: int = int(os.getenv("TASK_CACHE_SIZE", 32))
+    TASK_CACHE_TTL: float = float(os.getenv("TASK_CACHE_TTL", 600.0))
+    STORE_BATCH_SIZE: int = int(os.getenv("STORE_BATCH_SIZE", 256))
+    STORE_FLUSH_INTERVAL: float = float(os.getenv("STORE_FLUSH_INTERVAL", 0.5))
+
+    # Per-chunk feature cache keyed by audio content hash
+    FEATURE_CACHE_DIR: str = os.getenv("FEATURE_CACHE_DIR", "feature_cache")
+    FEATURE_CACHE_MEMORY_BYTES: int = int(os.getenv("FEATURE_CACHE_MEMORY_BYTES", 64 * 1024 * 1024))
+    FEATURE_CACHE_DISK_BYTES: int = int(os.getenv("FEATURE_CACHE_DISK_BYTES", 1024 * 1024 * 1024))
+    # Decoded samples at the analysis rate, memory-mapped and shared with the extraction workers
+    DECODED_CACHE_DIR: str = os.getenv("DECODED_CACHE_DIR", "decoded_cache")
+    DECODED_CACHE_BYTES: int = int(os.getenv("DECODED_CACHE_BYTES", 2 * 1024 * 1024 * 1024))
+    # Waveform peaks and spectrogram overviews of each task, kept on disk for the visualizer
+    OVERVIEW_DIR: str = os.getenv("OVERVIEW_DIR", "overviews")
+    OVERVIEW_CACHE_BYTES: int = int(os.getenv("OVERVIEW_CACHE_BYTES", 1024 * 1024 * 1024))
+
+    # Uploads are written to disk in blocks; streamed uploads start decoding
+    # once the header bytes have arrived
+    UPLOAD_BLOCK_SIZE: int = int(os.getenv("UPLOAD_BLOCK_SIZE", 1024 * 1024))
+    UPLOAD_HEADER_BYTES: int = int(os.getenv("UPLOAD_HEADER_BYTES", 64 * 1024))
+    UPLOAD_WAIT_TIMEOUT: float = float(os.getenv("UPLOAD_WAIT_TIMEOUT", 30.0))
+
+    # Live PCM streams: features summarize a rolling window and are sent at a fixed interval
+    STREAM_WINDOW_SECONDS: float = float(os.getenv("STREAM_WINDOW_SECONDS", 2.0))
+    STREAM_EMIT_INTERVAL: float = float(os.getenv("STREAM_EMIT_INTERVAL", 0.5))
+    STREAM_MAX_MESSAGE_BYTES: int = int(os.getenv("STREAM_MAX_MESSAGE_BYTES", 1024 * 1024))
+
+    # Models (e.g. Whisper) are loaded on first use and unloaded when idle
+    WHISPER_MODEL: str = os.getenv("WHISPER_MODEL", "tiny.en")
+    MODEL_REGISTRY_SIZE: int = int(os.getenv("MODEL_REGISTRY_SIZE", 2))
+    MODEL_IDLE_TIMEOUT: float = float(os.getenv("MODEL_IDLE_TIMEOUT", 600.0))
+    # Transcription runs on a dedicated inference executor; chunks that arrive within
+    # TRANSCRIPTION_BATCH_DELAY seconds of each other are decoded as one batch
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", 1))
+    TRANSCRIPTION_BATCH_SIZE: int = int(os.getenv("TRANSCRIPTION_BATCH_SIZE", 4))
+    TRANSCRIPTION_BATCH_DELAY: float = float(os.getenv("TRANSCRIPTION_BATCH_DELAY", 0.05))
+
     class Config:
         case_sensitive = True
 
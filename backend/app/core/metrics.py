@@ -0,0 +1,182 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds (seconds) of the default histogram buckets, from sub-millisecond stages to whole chunks
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+class Histogram:
+    """Cumulative-bucket histogram; recording is a bisect and a few additions under a lock"""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # Per label set: count per bucket (plus one for +Inf), sum, count
+        self._series: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0, 0])
+            series[0][index] += 1
+            series[1][0] += value
+            series[1][1] += 1
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(labels, list(counts), list(totals)) for labels, (counts, totals) in self._series.items()]
+        for labels, counts, (total, count) in sorted(series):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(self.labelnames + ("le",), labels + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(total)}")
+            lines.append(f"{self.name}_count{label_text} {int(count)}")
+        return lines
+
+class Counter:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+class Gauge:
+    """Value read from a callback when metrics are scraped, so keeping it current costs nothing"""
+
+    def __init__(self, name: str, help: str, read: Callable[[], Union[float, Dict[LabelValues, float]]],
+                 labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.read = read
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        value = self.read()
+        values = value.items() if isinstance(value, dict) else [((), value)]
+        for labels, item in sorted(values):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(item)}")
+        return lines
+
+class MetricsRegistry:
+    """Named metrics of this process, rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Union[Histogram, Counter, Gauge]] = {}
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, read: Callable[[], Union[float, Dict[LabelValues, float]]],
+              labelnames: Sequence[str] = ()) -> Gauge:
+        # Gauges read live objects, so a re-registered gauge replaces the old one
+        gauge = self._metrics[name] = Gauge(name, help, read, labelnames)
+        return gauge
+
+    def render(self) -> str:
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+class StageTimings(dict):
+    """Seconds spent per stage of one unit of work; plain dict, so it can be returned from worker processes"""
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self[name] = self.get(name, 0.0) + time.perf_counter() - started
+
+def stage(timings: Optional[StageTimings], name: str):
+    """`timings.stage(name)`, or a no-op when nothing is being timed"""
+    return timings.stage(name) if timings is not None else _NO_TIMING
+
+_NO_TIMING = nullcontext()
+
+# Shared by everything in this process that records metrics
+metrics = MetricsRegistry()
+
+PIPELINE_STAGE_SECONDS = metrics.histogram(
+    "audio_pipeline_stage_seconds",
+    "Time spent per chunk in each stage of the task pipeline",
+    ["stage"]
+)
+EXTRACTION_STAGE_SECONDS = metrics.histogram(
+    "audio_extraction_stage_seconds",
+    "Time spent per chunk in each analysis stage inside the extraction workers",
+    ["stage"]
+)
+FEATURE_SECONDS = metrics.histogram(
+    "audio_feature_seconds",
+    "Time spent per chunk extracting each feature type",
+    ["feature_type"]
+)
+CHUNKS_TOTAL = metrics.counter(
+    "audio_chunks_total",
+    "Chunks finished, by outcome",
+    ["status"]
+)
@@ -1,38 +1,66 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
+from typing import Any, List, Optional
 import os
 from .api.v1 import audio
+from .core.metrics import metrics, PROMETHEUS_CONTENT_TYPE
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(
-    title=os.getenv("PROJECT_NAME", "Audio Research API"),
-    openapi_url=f"{os.getenv('API_V1_PREFIX', '/api/v1')}/openapi.json"
-)
-
-# Configure CORS
-origins = eval(os.getenv("BACKEND_CORS_ORIGINS", '["http://localhost:5173"]'))
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Include routers
-app.include_router(
-    audio.router,
-    prefix=os.getenv("API_V1_PREFIX", "/api/v1"),
-    tags=["audio"]
-)
-
-@app.get("/")
-async def root():
-    return {"message": "Welcome to Audio Research API"}
-
-# Import and include routers here
-# from app.api.v1 import some_router
-# app.include_router(some_router.router, prefix=os.getenv("API_V1_PREFIX", "/api/v1")) 
\ No newline at end of file
+def create_app(title: Optional[str] = None, cors_origins: Optional[List[str]] = None, **metadata: Any) -> FastAPI:
+    """
+    Build the API application. Every entrypoint goes through here, so they all
+    get the same routes, CORS settings, /metrics and worker shutdown; `title`,
+    `cors_origins` and FastAPI `metadata` (description, version, ...) default
+    to the environment.
+    """
+    api_prefix = os.getenv("API_V1_PREFIX", "/api/v1")
+    app = FastAPI(
+        title=title or os.getenv("PROJECT_NAME", "Audio Research API"),
+        openapi_url=f"{api_prefix}/openapi.json",
+        **metadata
+    )
+
+    # Configure CORS
+    if cors_origins is None:
+        cors_origins = eval(os.getenv("BACKEND_CORS_ORIGINS", '["http://localhost:5173"]'))
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        # Read by the frontend: status ETags and the placement of overview columns
+        expose_headers=["ETag", "X-Level", "X-First-Column", "X-Columns", "X-Seconds-Per-Column"],
+    )
+
+    # Include routers
+    app.include_router(
+        audio.router,
+        prefix=api_prefix,
+        tags=["audio"]
+    )
+
+    @app.on_event("shutdown")
+    def shutdown_task_manager():
+        # Stop the feature extraction worker processes
+        audio.task_manager.shutdown()
+
+    @app.get("/")
+    async def root():
+        return {"message": "Welcome to Audio Research API"}
+
+    @app.get("/metrics", include_in_schema=False)
+    def get_metrics():
+        # Pipeline stage histograms and scheduler/WebSocket gauges in the Prometheus text format
+        return Response(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    # Import and include routers here
+    # from app.api.v1 import some_router
+    # app.include_router(some_router.router, prefix=api_prefix)
+
+    return app
+
+app = create_app()
@@ -13,12 +13,26 @@ class ChunkStatus(str, Enum):
     PROCESSING = "PROCESSING"
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+class TaskPriority(str, Enum):
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+class SpectralTimeSeries(BaseModel):
+    times: List[float] = Field(description="Frame center times in seconds, relative to the chunk start")
+    centroid: List[float] = Field(description="Per-frame spectral centroid")
+    bandwidth: List[float] = Field(description="Per-frame spectral bandwidth")
+    flux: List[float] = Field(description="Per-frame spectral flux")
+    rolloff: List[float] = Field(description="Per-frame spectral rolloff")
 
 class SpectralFeatures(BaseModel):
     centroid: float = Field(description="Spectral centroid - brightness of the sound")
     bandwidth: float = Field(description="Spectral bandwidth - width of the spectrum")
     flux: float = Field(description="Spectral flux - rate of change of the spectrum")
     rolloff: float = Field(description="Spectral rolloff - frequency below which 85% of the spectrum is concentrated")
+    frames: Optional[SpectralTimeSeries] = Field(None, description="Per-frame values, when requested")
 
 class AcousticFeatures(BaseModel):
     mfcc: List[float] = Field(description="Mel-frequency cepstral coefficients")
@@ -30,15 +44,23 @@ class AcousticFeatures(BaseModel):
     vot: Optional[float] = Field(None, description="Voice onset time")
 
 class ParalinguisticFeatures(BaseModel):
-    pitch_variability: float = Field(description="Variability in fundamental frequency")
+    pitch_variability: float = Field(
+        description="Standard deviation of the fundamental frequency over voiced frames, in Hz"
+    )
     speech_rate: float = Field(description="Speech rate in syllables per second")
     jitter: float = Field(description="Cycle-to-cycle variations in fundamental frequency")
     shimmer: float = Field(description="Cycle-to-cycle variations in amplitude")
     hnr: float = Field(description="Harmonics-to-Noise Ratio")
 
+class SpeechActivity(BaseModel):
+    ratio: float = Field(description="Fraction of the chunk detected as speech")
+    regions: List[List[float]] = Field(description="Speech regions as [start, end] in seconds, relative to the chunk start")
+
 class AudioFeatures(BaseModel):
     acoustic: Optional[AcousticFeatures] = None
     paralinguistic: Optional[ParalinguisticFeatures] = None
+    transcription: Optional[str] = None
+    speech: Optional[SpeechActivity] = Field(None, description="Voice activity, when silence is skipped")
 
 class AudioChunk(BaseModel):
     chunk_id: int = Field(description="Unique identifier for the chunk")
@@ -53,6 +75,10 @@ class AudioChunk(BaseModel):
         None,
         description="Error message if processing failed"
     )
+    version: int = Field(
+        0,
+        description="Task version at which this chunk last changed"
+    )
 
 class AudioAnalysisRequest(BaseModel):
     feature_types: List[AudioFeatureType] = Field(
@@ -68,4 +94,19 @@ class AudioAnalysisRequest(BaseModel):
 class AudioAnalysisResponse(BaseModel):
     task_id: str = Field(description="Unique identifier for the analysis task")
     total_chunks: int = Field(description="Total number of chunks to process")
-    chunks: List[AudioChunk] = Field(description="List of audio chunks and their analysis results") 
\ No newline at end of file
+    chunks: List[AudioChunk] = Field(description="List of audio chunks and their analysis results")
+    version: int = Field(0, description="Incremented every time a chunk changes")
+
+class AudioStatusPage(BaseModel):
+    """Shape of the status endpoint's response; the chunks may be projected to a few fields"""
+    task_id: str = Field(description="Unique identifier for the analysis task")
+    total_chunks: int = Field(description="Total number of chunks to process")
+    version: int = Field(description="Current task version, to pass as `since` in the next poll")
+    chunks: List[AudioChunk] = Field(
+        description="Chunks of this page; with `fields`, each chunk only has its chunk_id and the requested "
+                    "attributes and feature paths"
+    )
+    next_cursor: Optional[int] = Field(
+        None,
+        description="chunk_id to pass as `cursor` for the next page, null on the last page"
+    ) 
\ No newline at end of file
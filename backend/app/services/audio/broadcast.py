@@ -0,0 +1,72 @@
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+from fastapi import WebSocket
+from pydantic_core import to_json
+
+logger = logging.getLogger(__name__)
+
+def encode_message(message: Any) -> str:
+    """Encode a message (which may contain pydantic models) to JSON text once, in Rust"""
+    return to_json(message).decode()
+
+class ClientConnection:
+    """Outbound side of a WebSocket client.
+
+    Messages are queued as pre-encoded text and written by a dedicated sender
+    task, so a broadcast never waits on any individual client. A client whose
+    queue overflows or whose send exceeds `send_timeout` is dropped.
+    """
+
+    def __init__(self, websocket: WebSocket, max_queued: int, send_timeout: float,
+                 on_close: Optional[Callable[["ClientConnection"], None]] = None):
+        self.websocket = websocket
+        self.send_timeout = send_timeout
+        self.closed = False
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self._on_close = on_close
+        self._sender = asyncio.create_task(self._run())
+
+    @property
+    def queued(self) -> int:
+        """Messages waiting to be sent"""
+        return self._queue.qsize()
+
+    def offer(self, payload: str) -> bool:
+        """Queue a payload without blocking; returns False if the client was dropped"""
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            logger.warning("Dropping WebSocket client: outbound queue is full")
+            self.close(code=1013, reason="Client too slow")
+            return False
+
+    def close(self, code: int = 1000, reason: str = ""):
+        """Stop sending and close the socket in the background"""
+        if self.closed:
+            return
+        self.closed = True
+        self._sender.cancel()
+        asyncio.create_task(self._close_socket(code, reason))
+        if self._on_close is not None:
+            self._on_close(self)
+
+    async def _run(self):
+        try:
+            while True:
+                payload = await self._queue.get()
+                await asyncio.wait_for(self.websocket.send_text(payload), self.send_timeout)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.info(f"Dropping WebSocket client: {str(e) or type(e).__name__}")
+            self.close(code=1011, reason="Send failed")
+
+    async def _close_socket(self, code: int, reason: str):
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
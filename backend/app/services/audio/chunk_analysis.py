@@ -0,0 +1,126 @@
+import numpy as np
+from functools import cached_property
+from typing import NamedTuple, Optional
+from ...core.metrics import StageTimings, stage
+from .f0 import F0Track, F0Tracker
+from .mfcc import MFCCEngine
+from .stft import STFTEngine, FrameSpectra
+from .vad import speech_samples
+
+# Target rate (Hz) of the decimated amplitude envelope
+ENVELOPE_RATE = 200
+
+class DecimatedEnvelope(NamedTuple):
+    """Amplitude envelope reduced to one mean and one peak value per block of samples"""
+    rate: float
+    mean: np.ndarray
+    peak: np.ndarray
+
+def moving_average(values: np.ndarray, width: int) -> np.ndarray:
+    """Centered moving average in O(n) from a cumulative sum (zero-padded at the edges like `np.convolve(..., 'same')`)"""
+    cumulative = np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+    start = np.arange(len(values)) - width // 2
+    low = np.clip(start, 0, len(values))
+    high = np.clip(start + width, 0, len(values))
+    return (cumulative[high] - cumulative[low]) / width
+
+class ChunkAnalysis:
+    """Per-chunk analysis context shared by all feature groups.
+
+    Intermediate results (spectrum, envelope, zero crossings, ...) are computed
+    lazily on first access and cached, so each one is computed at most once per
+    chunk no matter how many feature groups read it. With `timings`, the time
+    spent computing each of them is recorded there. With `speech` regions
+    (`[start, stop)` sample offsets from voice activity detection), `voiced`
+    analyzes only the samples inside them.
+    """
+
+    def __init__(self, audio_chunk: np.ndarray, sample_rate: int, stft: STFTEngine,
+                 mfcc: Optional[MFCCEngine] = None, f0_tracker: Optional[F0Tracker] = None,
+                 timings: Optional[StageTimings] = None, speech: Optional[np.ndarray] = None):
+        self.audio = audio_chunk
+        self.sample_rate = sample_rate
+        self.stft = stft
+        self.mfcc = mfcc
+        self.f0_tracker = f0_tracker
+        self.timings = timings
+        self.speech = speech
+
+    @property
+    def num_samples(self) -> int:
+        return len(self.audio)
+
+    @property
+    def duration(self) -> float:
+        """Chunk duration in seconds"""
+        return self.num_samples / self.sample_rate
+
+    @cached_property
+    def voiced(self) -> "ChunkAnalysis":
+        """Analysis of the speech regions joined together (the whole chunk when no regions were given)"""
+        if self.speech is None or (len(self.speech) == 1 and self.speech[0][0] == 0 and self.speech[0][1] >= self.num_samples):
+            return self
+        audio = speech_samples(self.audio, self.speech)
+        return ChunkAnalysis(audio, self.sample_rate, self.stft, None, self.f0_tracker, self.timings)
+
+    @cached_property
+    def frame_spectra(self) -> FrameSpectra:
+        """Per-frame spectral descriptors from the framed STFT (plus mel power when MFCCs are needed)"""
+        with stage(self.timings, "stft"):
+            return self.stft.analyze(self.audio, None if self.mfcc is None else self.mfcc.mel_basis)
+
+    @property
+    def mel_power(self) -> np.ndarray:
+        """(frames, n_mels) mel power spectrogram"""
+        return self.frame_spectra.mel_power
+
+    @cached_property
+    def mfcc_means(self) -> np.ndarray:
+        """Per-coefficient MFCC means (set directly when computed for a batch of chunks)"""
+        mel_power = self.mel_power
+        with stage(self.timings, "mfcc"):
+            return self.mfcc.mfcc_means(mel_power)
+
+    @property
+    def spectrum(self) -> np.ndarray:
+        """Average magnitude spectrum over all STFT frames"""
+        return self.frame_spectra.mean_spectrum
+
+    @property
+    def frequencies(self) -> np.ndarray:
+        """Frequency axis (Hz) matching `spectrum`"""
+        return self.stft.frequencies
+
+    @cached_property
+    def f0(self) -> F0Track:
+        """Frame-wise fundamental frequency, shared by pitch, pitch variability and jitter"""
+        with stage(self.timings, "f0"):
+            return self.f0_tracker.track(self.audio)
+
+    @cached_property
+    def envelope(self) -> np.ndarray:
+        """Rectified amplitude envelope"""
+        return np.abs(self.audio)
+
+    @cached_property
+    def decimated_envelope(self) -> DecimatedEnvelope:
+        """Mean and peak rectified amplitude per block, at about `ENVELOPE_RATE` Hz"""
+        with stage(self.timings, "envelope"):
+            return self._decimate_envelope()
+
+    def _decimate_envelope(self) -> DecimatedEnvelope:
+        step = max(1, self.sample_rate // ENVELOPE_RATE)
+        usable = self.num_samples - self.num_samples % step
+        blocks = np.abs(self.audio[:usable].reshape(-1, step))
+        mean = blocks.mean(axis=1)
+        peak = blocks.max(axis=1)
+        if usable < self.num_samples:
+            tail = np.abs(self.audio[usable:])
+            mean = np.append(mean, tail.mean())
+            peak = np.append(peak, tail.max())
+        return DecimatedEnvelope(rate=self.sample_rate / step, mean=mean, peak=peak)
+
+    @cached_property
+    def zero_crossings(self) -> np.ndarray:
+        """Sample indices after which the signal changes sign"""
+        return np.where(np.diff(np.signbit(self.audio)))[0]
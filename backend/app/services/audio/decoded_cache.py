@@ -0,0 +1,171 @@
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Iterator, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Temporary files older than this are left over from a crash even if their pid was reused
+STALE_TEMP_SECONDS = 24 * 3600
+
+class DecodedAudioWriter:
+    """Collects the decoded samples of one file, in order, into a temporary `.npy` map.
+
+    Samples are copied in as chunks are decoded, so nothing is decoded twice.
+    `commit` publishes the file under its content hash; `discard` drops it.
+    """
+
+    def __init__(self, cache: "DecodedAudioCache", sample_rate: int, expected_frames: int):
+        self.cache = cache
+        self.sample_rate = sample_rate
+        self.frames = 0
+        self.failed = False
+        # Named after the writing process, so other processes can tell whether it is still in progress
+        self._path = os.path.join(cache.cache_dir, f".{os.getpid()}-{uuid.uuid4().hex}.tmp.npy")
+        # Compressed formats only report an estimated length, so this may need trimming or be too short
+        self._samples = np.lib.format.open_memmap(self._path, mode="w+", dtype=np.float32, shape=(max(expected_frames, 1),))
+
+    def write(self, samples: np.ndarray):
+        if self.failed:
+            return
+        end = self.frames + len(samples)
+        if end > len(self._samples):
+            logger.info("Decoded audio is longer than its header said; not caching it")
+            self.failed = True
+            return
+        self._samples[self.frames:end] = samples
+        self.frames = end
+
+    def recording(self, chunks: Iterator[Tuple[int, np.ndarray]]) -> Iterator[Tuple[int, np.ndarray]]:
+        """Pass `(index, chunk)` pairs through, writing each chunk"""
+        for index, chunk in chunks:
+            self.write(chunk)
+            yield index, chunk
+
+    def commit(self, content_hash: str) -> Optional[str]:
+        """Publish the samples under `content_hash`; returns the cache path, or None if nothing was cached"""
+        if self.failed or self.frames == 0:
+            self.discard()
+            return None
+
+        samples, self._samples = self._samples, None
+        if self.frames < len(samples):
+            trimmed_path = self._path + ".trim.npy"
+            trimmed = np.lib.format.open_memmap(trimmed_path, mode="w+", dtype=np.float32, shape=(self.frames,))
+            trimmed[:] = samples[:self.frames]
+            trimmed.flush()
+            del trimmed
+            os.remove(self._path)
+            self._path = trimmed_path
+        else:
+            samples.flush()
+        del samples
+
+        path = self.cache.path(content_hash, self.sample_rate)
+        os.replace(self._path, path)
+        self.cache.added(path)
+        return path
+
+    def discard(self):
+        self._samples = None
+        try:
+            os.remove(self._path)
+        except OSError:
+            pass
+
+class DecodedAudioCache:
+    """Decoded mono float32 samples, kept as memory-mapped `.npy` files.
+
+    Files are keyed by the content hash of the upload and the sample rate they
+    were decoded at. Readers get read-only views straight onto the map, so
+    slicing out a chunk copies nothing, and worker processes attach to the same
+    file by path instead of receiving pickled samples. Least recently used
+    files are deleted once the directory grows past `max_bytes`; maps that are
+    still open stay valid until they are closed.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+        self._remove_stale_temp_files()
+
+    def _remove_stale_temp_files(self):
+        """Delete temporary files of interrupted writes; other live processes may still be writing theirs"""
+        now = time.time()
+        for entry in os.scandir(self.cache_dir):
+            if not (entry.name.endswith(".tmp.npy") or entry.name.endswith(".trim.npy")):
+                continue
+            try:
+                pid = int(entry.name[1:].split("-", 1)[0])
+            except ValueError:
+                pid = None
+            try:
+                if (pid is not None and not _process_alive(pid)) or now - entry.stat().st_mtime > STALE_TEMP_SECONDS:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def path(self, content_hash: str, sample_rate: int) -> str:
+        return os.path.join(self.cache_dir, f"{content_hash}_{sample_rate}.npy")
+
+    def get(self, content_hash: str, sample_rate: int) -> Optional[np.ndarray]:
+        """Read-only view of the cached samples, or None"""
+        path = self.path(content_hash, sample_rate)
+        try:
+            samples = load_mapped(path)
+            # The modification time doubles as the last-use time for eviction
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return samples
+
+    def writer(self, sample_rate: int, expected_frames: int) -> DecodedAudioWriter:
+        return DecodedAudioWriter(self, sample_rate, expected_frames)
+
+    def added(self, path: str):
+        """Account for a newly published file and evict old ones if over the limit"""
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.cache_dir):
+                if entry.name.endswith(".npy") and not entry.name.startswith("."):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, entry_path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if entry_path == path:
+                    continue
+                try:
+                    os.remove(entry_path)
+                    total -= size
+                except OSError:
+                    continue
+
+    def stats(self):
+        files = [
+            entry.stat().st_size for entry in os.scandir(self.cache_dir)
+            if entry.name.endswith(".npy") and not entry.name.startswith(".")
+        ]
+        return {"files": len(files), "bytes": sum(files), "max_bytes": self.max_bytes}
+
+def _process_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        # Exists, but belongs to another user (or liveness cannot be checked on this platform)
+        return True
+    return True
+
+def load_mapped(path: str) -> np.ndarray:
+    """Read-only, memory-mapped view of a `.npy` file (a plain ndarray, the map stays open while it is referenced)"""
+    return np.asarray(np.load(path, mmap_mode="r"))
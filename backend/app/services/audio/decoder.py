@@ -0,0 +1,259 @@
+import numpy as np
+import soundfile as sf
+import logging
+from math import gcd
+from typing import AbstractSet, Iterator, Optional, Tuple
+from .upload import GrowingFile, UploadSink
+
+logger = logging.getLogger(__name__)
+
+# Containers libsndfile cannot decode; these go straight to audioread
+SOUNDFILE_UNSUPPORTED_FORMATS = {"mp4", "webm", "aac"}
+
+# Source frames decoded per read when resampling
+RESAMPLE_BLOCK_FRAMES = 65536
+# Source audio fed to a fresh resampler ahead of a seek target, so its filter is settled at the target
+RESAMPLE_PREROLL_SECONDS = 0.05
+
+class AudioStreamReader:
+    """Reads an audio file as a stream of mono float32 chunks.
+
+    Only the file header is inspected on construction, so the number of chunks
+    is known before any samples are decoded. Formats libsndfile can read are
+    streamed with soundfile block reads; anything else (compressed formats such
+    as m4a/aac) falls back to audioread, which decodes incrementally as well.
+
+    When `upload` is given and still in progress, soundfile reads through a
+    `GrowingFile` and waits for bytes as they arrive. audioread needs the whole
+    file, so it waits for the upload to finish first.
+
+    With a `target_rate`, chunks are resampled exactly once while streaming:
+    one soxr stream runs across consecutive chunks, so its filter state carries
+    over chunk boundaries, and `sample_rate`, `frames` and chunk sizes all refer
+    to the target rate. The file's own rate is `source_rate`.
+    """
+
+    def __init__(self, file_path: str, upload: Optional[UploadSink] = None, audio_format: Optional[str] = None,
+                 target_rate: Optional[int] = None):
+        self.file_path = file_path
+        self.upload = upload
+
+        try:
+            if audio_format in SOUNDFILE_UNSUPPORTED_FORMATS:
+                raise ValueError(f"{audio_format} is not supported by libsndfile")
+            with self._open_soundfile() as f:
+                self.source_rate = int(f.samplerate)
+                self.channels = int(f.channels)
+                self.source_frames = int(f.frames)
+            self.backend = "soundfile"
+        except Exception as e:
+            logger.info(f"soundfile cannot read {file_path} ({str(e)}), falling back to audioread")
+            import audioread
+
+            self._wait_for_upload()
+            with audioread.audio_open(file_path) as f:
+                self.source_rate = int(f.samplerate)
+                self.channels = int(f.channels)
+                # Compressed containers only report a duration, so the frame count is an estimate
+                self.source_frames = int(round(f.duration * f.samplerate))
+            self.backend = "audioread"
+
+        if self.source_frames <= 0:
+            raise ValueError(f"Audio file contains no samples: {file_path}")
+
+        self.sample_rate = target_rate or self.source_rate
+        # Output length of a soxr resampling of the whole file
+        self.frames = int(np.floor(self.source_frames * self.sample_rate / self.source_rate + 0.5))
+
+    @property
+    def resampling(self) -> bool:
+        return self.sample_rate != self.source_rate
+
+    @property
+    def seekable(self) -> bool:
+        """Whether a chunk can be decoded without decoding everything before it.
+
+        audioread cannot seek: reaching any position means decoding the file
+        from its start, so callers should read such files in one forward pass
+        rather than as separate chunk ranges.
+        """
+        return self.backend == "soundfile"
+
+    def _open_soundfile(self) -> sf.SoundFile:
+        if self.upload is not None and not self.upload.complete:
+            return sf.SoundFile(GrowingFile(self.upload))
+        return sf.SoundFile(self.file_path)
+
+    def _wait_for_upload(self):
+        if self.upload is not None:
+            self.upload.wait_for(float("inf"))
+
+    @property
+    def duration(self) -> float:
+        """Duration of the file in seconds"""
+        return self.frames / self.sample_rate
+
+    def total_chunks(self, chunk_size: int) -> int:
+        """Number of chunks of `chunk_size` samples needed to cover the file"""
+        return int(np.ceil(self.frames / chunk_size))
+
+    def iter_chunks(self, chunk_size: int, skip: AbstractSet[int] = frozenset()) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield `(index, chunk)` pairs of mono `chunk_size`-sample chunks (the last one may be shorter).
+
+        Chunks whose index is in `skip` are not returned; with soundfile they are
+        not decoded at all.
+        """
+        if self.resampling:
+            yield from self._iter_resampled(chunk_size, skip)
+        elif self.backend == "soundfile":
+            yield from self._iter_soundfile(chunk_size, skip)
+        else:
+            yield from self._iter_audioread(chunk_size, skip)
+
+    def _iter_soundfile(self, chunk_size: int, skip: AbstractSet[int]) -> Iterator[Tuple[int, np.ndarray]]:
+        with self._open_soundfile() as f:
+            for index in range(self.total_chunks(chunk_size)):
+                if index in skip:
+                    continue
+                start = index * chunk_size
+                if f.tell() != start:
+                    f.seek(start)
+                block = f.read(chunk_size, dtype="float32", always_2d=True)
+                if len(block) == 0:
+                    return
+                yield index, self._to_mono(block)
+
+    def _iter_audioread(self, chunk_size: int, skip: AbstractSet[int]) -> Iterator[Tuple[int, np.ndarray]]:
+        import audioread
+
+        max_chunks = self.total_chunks(chunk_size)
+        index = 0
+        buffer = np.empty(chunk_size, dtype=np.float32)
+        filled = 0
+
+        self._wait_for_upload()
+        with audioread.audio_open(self.file_path) as f:
+            for raw in f:
+                # audioread yields interleaved 16-bit little-endian PCM
+                samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+                samples = self._to_mono(samples.reshape(-1, self.channels))
+
+                offset = 0
+                while offset < len(samples):
+                    take = min(chunk_size - filled, len(samples) - offset)
+                    # Skipped chunks still have to be decoded, but are not copied
+                    if index not in skip:
+                        buffer[filled:filled + take] = samples[offset:offset + take]
+                    filled += take
+                    offset += take
+
+                    if filled == chunk_size:
+                        if index not in skip:
+                            yield index, buffer.copy()
+                        index += 1
+                        filled = 0
+                        if index == max_chunks:
+                            return
+
+        if filled > 0 and index < max_chunks and index not in skip:
+            yield index, buffer[:filled].copy()
+
+    def _iter_resampled(self, chunk_size: int, skip: AbstractSet[int]) -> Iterator[Tuple[int, np.ndarray]]:
+        total = self.total_chunks(chunk_size)
+        if not self.seekable:
+            # Every restart would decode from the start of the file again, so run a single
+            # stream from the first wanted chunk to the last and drop the skipped ones
+            wanted = [index for index in range(total) if index not in skip]
+            if wanted:
+                for index, chunk in self._resample_run(wanted[0], wanted[-1] + 1, chunk_size):
+                    if index not in skip:
+                        yield index, chunk
+            return
+
+        index = 0
+        while index < total:
+            if index in skip:
+                index += 1
+                continue
+            # Resample each run of consecutive wanted chunks with one continuous stream
+            stop = index
+            while stop < total and stop not in skip:
+                stop += 1
+            yield from self._resample_run(index, stop, chunk_size)
+            index = stop
+
+    def _resample_run(self, first: int, stop: int, chunk_size: int) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield chunks `first` to `stop - 1` from one resampling stream"""
+        import soxr
+
+        # Restart on an output sample that maps to a whole source sample, a little
+        # ahead of the first chunk; the output before the chunk only settles the filter
+        step = self.sample_rate // gcd(self.sample_rate, self.source_rate)
+        target = first * chunk_size
+        restart = max(target - int(RESAMPLE_PREROLL_SECONDS * self.sample_rate), 0) // step * step
+        discard = target - restart
+        source_start = restart * self.source_rate // self.sample_rate
+        stream = soxr.ResampleStream(self.source_rate, self.sample_rate, 1, dtype="float32", quality="HQ")
+
+        buffer = np.empty(chunk_size, dtype=np.float32)
+        filled = 0
+        index = first
+
+        def emit(resampled: np.ndarray):
+            nonlocal discard, filled, index
+            if discard:
+                dropped = min(discard, len(resampled))
+                resampled = resampled[dropped:]
+                discard -= dropped
+            offset = 0
+            while offset < len(resampled) and index < stop:
+                take = min(chunk_size - filled, len(resampled) - offset)
+                buffer[filled:filled + take] = resampled[offset:offset + take]
+                filled += take
+                offset += take
+                if filled == chunk_size:
+                    yield index, buffer.copy()
+                    index += 1
+                    filled = 0
+
+        for block in self._iter_source_blocks(source_start):
+            yield from emit(stream.resample_chunk(block))
+            if index >= stop:
+                return
+        yield from emit(stream.resample_chunk(np.zeros(0, dtype=np.float32), last=True))
+
+        # The tail is cut to the length a resampling of the whole file would have
+        filled = min(filled, self.frames - index * chunk_size)
+        if filled > 0 and index < stop:
+            yield index, buffer[:filled].copy()
+
+    def _iter_source_blocks(self, start: int) -> Iterator[np.ndarray]:
+        """Mono float32 blocks of source samples from source frame `start` to the end"""
+        if self.backend == "soundfile":
+            with self._open_soundfile() as f:
+                if start:
+                    f.seek(start)
+                while True:
+                    block = f.read(RESAMPLE_BLOCK_FRAMES, dtype="float32", always_2d=True)
+                    if len(block) == 0:
+                        return
+                    yield self._to_mono(block)
+        else:
+            import audioread
+
+            self._wait_for_upload()
+            position = 0
+            with audioread.audio_open(self.file_path) as f:
+                for raw in f:
+                    samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768.0
+                    samples = self._to_mono(samples.reshape(-1, self.channels))
+                    # Compressed streams cannot seek, so decode and drop everything before `start`
+                    if position + len(samples) > start:
+                        yield samples[max(start - position, 0):]
+                    position += len(samples)
+
+    @staticmethod
+    def _to_mono(block: np.ndarray) -> np.ndarray:
+        if block.shape[1] == 1:
+            return block[:, 0]
+        return block.mean(axis=1, dtype=np.float32)
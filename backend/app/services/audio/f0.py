@@ -0,0 +1,121 @@
+import numpy as np
+from scipy.fft import irfft, next_fast_len, rfft
+from typing import NamedTuple
+
+class F0Track(NamedTuple):
+    """Frame-wise fundamental frequency of a signal"""
+    times: np.ndarray
+    # Hz, NaN where the frame is unvoiced
+    f0: np.ndarray
+    voiced: np.ndarray
+
+    @property
+    def voiced_f0(self) -> np.ndarray:
+        return self.f0[self.voiced]
+
+    def median(self) -> float:
+        """Median F0 over voiced frames (0.0 when nothing is voiced)"""
+        voiced = self.voiced_f0
+        return float(np.median(voiced)) if len(voiced) > 0 else 0.0
+
+    def std(self) -> float:
+        """Standard deviation (Hz) of F0 over voiced frames"""
+        voiced = self.voiced_f0
+        return float(np.std(voiced)) if len(voiced) > 0 else 0.0
+
+    def jitter(self) -> float:
+        """Relative period perturbation: mean |period difference| of adjacent voiced frames over the mean period"""
+        both_voiced = self.voiced[1:] & self.voiced[:-1]
+        if not np.any(both_voiced):
+            return 0.0
+        periods = 1.0 / self.f0
+        differences = np.abs(np.diff(periods))[both_voiced]
+        return float(np.mean(differences) / np.mean(periods[self.voiced]))
+
+class F0Tracker:
+    """Vectorized YIN fundamental frequency tracker.
+
+    For a block of frames at once, the difference function is computed from an
+    FFT cross-correlation plus cumulative energies, normalized by its cumulative
+    mean, and each frame takes the first dip below `threshold` (refined by
+    parabolic interpolation). Frames without such a dip, or too quiet to carry
+    pitch, are unvoiced. Frames are centered like the STFT frames and processed
+    in blocks of `block_frames`, so memory stays bounded for long chunks.
+    """
+
+    def __init__(self, sample_rate: int, frame_length: int = 2048, hop_length: int = 512,
+                 fmin: float = 65.0, fmax: float = 1000.0, threshold: float = 0.1,
+                 block_frames: int = 256, silence_db: float = -60.0):
+        self.sample_rate = sample_rate
+        self.hop_length = hop_length
+        self.threshold = threshold
+        self.block_frames = block_frames
+
+        self.min_period = max(2, int(np.floor(sample_rate / fmax)))
+        self.max_period = int(np.ceil(sample_rate / fmin))
+        # Analysis frames must hold the integration window plus the longest lag
+        self.frame_length = max(frame_length, 2 * self.max_period + 2)
+        self.window_length = self.frame_length - self.max_period
+        self._fft_length = next_fast_len(self.frame_length + self.window_length)
+        self._tau = np.arange(1, self.max_period + 1, dtype=np.float32)
+        # Mean square energy below which a frame counts as silence
+        self._silence_energy = 10 ** (silence_db / 10) * self.window_length
+
+    def track(self, audio: np.ndarray) -> F0Track:
+        """F0 of every centered frame of `audio`"""
+        n_frames = 1 + len(audio) // self.hop_length
+        pad = self.frame_length // 2
+        padded = np.pad(np.asarray(audio, dtype=np.float32), pad)
+        frames = np.lib.stride_tricks.sliding_window_view(padded, self.frame_length)[::self.hop_length][:n_frames]
+
+        f0 = np.full(n_frames, np.nan, dtype=np.float32)
+        for start in range(0, n_frames, self.block_frames):
+            block = frames[start:start + self.block_frames]
+            f0[start:start + len(block)] = self.estimate(block)
+
+        return F0Track(
+            times=np.arange(n_frames) * self.hop_length / self.sample_rate,
+            f0=f0,
+            voiced=~np.isnan(f0)
+        )
+
+    def estimate(self, frames: np.ndarray) -> np.ndarray:
+        """F0 (Hz, NaN when unvoiced) of each row of a (frames, frame_length) array"""
+        w = self.window_length
+
+        # Cross-correlation of each frame's first `w` samples with the frame, for lags 0..max_period
+        spectrum = np.conj(rfft(frames[:, :w], self._fft_length, axis=1)) * rfft(frames, self._fft_length, axis=1)
+        correlation = irfft(spectrum, self._fft_length, axis=1)[:, :self.max_period + 1]
+
+        # Energy of the window shifted by each lag, from cumulative sums of squares
+        squares = np.cumsum(np.square(frames, dtype=np.float64), axis=1)
+        squares = np.pad(squares, ((0, 0), (1, 0)))
+        lags = np.arange(self.max_period + 1)
+        shifted_energy = squares[:, lags + w] - squares[:, lags]
+
+        difference = shifted_energy[:, :1] + shifted_energy - 2 * correlation
+        np.maximum(difference, 0.0, out=difference)
+
+        # Cumulative mean normalized difference, lags 1..max_period
+        cumulative_mean = np.cumsum(difference[:, 1:], axis=1) / self._tau
+        normalized = difference[:, 1:] / np.maximum(cumulative_mean, 1e-12)
+        normalized = normalized[:, self.min_period - 1:]
+
+        # First local minimum below the threshold
+        is_trough = np.zeros(normalized.shape, dtype=bool)
+        is_trough[:, 1:-1] = (normalized[:, 1:-1] <= normalized[:, :-2]) & (normalized[:, 1:-1] < normalized[:, 2:])
+        candidates = is_trough & (normalized < self.threshold)
+        has_candidate = candidates.any(axis=1)
+        index = np.argmax(candidates, axis=1)
+
+        # Parabolic interpolation around the chosen lag
+        rows = np.arange(len(frames))
+        inner = np.clip(index, 1, normalized.shape[1] - 2)
+        left, center, right = normalized[rows, inner - 1], normalized[rows, inner], normalized[rows, inner + 1]
+        curvature = left - 2 * center + right
+        shift = np.where(np.abs(curvature) > 1e-12, 0.5 * (left - right) / np.where(curvature == 0, 1, curvature), 0.0)
+        shift = np.where(index == inner, np.clip(shift, -1, 1), 0.0)
+        period = index + self.min_period + shift
+
+        voiced = has_candidate & (shifted_energy[:, 0] > self._silence_energy)
+        return np.where(voiced, self.sample_rate / period, np.nan)
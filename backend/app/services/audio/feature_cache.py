@@ -0,0 +1,163 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+from pydantic_core import from_json, to_json
+
+logger = logging.getLogger(__name__)
+
+def file_content_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, read in bounded blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+class FeatureCache:
+    """Content-addressed cache of per-chunk feature groups.
+
+    Entries are keyed by the audio content hash, chunking parameters, sample
+    rate and feature type, so re-running a file with a different feature
+    selection only computes the groups that are missing. Lookups go through a
+    size-bounded in-memory LRU first and then a size-bounded disk tier; both
+    evict least recently used entries. Safe to call from worker threads.
+    """
+
+    def __init__(self, cache_dir: str, memory_bytes: int, disk_bytes: int, namespace: str = ""):
+        self.cache_dir = cache_dir
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.namespace = namespace
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._disk_size = sum(entry.stat().st_size for entry in self._disk_entries())
+
+    def key(self, content_hash: str, chunk_duration: float, chunk_index: int,
+            sample_rate: int, feature_type: str) -> str:
+        """Cache key for one feature group of one chunk"""
+        parts = (self.namespace, content_hash, repr(float(chunk_duration)), str(chunk_index), str(sample_rate), feature_type)
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Cached value for `key`, or None"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return from_json(data)
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Refresh the access time used for disk eviction
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+
+        with self._lock:
+            self._counters["disk_hits"] += 1
+            self._remember(key, data)
+        return from_json(data)
+
+    def put_many(self, entries: Iterable[Tuple[str, Dict[str, Any]]]):
+        """Store values in both tiers"""
+        for key, value in entries:
+            data = to_json(value)
+            with self._lock:
+                self._remember(key, data)
+                self._counters["writes"] += 1
+
+            path = self._path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                # Overwriting an entry only changes the disk tier by the size difference
+                try:
+                    replaced = os.stat(path).st_size
+                except FileNotFoundError:
+                    replaced = 0
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Could not write feature cache entry: {str(e)}")
+                continue
+
+            with self._lock:
+                self._disk_size += len(data) - replaced
+                over_limit = self._disk_size > self.disk_bytes
+            if over_limit:
+                self._evict_disk()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and tier sizes"""
+        with self._lock:
+            counters = dict(self._counters)
+            memory_entries = len(self._memory)
+            memory_size = self._memory_size
+            disk_size = self._disk_size
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        return {
+            **counters,
+            "hits": hits,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "memory_entries": memory_entries,
+            "memory_bytes": memory_size,
+            "disk_bytes": disk_size
+        }
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _remember(self, key: str, data: bytes):
+        # Caller holds the lock
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_size -= len(previous)
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_size -= len(evicted)
+
+    def _disk_entries(self):
+        for shard in os.scandir(self.cache_dir):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if entry.name.endswith(".json"):
+                        yield entry
+
+    def _evict_disk(self):
+        """Delete least recently used files until the disk tier is back under 90% of its limit"""
+        entries = sorted(
+            ((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._disk_entries())
+        )
+        total = sum(size for _, size, _ in entries)
+        target = self.disk_bytes * 0.9
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            evicted += 1
+
+        with self._lock:
+            self._disk_size = total
+            self._counters["evictions"] += evicted
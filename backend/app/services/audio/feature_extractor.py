@@ -1,81 +1,196 @@
-import librosa
 import numpy as np
-from scipy.io import wavfile
 from scipy.signal import find_peaks
-from scipy.fft import rfft, rfftfreq
 import logging
+from collections import OrderedDict
 from typing import Dict, List, Any, Optional, Tuple
-from ...schemas.audio import AudioFeatureType, AcousticFeatures, SpectralFeatures, ParalinguisticFeatures
+from ...core.config import settings
+from ...core.metrics import StageTimings, stage
+from ...schemas.audio import AudioFeatureType, AcousticFeatures, SpectralFeatures, SpectralTimeSeries, ParalinguisticFeatures
+from .chunk_analysis import ChunkAnalysis, moving_average
+from .decoded_cache import load_mapped
+from .f0 import F0Tracker
+from .mfcc import MFCCEngine
+from .stft import STFTEngine
+from .vad import VoiceActivityDetector, speech_activity
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever a change to the extraction code alters its results (invalidates cached features)
+FEATURE_EXTRACTOR_VERSION = 5
+
+# Feature types extract_features produces output for
+EXTRACTED_FEATURE_TYPES = (AudioFeatureType.ACOUSTIC, AudioFeatureType.PARALINGUISTIC)
+
+# F1, F2, F3 search ranges (Hz)
+FORMANT_RANGES = [(300, 1000), (850, 2500), (1950, 3000)]
+
+def estimate_formants(frequencies: np.ndarray, spectrum: np.ndarray) -> List[float]:
+    """Strongest frequency of the magnitude spectrum in each formant range"""
+    formants = []
+    for f_min, f_max in FORMANT_RANGES:
+        mask = (frequencies >= f_min) & (frequencies <= f_max)
+        if np.any(mask):
+            formant_peak = frequencies[mask][np.argmax(spectrum[mask])]
+            formants.append(float(formant_peak))
+        else:
+            formants.append(0.0)
+    return formants
+
+def spectrum_hnr(spectrum: np.ndarray) -> float:
+    """Harmonics-to-noise ratio (dB) of a magnitude spectrum, treating peaks above the mean as harmonics"""
+    harmonic_peaks, _ = find_peaks(spectrum, height=np.mean(spectrum))
+    if len(harmonic_peaks) == 0:
+        return 0.0
+    harmonic_energy = np.sum(spectrum[harmonic_peaks])
+    total_energy = np.sum(spectrum)
+    noise_energy = total_energy - harmonic_energy
+    return float(10 * np.log10(harmonic_energy / noise_energy)) if noise_energy > 0 else 40.0
+
 class FeatureExtractor:
-    def __init__(self, sample_rate: int = 22050):
+    def __init__(self, sample_rate: int = 22050, spectral_time_series: Optional[bool] = None):
         self.sample_rate = sample_rate
+        self.spectral_time_series = (
+            settings.SPECTRAL_TIME_SERIES if spectral_time_series is None else spectral_time_series
+        )
+        # Window and frame buffers are reused across chunks
+        self.stft = STFTEngine(
+            sample_rate,
+            n_fft=settings.STFT_N_FFT,
+            hop_length=settings.STFT_HOP_LENGTH
+        )
+        # Mel filterbank and DCT matrix are built once per configuration
+        self.mfcc = MFCCEngine(sample_rate, n_fft=settings.STFT_N_FFT)
+        self.f0_tracker = F0Tracker(sample_rate, frame_length=settings.STFT_N_FFT, hop_length=settings.STFT_HOP_LENGTH)
+        # Also finds the pauses chunk boundaries are aligned to, even when silence is not skipped
+        self.vad = VoiceActivityDetector(
+            sample_rate,
+            energy_db=settings.VAD_ENERGY_DB,
+            noise_margin_db=settings.VAD_NOISE_MARGIN_DB,
+            max_flatness=settings.VAD_MAX_FLATNESS,
+            min_speech=settings.VAD_MIN_SPEECH,
+            min_silence=settings.VAD_MIN_SILENCE,
+            padding=settings.VAD_PADDING
+        )
+        self.skip_silence = settings.VAD_ENABLED
+
+    @property
+    def cache_namespace(self) -> str:
+        """Identifies everything besides the input audio that affects extracted values"""
+        namespace = f"{FEATURE_EXTRACTOR_VERSION}:{self.stft.n_fft}:{self.stft.hop_length}:{int(self.spectral_time_series)}"
+        return f"{namespace}:vad={self.vad.namespace}" if self.skip_silence else namespace
+
+    def extract_features(self, audio_chunk: np.ndarray, feature_types: List[str],
+                         timings: Optional[StageTimings] = None, speech: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Extract requested features from the audio chunk, recording stage times in `timings` if given.
+
+        When silence is skipped, pitch and paralinguistic features only see the
+        `speech` regions (detected here if not given), which are returned as the
+        `speech` group.
+        """
+        return self._extract_from_analysis(self._analyze(audio_chunk, feature_types, timings, speech), feature_types)
+
+    def extract_features_batch(self, audio_chunks: List[np.ndarray], feature_types: List[str],
+                               timings: Optional[StageTimings] = None,
+                               speech: Optional[List[np.ndarray]] = None) -> List[Dict[str, Any]]:
+        """
+        Extract requested features from several chunks.
+
+        MFCCs of equal-length chunks are computed together: their mel frames are
+        stacked and log-compressed and transformed as a single matrix operation.
+        Stage times of all chunks are summed in `timings`.
+        """
+        speech = speech or [None] * len(audio_chunks)
+        analyses = [
+            self._analyze(audio_chunk, feature_types, timings, regions)
+            for audio_chunk, regions in zip(audio_chunks, speech)
+        ]
+        
+        if AudioFeatureType.ACOUSTIC in feature_types:
+            by_length: Dict[int, List[ChunkAnalysis]] = {}
+            for analysis in analyses:
+                by_length.setdefault(analysis.num_samples, []).append(analysis)
+            for group in by_length.values():
+                mel_power = np.stack([analysis.mel_power for analysis in group])
+                with stage(timings, "mfcc"):
+                    means = self.mfcc.mfcc_means(mel_power)
+                for analysis, chunk_means in zip(group, means):
+                    analysis.mfcc_means = chunk_means
+        
+        return [self._extract_from_analysis(analysis, feature_types) for analysis in analyses]
+
+    def _analyze(self, audio_chunk: np.ndarray, feature_types: List[str],
+                 timings: Optional[StageTimings] = None, speech: Optional[np.ndarray] = None) -> ChunkAnalysis:
+        # Intermediate results shared between feature groups; mel frames are only needed for MFCCs
+        mfcc = self.mfcc if AudioFeatureType.ACOUSTIC in feature_types else None
+        if not self.skip_silence:
+            speech = None
+        elif speech is None:
+            with stage(timings, "vad"):
+                speech = self.vad.detect(audio_chunk)
+        return ChunkAnalysis(audio_chunk, self.sample_rate, self.stft, mfcc, self.f0_tracker, timings, speech)
 
-    def extract_features(self, audio_chunk: np.ndarray, feature_types: List[str]) -> Dict[str, Any]:
-        """Extract requested features from the audio chunk"""
+    def _extract_from_analysis(self, analysis: ChunkAnalysis, feature_types: List[str]) -> Dict[str, Any]:
         features = {}
+        # Feature group times include the shared analysis stages the group computed first
+        timings = analysis.timings
         
         try:
             for feature_type in feature_types:
                 if feature_type == AudioFeatureType.ACOUSTIC:
-                    acoustic_features = self._extract_acoustic_features(audio_chunk)
-                    features["acoustic"] = acoustic_features.model_dump()
+                    with stage(timings, "acoustic"):
+                        acoustic_features = self._extract_acoustic_features(analysis)
+                    with stage(timings, "serialize"):
+                        features["acoustic"] = acoustic_features.model_dump()
                 elif feature_type == AudioFeatureType.PARALINGUISTIC:
-                    paralinguistic_features = self._extract_paralinguistic_features(audio_chunk)
-                    features["paralinguistic"] = paralinguistic_features.model_dump()
+                    with stage(timings, "paralinguistic"):
+                        paralinguistic_features = self._extract_paralinguistic_features(analysis)
+                    with stage(timings, "serialize"):
+                        features["paralinguistic"] = paralinguistic_features.model_dump()
                 elif feature_type == AudioFeatureType.SPEAKER:
                     # Not implemented yet
                     pass
                 elif feature_type == AudioFeatureType.COGNITIVE:
                     # Not implemented yet
                     pass
+            if analysis.speech is not None:
+                features["speech"] = speech_activity(analysis.speech, self.sample_rate, analysis.num_samples)
         except Exception as e:
             logger.error(f"Error extracting features: {str(e)}")
             raise
             
         return features
 
-    def _extract_acoustic_features(self, audio_chunk: np.ndarray) -> AcousticFeatures:
+    def _extract_acoustic_features(self, analysis: ChunkAnalysis) -> AcousticFeatures:
         """Extract acoustic features using optimized computations"""
         try:
-            # 1. Compute FFT for frequency-domain features
-            N = len(audio_chunk)
-            yf = rfft(audio_chunk)
-            xf = rfftfreq(N, 1 / self.sample_rate)
-            spectrum = np.abs(yf)
+            audio_chunk = analysis.audio
             
-            # 2. MFCCs (using librosa for this as it's optimized)
-            mfccs = librosa.feature.mfcc(y=audio_chunk, sr=self.sample_rate, n_mfcc=13)
-            mfcc_means = mfccs.mean(axis=1).tolist()
+            # 1. Frame-averaged spectrum for frequency-domain features (shared through the analysis context)
+            xf = analysis.frequencies
+            spectrum = analysis.spectrum
+            
+            # 2. MFCCs from the mel projection of the shared STFT frames
+            mfcc_means = analysis.mfcc_means.tolist()
 
-            # 3. Pitch using peak detection in frequency domain
-            peaks, _ = find_peaks(spectrum, height=np.max(spectrum) * 0.1)
-            pitch = float(xf[peaks[0]]) if len(peaks) > 0 else 0.0
+            # 3. Pitch as the median F0 of voiced frames (of the speech regions only, when silence is skipped)
+            voiced = analysis.voiced
+            pitch = voiced.f0.median() if voiced.num_samples > 0 else 0.0
 
             # 4. Formants using peak detection in specific frequency ranges
-            formant_ranges = [(300, 1000), (850, 2500), (1950, 3000)]  # F1, F2, F3 ranges
-            formants = []
-            for f_min, f_max in formant_ranges:
-                mask = (xf >= f_min) & (xf <= f_max)
-                if np.any(mask):
-                    formant_peak = xf[mask][np.argmax(spectrum[mask])]
-                    formants.append(float(formant_peak))
-                else:
-                    formants.append(0.0)
+            formants = estimate_formants(xf, spectrum)
 
             # 5. Energy (RMS)
             energy = float(np.sqrt(np.mean(audio_chunk**2)))
 
             # 6. Zero-crossing rate
-            zcr = float(np.sum(np.abs(np.diff(np.signbit(audio_chunk)))) / (2 * len(audio_chunk)))
+            zcr = float(len(analysis.zero_crossings) / (2 * len(audio_chunk)))
 
             # 7. Spectral features
-            spectral = self._compute_spectral_features(spectrum, xf)
+            spectral = self._compute_spectral_features(analysis)
 
             # 8. Voice Onset Time (simplified)
-            envelope = np.abs(audio_chunk)
+            envelope = analysis.envelope
             onset_threshold = np.mean(envelope) + 0.5 * np.std(envelope)
             onsets = np.where(envelope > onset_threshold)[0]
             vot = float(onsets[0] / self.sample_rate) if len(onsets) > 0 else None
@@ -93,79 +208,69 @@ class FeatureExtractor:
             logger.error(f"Error in acoustic feature extraction: {str(e)}")
             raise
 
-    def _compute_spectral_features(self, spectrum: np.ndarray, frequencies: np.ndarray) -> SpectralFeatures:
-        """Compute spectral features using optimized numpy operations"""
+    def _compute_spectral_features(self, analysis: ChunkAnalysis) -> SpectralFeatures:
+        """Summarize per-frame spectral descriptors from the framed STFT"""
         try:
-            # Normalize spectrum
-            spectrum_norm = spectrum / np.sum(spectrum)
-            
-            # Spectral centroid
-            centroid = float(np.sum(frequencies * spectrum_norm))
+            frames = analysis.frame_spectra
             
-            # Spectral bandwidth
-            bandwidth = float(np.sqrt(np.sum(((frequencies - centroid) ** 2) * spectrum_norm)))
-            
-            # Spectral flux (simplified)
-            flux = float(np.sum(np.diff(spectrum_norm) ** 2))
-            
-            # Spectral rolloff
-            cumsum = np.cumsum(spectrum_norm)
-            rolloff_point = np.where(cumsum >= 0.85)[0]
-            rolloff = float(frequencies[rolloff_point[0]]) if len(rolloff_point) > 0 else 0.0
+            series = None
+            if self.spectral_time_series:
+                series = SpectralTimeSeries(
+                    times=frames.times.tolist(),
+                    centroid=frames.centroid.tolist(),
+                    bandwidth=frames.bandwidth.tolist(),
+                    flux=frames.flux.tolist(),
+                    rolloff=frames.rolloff.tolist()
+                )
             
             return SpectralFeatures(
-                centroid=centroid,
-                bandwidth=bandwidth,
-                flux=flux,
-                rolloff=rolloff
+                centroid=float(np.mean(frames.centroid)),
+                bandwidth=float(np.mean(frames.bandwidth)),
+                # Frame 0 has no previous frame to differ from
+                flux=float(np.mean(frames.flux[1:])) if len(frames.flux) > 1 else 0.0,
+                rolloff=float(np.mean(frames.rolloff)),
+                frames=series
             )
         except Exception as e:
             logger.error(f"Error in spectral feature computation: {str(e)}")
             raise
 
-    def _extract_paralinguistic_features(self, audio_chunk: np.ndarray) -> ParalinguisticFeatures:
+    def _extract_paralinguistic_features(self, analysis: ChunkAnalysis) -> ParalinguisticFeatures:
         """Extract paralinguistic features using optimized computations"""
         try:
-            # 1. Pitch Variability
-            yf = rfft(audio_chunk)
-            xf = rfftfreq(len(audio_chunk), 1 / self.sample_rate)
-            spectrum = np.abs(yf)
-            peaks, _ = find_peaks(spectrum, height=np.max(spectrum) * 0.1)
-            pitch_values = xf[peaks]
-            pitch_variability = float(np.std(pitch_values)) if len(pitch_values) > 0 else 0.0
-
-            # 2. Speech Rate using energy-based syllable detection
-            envelope = np.abs(audio_chunk)
-            envelope_smooth = np.convolve(envelope, np.ones(512)/512, mode='same')
-            peaks, _ = find_peaks(envelope_smooth, height=np.mean(envelope_smooth) * 1.5)
-            duration = len(audio_chunk) / self.sample_rate
+            # Computed from the speech regions only, when silence is skipped
+            analysis = analysis.voiced
+            if analysis.num_samples == 0:
+                return ParalinguisticFeatures(pitch_variability=0.0, speech_rate=0.0, jitter=0.0, shimmer=0.0, hnr=0.0)
+
+            # 1. Pitch Variability over voiced frames
+            spectrum = analysis.spectrum
+            pitch_variability = analysis.f0.std()
+
+            # 2. Speech Rate using energy-based syllable detection on the decimated envelope,
+            #    smoothed over ~512 samples
+            envelope = analysis.decimated_envelope
+            width = max(1, int(round(512 * envelope.rate / self.sample_rate)))
+            with stage(analysis.timings, "peaks"):
+                envelope_smooth = moving_average(envelope.mean, width)
+                peaks, _ = find_peaks(envelope_smooth, height=np.mean(envelope_smooth) * 1.5)
+            duration = analysis.duration
             speech_rate = float(len(peaks) / duration) if duration > 0 else 0.0
 
-            # 3. Jitter calculation using zero-crossings
-            zero_crossings = np.where(np.diff(np.signbit(audio_chunk)))[0]
-            if len(zero_crossings) > 1:
-                periods = np.diff(zero_crossings)
-                jitter = float(np.std(periods) / np.mean(periods))
-            else:
-                jitter = 0.0
+            # 3. Jitter from the period perturbation of adjacent voiced frames
+            jitter = analysis.f0.jitter()
 
-            # 4. Shimmer calculation using local maxima
-            peaks, _ = find_peaks(envelope, distance=int(0.01 * self.sample_rate))
-            if len(peaks) > 1:
-                peak_amplitudes = envelope[peaks]
+            # 4. Shimmer calculation using the amplitude maximum of every 10 ms
+            blocks_per_peak = max(1, int(round(0.01 * envelope.rate)))
+            peak_amplitudes = np.maximum.reduceat(envelope.peak, np.arange(0, len(envelope.peak), blocks_per_peak))
+            if len(peak_amplitudes) > 1:
                 shimmer = float(np.std(peak_amplitudes) / np.mean(peak_amplitudes))
             else:
                 shimmer = 0.0
 
             # 5. Harmonics-to-Noise Ratio
-            harmonic_peaks, _ = find_peaks(spectrum, height=np.mean(spectrum))
-            if len(harmonic_peaks) > 0:
-                harmonic_energy = np.sum(spectrum[harmonic_peaks])
-                total_energy = np.sum(spectrum)
-                noise_energy = total_energy - harmonic_energy
-                hnr = float(10 * np.log10(harmonic_energy / noise_energy)) if noise_energy > 0 else 40.0
-            else:
-                hnr = 0.0
+            with stage(analysis.timings, "peaks"):
+                hnr = spectrum_hnr(spectrum)
 
             return ParalinguisticFeatures(
                 pitch_variability=pitch_variability,
@@ -178,14 +283,19 @@ class FeatureExtractor:
             logger.error(f"Error in paralinguistic feature extraction: {str(e)}")
             raise
 
+    # The librosa-based helpers below import librosa on use, so extraction
+    # workers only pay for numpy and scipy at startup.
+
     def _extract_pitch(self, audio_chunk: np.ndarray) -> float:
         """Extract fundamental frequency (pitch)"""
+        import librosa
         pitches, magnitudes = librosa.piptrack(y=audio_chunk, sr=self.sample_rate)
         pitch = float(pitches[magnitudes > 0.5].mean()) if len(pitches[magnitudes > 0.5]) > 0 else 0.0
         return pitch
 
     def _extract_emotion_scores(self, audio_chunk: np.ndarray) -> Dict[str, float]:
         """Extract emotion-related features (arousal and valence)"""
+        import librosa
         # Calculate basic audio features that correlate with emotions
         spectral_centroid = librosa.feature.spectral_centroid(y=audio_chunk, sr=self.sample_rate).mean()
         spectral_rolloff = librosa.feature.spectral_rolloff(y=audio_chunk, sr=self.sample_rate).mean()
@@ -202,6 +312,7 @@ class FeatureExtractor:
 
     def _extract_speaking_rate(self, audio_chunk: np.ndarray) -> float:
         """Estimate speaking rate in syllables per second"""
+        import librosa
         # Detect onsets as a proxy for syllables
         onset_env = librosa.onset.onset_strength(y=audio_chunk, sr=self.sample_rate)
         onsets = librosa.onset.onset_detect(onset_envelope=onset_env, sr=self.sample_rate)
@@ -213,32 +324,9 @@ class FeatureExtractor:
         return float(speaking_rate)
 
     def _calculate_pitch_variability(self, audio_chunk: np.ndarray) -> float:
-        """Calculate pitch variability using PYIN algorithm for better F0 estimation"""
+        """Calculate pitch variability (F0 standard deviation in Hz) from the YIN F0 track"""
         try:
-            # Use PYIN for more accurate pitch tracking
-            f0, voiced_flag, _ = librosa.pyin(
-                audio_chunk,
-                fmin=librosa.note_to_hz('C2'),  # ~65 Hz
-                fmax=librosa.note_to_hz('C7'),  # ~2093 Hz
-                sr=self.sample_rate,
-                frame_length=2048
-            )
-            
-            # Filter out unvoiced segments and zeros
-            f0_voiced = f0[voiced_flag & (f0 > 0)]
-            
-            if len(f0_voiced) > 0:
-                # Calculate normalized standard deviation
-                pitch_mean = np.mean(f0_voiced)
-                pitch_std = np.std(f0_voiced)
-                pitch_variability = float(pitch_std / pitch_mean if pitch_mean > 0 else 0.0)
-                
-                # Scale to a more interpretable range (0-100 Hz typical range)
-                pitch_variability *= 100
-            else:
-                pitch_variability = 0.0
-                
-            return pitch_variability
+            return self.f0_tracker.track(audio_chunk).std()
             
         except Exception as e:
             logger.error(f"Error calculating pitch variability: {str(e)}")
@@ -246,6 +334,7 @@ class FeatureExtractor:
 
     def _calculate_speech_rate(self, audio_chunk: np.ndarray) -> float:
         """Calculate speech rate using enhanced syllable detection"""
+        import librosa
         try:
             # 1. Get onset envelope with custom parameters
             hop_length = 512
@@ -284,27 +373,17 @@ class FeatureExtractor:
 
     def _calculate_voice_quality(self, audio_chunk: np.ndarray) -> tuple[float, float]:
         """Calculate jitter and shimmer using cycle-to-cycle analysis"""
+        import librosa
         try:
-            # 1. Get fundamental frequency using PYIN
-            f0, voiced_flag, _ = librosa.pyin(
-                audio_chunk,
-                fmin=librosa.note_to_hz('C2'),
-                fmax=librosa.note_to_hz('C7'),
-                sr=self.sample_rate
-            )
+            # 1. Get fundamental frequency from the YIN tracker
+            f0_track = self.f0_tracker.track(audio_chunk)
             
             # Get amplitude envelope
             hop_length = 256
             rms = librosa.feature.rms(y=audio_chunk, hop_length=hop_length)[0]
             
-            # Calculate jitter
-            f0_voiced = f0[voiced_flag]
-            if len(f0_voiced) > 1:
-                # Relative average perturbation (RAP)
-                f0_diff = np.abs(np.diff(f0_voiced))
-                jitter = float(np.mean(f0_diff) / np.mean(f0_voiced))
-            else:
-                jitter = 0.0
+            # Calculate jitter (relative period perturbation)
+            jitter = f0_track.jitter()
             
             # Calculate shimmer
             if len(rms) > 1:
@@ -326,6 +405,7 @@ class FeatureExtractor:
 
     def _calculate_hnr(self, audio_chunk: np.ndarray) -> float:
         """Calculate Harmonics-to-Noise Ratio using enhanced method"""
+        import librosa
         try:
             # 1. Compute STFT
             D = librosa.stft(audio_chunk)
@@ -356,4 +436,50 @@ class FeatureExtractor:
             
         except Exception as e:
             logger.error(f"Error calculating HNR: {str(e)}")
-            return 0.0 
\ No newline at end of file
+            return 0.0 
+
+
+# One extractor per sample rate, created lazily inside each pool worker process
+_worker_extractors: Dict[int, FeatureExtractor] = {}
+
+def _worker_extractor(sample_rate: int) -> FeatureExtractor:
+    extractor = _worker_extractors.get(sample_rate)
+    if extractor is None:
+        extractor = _worker_extractors[sample_rate] = FeatureExtractor(sample_rate=sample_rate)
+    return extractor
+
+def extract_chunk_features(audio_chunk: np.ndarray, feature_types: List[str], sample_rate: int,
+                           speech: Optional[np.ndarray] = None) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Process-pool entry point for extracting features from a single chunk; also returns the stage timings"""
+    timings = StageTimings()
+    features = _worker_extractor(sample_rate).extract_features(audio_chunk, feature_types, timings, speech)
+    return features, dict(timings)
+
+# Decoded-audio maps this worker has attached to, most recently used last
+_worker_maps: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_WORKER_MAP_LIMIT = 8
+
+def _worker_map(path: str) -> np.ndarray:
+    samples = _worker_maps.get(path)
+    if samples is None:
+        samples = _worker_maps[path] = load_mapped(path)
+        while len(_worker_maps) > _WORKER_MAP_LIMIT:
+            _worker_maps.popitem(last=False)
+    else:
+        _worker_maps.move_to_end(path)
+    return samples
+
+def extract_mapped_chunk_features(path: str, start: int, stop: int, feature_types: List[str], sample_rate: int,
+                                  speech: Optional[np.ndarray] = None) -> Tuple[Dict[str, Any], Dict[str, float]]:
+    """Process-pool entry point for a chunk of a memory-mapped decoded file; only the path and bounds are pickled"""
+    timings = StageTimings()
+    audio_chunk = _worker_map(path)[start:stop]
+    features = _worker_extractor(sample_rate).extract_features(audio_chunk, feature_types, timings, speech)
+    return features, dict(timings)
+
+def extract_chunk_features_batch(audio_chunks: List[np.ndarray], feature_types: List[str], sample_rate: int,
+                                 speech: Optional[List[np.ndarray]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, float]]:
+    """Process-pool entry point for extracting features from several chunks at once; also returns the summed stage timings"""
+    timings = StageTimings()
+    features = _worker_extractor(sample_rate).extract_features_batch(audio_chunks, feature_types, timings, speech)
+    return features, dict(timings)
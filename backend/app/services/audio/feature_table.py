@@ -0,0 +1,343 @@
+import io
+import numpy as np
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from ...schemas.audio import AudioFeatureType
+
+# Fixed-width blocks, one row of values per chunk
+MFCC_COEFFICIENTS = 13
+FORMANTS = 3
+
+# Scalar features of each group, by their path in the extractor output
+FEATURE_COLUMNS: Dict[AudioFeatureType, Tuple[str, ...]] = {
+    AudioFeatureType.ACOUSTIC: (
+        "pitch", "energy", "zcr",
+        "spectral.centroid", "spectral.bandwidth", "spectral.flux", "spectral.rolloff",
+        "vot"
+    ),
+    AudioFeatureType.PARALINGUISTIC: (
+        "pitch_variability", "speech_rate", "jitter", "shimmer", "hnr"
+    )
+}
+FEATURE_BLOCKS: Dict[AudioFeatureType, Tuple[Tuple[str, int], ...]] = {
+    AudioFeatureType.ACOUSTIC: (("mfcc", MFCC_COEFFICIENTS), ("formants", FORMANTS)),
+    AudioFeatureType.PARALINGUISTIC: ()
+}
+# Columns whose NaN means "not computed" rather than a value
+OPTIONAL_COLUMNS = ("acoustic.vot",)
+# Feature paths kept beside the table rather than in columns
+EXTRA_FEATURE_PATHS = ("transcription", "acoustic.spectral.frames", "speech.ratio", "speech.regions")
+
+# Output formats write_columns understands (arrow is the IPC stream format); parquet and arrow need pyarrow
+TABLE_FORMATS = ("npz", "parquet", "arrow")
+TABLE_MEDIA_TYPES = {
+    "npz": "application/octet-stream",
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream"
+}
+
+def _lookup(values: Dict[str, Any], path: str) -> Any:
+    for part in path.split("."):
+        if values is None:
+            return None
+        values = values.get(part)
+    return values
+
+def _as_float(value: np.float32) -> float:
+    # Shortest decimal that round-trips the float32, so 0.1 reads back as 0.1 rather than 0.10000000149011612
+    return float(str(value))
+
+def _assign(values: Dict[str, Any], path: str, value: Any):
+    *parents, name = path.split(".")
+    for part in parents:
+        values = values.setdefault(part, {})
+    values[name] = value
+
+class FeatureTable:
+    """Chunk features as columns: one float32 array per scalar feature and a fixed-width block per vector.
+
+    Column names are `<group>.<path>`, e.g. `acoustic.spectral.centroid` or
+    `acoustic.mfcc` (shape `(rows, 13)`). Missing values (a feature group not
+    computed for a row, or an optional feature like VOT) are NaN. Rows are
+    appended, and storage grows by doubling; `set` overwrites the features of
+    an existing row.
+    """
+
+    def __init__(self, feature_types: Iterable[AudioFeatureType], capacity: int = 64):
+        self.feature_types = [ft for ft in feature_types if ft in FEATURE_COLUMNS]
+        self.size = 0
+        self._capacity = max(capacity, 1)
+        # Which rows have each feature group
+        self._present: Dict[AudioFeatureType, np.ndarray] = {
+            feature_type: np.zeros(self._capacity, dtype=bool) for feature_type in self.feature_types
+        }
+        self._columns: Dict[str, np.ndarray] = {
+            "chunk_id": np.zeros(self._capacity, dtype=np.int32),
+            "start_time": np.zeros(self._capacity, dtype=np.float64),
+            "end_time": np.zeros(self._capacity, dtype=np.float64)
+        }
+        for feature_type in self.feature_types:
+            for path in FEATURE_COLUMNS[feature_type]:
+                self._columns[f"{feature_type.value}.{path}"] = np.full(self._capacity, np.nan, dtype=np.float32)
+            for path, width in FEATURE_BLOCKS[feature_type]:
+                self._columns[f"{feature_type.value}.{path}"] = np.full((self._capacity, width), np.nan, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, chunk_id: int, start_time: float, end_time: float, features: Dict[str, Any]):
+        """Add a row from extractor output (`{"acoustic": {...}, "paralinguistic": {...}}`)"""
+        if self.size == self._capacity:
+            self._grow()
+        row = self.size
+        self._columns["chunk_id"][row] = chunk_id
+        self._columns["start_time"][row] = start_time
+        self._columns["end_time"][row] = end_time
+        self.size += 1
+        self.set(row, features)
+
+    def set(self, row: int, features: Dict[str, Any]):
+        """Write the feature groups present in `features` into an existing row"""
+        for feature_type in self.feature_types:
+            group = features.get(feature_type.value)
+            if group is None:
+                continue
+            for path in FEATURE_COLUMNS[feature_type]:
+                value = _lookup(group, path)
+                self._columns[f"{feature_type.value}.{path}"][row] = np.nan if value is None else value
+            for path, width in FEATURE_BLOCKS[feature_type]:
+                values = group.get(path) or []
+                block = self._columns[f"{feature_type.value}.{path}"][row]
+                block[:] = np.nan
+                block[:min(width, len(values))] = values[:width]
+            self._present[feature_type][row] = True
+
+    def set_bounds(self, row: int, start_time: float, end_time: float):
+        self._columns["start_time"][row] = start_time
+        self._columns["end_time"][row] = end_time
+
+    def has(self, row: int, feature_type: AudioFeatureType) -> bool:
+        return feature_type in self._present and bool(self._present[feature_type][row])
+
+    def row(self, row: int) -> Dict[str, Any]:
+        """Feature groups of a row in the extractor's output layout"""
+        features = {}
+        for feature_type in self.feature_types:
+            if not self._present[feature_type][row]:
+                continue
+            group: Dict[str, Any] = {}
+            for path in FEATURE_COLUMNS[feature_type]:
+                _assign(group, path, self.value(row, f"{feature_type.value}.{path}"))
+            for path, _ in FEATURE_BLOCKS[feature_type]:
+                group[path] = self.value(row, f"{feature_type.value}.{path}")
+            features[feature_type.value] = group
+        return features
+
+    def value(self, row: int, name: str) -> Any:
+        """One column of a row: a float (None for a missing optional feature) or a list for a block"""
+        value = self._columns[name][row]
+        if value.ndim:
+            return [_as_float(item) for item in value[~np.isnan(value)]]
+        return None if name in OPTIONAL_COLUMNS and np.isnan(value) else _as_float(value)
+
+    def has_column(self, name: str) -> bool:
+        return name in self._columns
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Views of the filled rows of every column"""
+        return {name: column[:self.size] for name, column in self._columns.items()}
+
+    def _grow(self):
+        self._capacity *= 2
+        for name, column in self._columns.items():
+            grown = np.full((self._capacity,) + column.shape[1:], np.nan if column.dtype.kind == "f" else 0, dtype=column.dtype)
+            grown[:len(column)] = column
+            self._columns[name] = grown
+        for feature_type, present in self._present.items():
+            grown = np.zeros(self._capacity, dtype=bool)
+            grown[:len(present)] = present
+            self._present[feature_type] = grown
+
+class TaskFeatures:
+    """Features of every chunk of a task, one table row per chunk id.
+
+    Numeric feature groups live in a `FeatureTable`; transcripts, speech
+    regions and the optional per-frame spectral series, which have no fixed
+    width, are kept per row beside it. `get` rebuilds a chunk's features in the extractor's
+    output layout, so models are only built where a response is serialized.
+    """
+
+    def __init__(self, chunks: Sequence[Any]):
+        self.table = FeatureTable(FEATURE_COLUMNS, capacity=len(chunks))
+        for chunk in chunks:
+            self.table.append(chunk.chunk_id, chunk.start_time, chunk.end_time, {})
+        self.transcriptions: Dict[int, str] = {}
+        self.speech: Dict[int, Dict[str, Any]] = {}
+        self.spectral_frames: Dict[int, Dict[str, np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return len(self.table)
+
+    def set(self, row: int, features: Dict[str, Any]):
+        """Store a chunk's feature groups (extractor output, possibly merged with cached groups)"""
+        self.table.set(row, features)
+        if features.get("transcription") is not None:
+            self.transcriptions[row] = features["transcription"]
+        if features.get("speech") is not None:
+            self.speech[row] = features["speech"]
+        frames = _lookup(features, "acoustic.spectral.frames")
+        if frames is not None:
+            # Kept at full precision: these are returned as-is rather than summarized
+            self.spectral_frames[row] = {name: np.asarray(values, dtype=np.float64) for name, values in frames.items()}
+        else:
+            self.spectral_frames.pop(row, None)
+
+    def set_bounds(self, row: int, start_time: float, end_time: float):
+        """Move a chunk's start and end, e.g. after its boundaries were aligned to pauses"""
+        self.table.set_bounds(row, start_time, end_time)
+
+    def get(self, row: int) -> Optional[Dict[str, Any]]:
+        """A chunk's feature groups, or None if nothing was stored for it"""
+        features = self.table.row(row)
+        if row in self.transcriptions:
+            features["transcription"] = self.transcriptions[row]
+        if row in self.speech:
+            features["speech"] = self.speech[row]
+        frames = self.spectral_frames.get(row)
+        if frames is not None and "acoustic" in features:
+            features["acoustic"]["spectral"]["frames"] = {name: values.tolist() for name, values in frames.items()}
+        return features or None
+
+    def project(self, row: int, paths: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """
+        Only the given feature paths of a chunk, nested like the extractor output.
+
+        Paths naming a column (`acoustic.energy`, `acoustic.mfcc`) are read
+        straight from it; groups and other subtrees (`paralinguistic`,
+        `acoustic.spectral`) are cut out of the whole row.
+        """
+        projected: Dict[str, Any] = {}
+        features = None
+        for path in paths:
+            feature_type = _FEATURE_TYPES.get(path.split(".", 1)[0])
+            if feature_type is not None and not self.table.has(row, feature_type):
+                continue
+            if self.table.has_column(path):
+                value = self.table.value(row, path)
+            else:
+                if features is None:
+                    features = self.get(row) or {}
+                value = _lookup(features, path)
+            if value is not None:
+                _assign(projected, path, value)
+        return projected or None
+
+    def columns(self, rows: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+        """
+        Columns of the given rows (all by default), with `transcription` and
+        `speech_ratio` columns if any chunk has a transcript or speech regions
+        """
+        columns = self.table.columns()
+        if self.transcriptions:
+            transcriptions = [self.transcriptions.get(row, "") for row in range(len(self.table))]
+            columns["transcription"] = np.array(transcriptions, dtype=str)
+        if self.speech:
+            columns["speech_ratio"] = speech_ratio_column([self.speech.get(row) for row in range(len(self.table))])
+        if rows is not None:
+            columns = {name: column[rows] for name, column in columns.items()}
+        return columns
+
+def speech_ratio_column(speech: Sequence[Optional[Dict[str, Any]]]) -> np.ndarray:
+    """Speech ratio of every row from its `speech` group (NaN where there is none)"""
+    return np.array([np.nan if group is None else group["ratio"] for group in speech], dtype=np.float32)
+
+_FEATURE_TYPES = {feature_type.value: feature_type for feature_type in FEATURE_COLUMNS}
+
+def is_feature_path(path: str) -> bool:
+    """Whether `path` names a stored feature, a feature group or a subtree of one"""
+    names = [f"{feature_type.value}.{path}" for feature_type, paths in FEATURE_COLUMNS.items() for path in paths]
+    names += [f"{feature_type.value}.{path}" for feature_type, blocks in FEATURE_BLOCKS.items() for path, _ in blocks]
+    names += EXTRA_FEATURE_PATHS
+    return any(name == path or name.startswith(path + ".") for name in names)
+
+def concat_columns(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Concatenate column dicts with the same columns"""
+    if not parts:
+        return {}
+    return {name: np.concatenate([part[name] for part in parts]) for name in parts[0]}
+
+def write_columns(columns: Dict[str, np.ndarray], path: str, format: Optional[str] = None):
+    """Write columns as `.npz`, Parquet or Arrow IPC (format taken from the file extension if not given)"""
+    with open(path, "wb") as f:
+        for block in iter_table_bytes(columns, format or path.rsplit(".", 1)[-1]):
+            f.write(block)
+
+class _DrainedBuffer(io.RawIOBase):
+    """Write-only stream whose contents are taken out as they are produced"""
+
+    def __init__(self):
+        self._blocks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._blocks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data, self._blocks = b"".join(self._blocks), []
+        return data
+
+def iter_table_bytes(columns: Dict[str, np.ndarray], format: str, batch_rows: int = 65536) -> Iterator[bytes]:
+    """
+    Encode columns as `.npz`, Parquet or an Arrow IPC stream, yielding the bytes as they are produced.
+
+    Parquet and Arrow are written `batch_rows` rows at a time (one row group or
+    record batch each), so a response can be sent while the rest is encoded.
+    """
+    if format not in TABLE_FORMATS:
+        raise ValueError(f"Unsupported table format: {format}")
+    buffer = _DrainedBuffer()
+    if format == "npz":
+        np.savez(buffer, **columns)
+        yield buffer.drain()
+        return
+
+    import pyarrow as pa
+    table = to_arrow(columns)
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(buffer, table.schema)
+    else:
+        writer = pa.ipc.new_stream(buffer, table.schema)
+    with writer:
+        for batch in table.to_batches(max_chunksize=batch_rows):
+            writer.write_batch(batch)
+            data = buffer.drain()
+            if data:
+                yield data
+    yield buffer.drain()
+
+def to_arrow(columns: Dict[str, np.ndarray]):
+    """Arrow table of the columns; fixed-width blocks become fixed-size list columns"""
+    import pyarrow as pa
+
+    arrays = {}
+    for name, column in columns.items():
+        if column.ndim == 2:
+            arrays[name] = pa.FixedSizeListArray.from_arrays(pa.array(column.ravel()), column.shape[1])
+        else:
+            arrays[name] = pa.array(column)
+    return pa.table(arrays)
+
+def arrow_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
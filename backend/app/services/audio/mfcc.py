@@ -0,0 +1,81 @@
+import numpy as np
+from functools import lru_cache
+from scipy.fft import dct, rfftfreq
+
+def hz_to_mel(frequencies) -> np.ndarray:
+    """Slaney mel scale: linear below 1 kHz, logarithmic above"""
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    log_mels = 15 + np.log(np.maximum(frequencies, 1000) / 1000) * 27 / np.log(6.4)
+    return np.where(frequencies >= 1000, log_mels, frequencies * 3 / 200)
+
+def mel_to_hz(mels) -> np.ndarray:
+    mels = np.asarray(mels, dtype=np.float64)
+    log_frequencies = 1000 * np.exp((np.maximum(mels, 15) - 15) * np.log(6.4) / 27)
+    return np.where(mels >= 15, log_frequencies, mels * 200 / 3)
+
+@lru_cache(maxsize=16)
+def mel_basis(sample_rate: int, n_fft: int, n_mels: int) -> np.ndarray:
+    """Slaney-normalized mel filterbank of shape (bins, n_mels), built once per configuration.
+
+    Same filters as `librosa.filters.mel` with its defaults, without importing librosa.
+    """
+    edges = mel_to_hz(np.linspace(hz_to_mel(0.0), hz_to_mel(sample_rate / 2), n_mels + 2))
+    frequencies = rfftfreq(n_fft, 1 / sample_rate)
+    widths = np.diff(edges)
+    ramps = edges[:, None] - frequencies[None, :]
+
+    lower = -ramps[:-2] / widths[:-1, None]
+    upper = ramps[2:] / widths[1:, None]
+    weights = np.maximum(0, np.minimum(lower, upper))
+    # Slaney normalization: constant energy per filter
+    weights *= (2.0 / (edges[2:] - edges[:-2]))[:, None]
+
+    basis = np.ascontiguousarray(weights.T, dtype=np.float32)
+    basis.setflags(write=False)
+    return basis
+
+@lru_cache(maxsize=16)
+def dct_matrix(n_mels: int, n_mfcc: int) -> np.ndarray:
+    """Orthonormal DCT-II of shape (n_mels, n_mfcc), applied to mel frames by a matrix product"""
+    matrix = dct(np.eye(n_mels, dtype=np.float32), type=2, norm="ortho", axis=0)[:n_mfcc]
+    matrix = np.ascontiguousarray(matrix.T)
+    matrix.setflags(write=False)
+    return matrix
+
+class MFCCEngine:
+    """MFCCs from power spectrogram frames, matching `librosa.feature.mfcc` defaults.
+
+    The mel filterbank and DCT matrix are built once per
+    (sample_rate, n_fft, n_mels) and shared by every engine in the process. Mel
+    projection happens per STFT block (see `STFTEngine.analyze`), so MFCCs reuse
+    the same frames as the spectral features; the log compression and DCT then
+    run on a stack of equal-length chunks as one matrix operation.
+    """
+
+    def __init__(self, sample_rate: int, n_fft: int = 2048, n_mels: int = 128, n_mfcc: int = 13,
+                 top_db: float = 80.0, amin: float = 1e-10):
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.n_mels = n_mels
+        self.n_mfcc = n_mfcc
+        self.top_db = top_db
+        self.amin = amin
+
+        self.mel_basis = mel_basis(sample_rate, n_fft, n_mels)
+        self.dct_matrix = dct_matrix(n_mels, n_mfcc)
+
+    def mfcc(self, mel_power: np.ndarray) -> np.ndarray:
+        """MFCCs of mel power frames.
+
+        `mel_power` has shape (frames, n_mels) or (chunks, frames, n_mels); the
+        result has shape (..., frames, n_mfcc). As in librosa, the dB range is
+        clipped to `top_db` below the peak of each chunk.
+        """
+        log_mel = 10.0 * np.log10(np.maximum(mel_power, self.amin))
+        peak = log_mel.max(axis=(-2, -1), keepdims=True)
+        np.maximum(log_mel, peak - self.top_db, out=log_mel)
+        return log_mel @ self.dct_matrix
+
+    def mfcc_means(self, mel_power: np.ndarray) -> np.ndarray:
+        """Per-coefficient mean over frames, shape (..., n_mfcc)"""
+        return self.mfcc(mel_power).mean(axis=-2)
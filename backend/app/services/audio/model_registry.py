@@ -0,0 +1,97 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from ...core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ModelRegistry:
+    """Process-wide cache of loaded models.
+
+    Models are loaded on first use, at most `max_models` stay loaded (least
+    recently used are dropped first), and a background sweeper unloads models
+    that have not been used for `idle_timeout` seconds. Concurrent requests for
+    the same model wait for a single load. Callers keep whatever reference they
+    got; an unloaded model is freed once its last user lets go of it.
+    """
+
+    def __init__(self, max_models: int, idle_timeout: float):
+        self.max_models = max_models
+        self.idle_timeout = idle_timeout
+        self._models: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._last_used: Dict[Hashable, float] = {}
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._sweeper: Optional[threading.Thread] = None
+
+    def get(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """The model for `key`, calling `loader()` to load it if needed"""
+        with self._lock:
+            model = self._touch(key)
+            if model is not None:
+                return model
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have finished loading while we waited
+            with self._lock:
+                model = self._touch(key)
+                if model is not None:
+                    return model
+
+            started = time.monotonic()
+            model = loader()
+            logger.info(f"Loaded model {key} in {time.monotonic() - started:.1f}s")
+
+            with self._lock:
+                self._models[key] = model
+                self._last_used[key] = time.monotonic()
+                while len(self._models) > self.max_models:
+                    evicted, _ = self._models.popitem(last=False)
+                    self._last_used.pop(evicted, None)
+                    logger.info(f"Unloaded model {evicted} (registry full)")
+                self._start_sweeper()
+            return model
+
+    def loaded(self) -> List[Hashable]:
+        """Keys of the currently loaded models"""
+        with self._lock:
+            return list(self._models)
+
+    def unload_idle(self):
+        """Drop models unused for longer than `idle_timeout`"""
+        cutoff = time.monotonic() - self.idle_timeout
+        with self._lock:
+            for key in [key for key, used in self._last_used.items() if used < cutoff]:
+                self._models.pop(key, None)
+                self._last_used.pop(key, None)
+                logger.info(f"Unloaded idle model {key}")
+
+    def clear(self):
+        with self._lock:
+            self._models.clear()
+            self._last_used.clear()
+
+    def _touch(self, key: Hashable) -> Any:
+        # Caller holds the lock
+        model = self._models.get(key)
+        if model is not None:
+            self._models.move_to_end(key)
+            self._last_used[key] = time.monotonic()
+        return model
+
+    def _start_sweeper(self):
+        # Caller holds the lock
+        if self._sweeper is None and self.idle_timeout > 0:
+            self._sweeper = threading.Thread(target=self._sweep, name="model-registry-sweeper", daemon=True)
+            self._sweeper.start()
+
+    def _sweep(self):
+        while True:
+            time.sleep(max(self.idle_timeout / 4, 1.0))
+            self.unload_idle()
+
+# Shared by everything in this process that loads models
+model_registry = ModelRegistry(settings.MODEL_REGISTRY_SIZE, settings.MODEL_IDLE_TIMEOUT)
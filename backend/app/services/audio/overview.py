@@ -0,0 +1,275 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from scipy.fft import rfft
+from .mfcc import mel_basis
+
+logger = logging.getLogger(__name__)
+
+# Level 0 resolution; every further level merges LEVEL_FACTOR columns of the one below
+PEAK_SAMPLES = 128
+MEL_N_FFT = 2048
+MEL_HOP = 1024
+MEL_BANDS = 64
+LEVEL_FACTOR = 4
+WAVEFORM_LEVELS = 6
+SPECTROGRAM_LEVELS = 4
+# Log-mel values are quantized to one byte over this range (a full-scale sine peaks near 36 dB)
+MIN_DB = -80.0
+MAX_DB = 40.0
+
+OVERVIEW_KINDS = ("waveform", "spectrogram")
+
+def level_columns(columns: int, levels: int) -> List[int]:
+    """Number of columns of each level, given the columns of level 0"""
+    counts = [columns]
+    for _ in range(levels - 1):
+        counts.append(-(-counts[-1] // LEVEL_FACTOR))
+    return counts
+
+class AudioOverview:
+    """Zoomable overview of one task's audio: min/max waveform peaks and a log-mel spectrogram.
+
+    Level 0 has a waveform column per `PEAK_SAMPLES` samples and a spectrogram
+    column per `MEL_HOP` samples; each coarser level merges `LEVEL_FACTOR`
+    columns (min/max for peaks, mean for the spectrogram). Peaks are stored as
+    int8 `(min, max)` pairs and spectrogram columns as `MEL_BANDS` bytes, all
+    levels of a kind back to back in one memory-mapped `.npy` file, so any time
+    range of any level is a slice.
+
+    Chunks are added as they are decoded, in any order. Spectrogram frames that
+    span two chunks use the previous chunk's tail when the chunks are added one
+    after the other, which is the normal decoding order.
+    """
+
+    def __init__(self, directory: str, sample_rate: int, frames: int, chunk_size: int, total_chunks: int,
+                 complete: bool = False, create: bool = True):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.frames = frames
+        self.chunk_size = chunk_size
+        self.total_chunks = total_chunks
+        self.complete = complete
+        self.columns = {
+            "waveform": level_columns(-(-frames // PEAK_SAMPLES), WAVEFORM_LEVELS),
+            "spectrogram": level_columns(-(-frames // MEL_HOP), SPECTROGRAM_LEVELS)
+        }
+        self.samples_per_column = {
+            "waveform": [PEAK_SAMPLES * LEVEL_FACTOR ** level for level in range(WAVEFORM_LEVELS)],
+            "spectrogram": [MEL_HOP * LEVEL_FACTOR ** level for level in range(SPECTROGRAM_LEVELS)]
+        }
+        self._offsets = {kind: np.concatenate([[0], np.cumsum(counts)]) for kind, counts in self.columns.items()}
+        self._added = np.zeros(total_chunks, dtype=bool)
+        # Samples after the last complete spectrogram frame, and their start position
+        self._tail: Optional[Tuple[int, np.ndarray]] = None
+        self._lock = threading.Lock()
+
+        shapes = {
+            "waveform": (int(self._offsets["waveform"][-1]), 2),
+            "spectrogram": (int(self._offsets["spectrogram"][-1]), MEL_BANDS)
+        }
+        if create:
+            os.makedirs(directory, exist_ok=True)
+            self.waveform = np.lib.format.open_memmap(self._path("waveform"), mode="w+", dtype=np.int8, shape=shapes["waveform"])
+            # Columns without data yet have min > max
+            self.waveform[:, 0] = 127
+            self.waveform[:, 1] = -128
+            self.spectrogram = np.lib.format.open_memmap(
+                self._path("spectrogram"), mode="w+", dtype=np.uint8, shape=shapes["spectrogram"]
+            )
+            self._window = np.hanning(MEL_N_FFT).astype(np.float32)
+            self._mel_basis = mel_basis(sample_rate, MEL_N_FFT, MEL_BANDS)
+        else:
+            self.waveform = np.load(self._path("waveform"), mmap_mode="r")
+            self.spectrogram = np.load(self._path("spectrogram"), mmap_mode="r")
+
+    def _path(self, kind: str) -> str:
+        return os.path.join(self.directory, f"{kind}.npy")
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+    def missing_chunks(self) -> List[int]:
+        return np.flatnonzero(~self._added).tolist()
+
+    def recording(self, chunks: Iterator[Tuple[int, np.ndarray]]) -> Iterator[Tuple[int, np.ndarray]]:
+        """Pass `(index, chunk)` pairs through, adding each chunk"""
+        for index, chunk in chunks:
+            try:
+                self.add_chunk(index, chunk)
+            except Exception as e:
+                # The overview is only for display; it never fails the analysis
+                logger.error(f"Error adding chunk {index} to the overview: {str(e)}")
+            yield index, chunk
+
+    def add_chunk(self, index: int, samples: np.ndarray):
+        """Compute the columns covered by chunk `index` at every level"""
+        if index >= self.total_chunks or self._added[index]:
+            return
+        start = index * self.chunk_size
+        # Compressed files may decode to more samples than their header estimated
+        samples = samples[:max(self.frames - start, 0)]
+        if len(samples) == 0:
+            return
+        with self._lock:
+            self._add_peaks(start, samples)
+            self._add_spectrogram(start, samples, last=start + len(samples) >= self.frames)
+            self._added[index] = True
+
+    def _add_peaks(self, start: int, samples: np.ndarray):
+        quantized = np.clip(np.rint(samples * 127), -127, 127).astype(np.int8)
+        first = start // PEAK_SAMPLES
+        # Column of each sample, relative to the first column the chunk touches
+        edges = np.arange(first * PEAK_SAMPLES, start + len(samples), PEAK_SAMPLES)
+        edges = np.maximum(edges - start, 0)
+        level0 = self.waveform[:self.columns["waveform"][0]]
+        stop = first + len(edges)
+        # Columns shared with a neighbouring chunk are merged with what is already there
+        np.minimum(level0[first:stop, 0], np.minimum.reduceat(quantized, edges), out=level0[first:stop, 0])
+        np.maximum(level0[first:stop, 1], np.maximum.reduceat(quantized, edges), out=level0[first:stop, 1])
+        self._merge_levels("waveform", first, stop)
+
+    def _add_spectrogram(self, start: int, samples: np.ndarray, last: bool):
+        if self._tail is not None and self._tail[0] + len(self._tail[1]) == start:
+            start, samples = self._tail[0], np.concatenate([self._tail[1], samples])
+        self._tail = None
+        # Frames start on multiples of MEL_HOP; one that started before this run lost its beginning
+        first = -(-start // MEL_HOP)
+        offset = first * MEL_HOP - start
+        if last:
+            # Pad the end of the file so every column gets a frame
+            needed = (self.columns["spectrogram"][0] - 1) * MEL_HOP + MEL_N_FFT - first * MEL_HOP
+            samples = np.pad(samples, (0, max(needed + offset - len(samples), 0)))
+        count = max((len(samples) - offset - MEL_N_FFT) // MEL_HOP + 1, 0)
+        if not last:
+            self._tail = (first * MEL_HOP + count * MEL_HOP, samples[offset + count * MEL_HOP:].copy())
+        if count == 0:
+            return
+
+        frames = np.lib.stride_tricks.sliding_window_view(samples[offset:], MEL_N_FFT)[::MEL_HOP][:count]
+        power = np.abs(rfft(frames * self._window, axis=1)) ** 2
+        decibels = 10.0 * np.log10(np.maximum(power @ self._mel_basis, 1e-10))
+        scaled = np.clip((decibels - MIN_DB) * (255.0 / (MAX_DB - MIN_DB)), 0, 255)
+        stop = min(first + count, self.columns["spectrogram"][0])
+        self.spectrogram[first:stop] = np.rint(scaled[:stop - first]).astype(np.uint8)
+        self._merge_levels("spectrogram", first, stop)
+
+    def _merge_levels(self, kind: str, first: int, stop: int):
+        """Recompute the coarser columns that cover level 0 columns `first` to `stop`"""
+        data = self.waveform if kind == "waveform" else self.spectrogram
+        offsets = self._offsets[kind]
+        for level in range(1, len(self.columns[kind])):
+            first, stop = first // LEVEL_FACTOR, -(-stop // LEVEL_FACTOR)
+            below = data[offsets[level - 1]:offsets[level]]
+            source = below[first * LEVEL_FACTOR:stop * LEVEL_FACTOR]
+            # Pad the last group of the level to a full LEVEL_FACTOR columns
+            padding = (stop - first) * LEVEL_FACTOR - len(source)
+            if kind == "waveform":
+                source = np.concatenate([source, np.tile(np.array([[127, -128]], dtype=np.int8), (padding, 1))])
+                groups = source.reshape(stop - first, LEVEL_FACTOR, 2)
+                merged = np.stack([groups[:, :, 0].min(axis=1), groups[:, :, 1].max(axis=1)], axis=1)
+            else:
+                groups = np.concatenate([source, source[-1:].repeat(padding, axis=0)]).reshape(stop - first, LEVEL_FACTOR, -1)
+                merged = np.rint(groups.mean(axis=1)).astype(np.uint8)
+            data[offsets[level] + first:offsets[level] + stop] = merged
+
+    def finish(self, complete: bool):
+        """Flush the maps and record the overview's parameters next to them"""
+        self.complete = complete
+        self.waveform.flush()
+        self.spectrogram.flush()
+        with open(os.path.join(self.directory, "overview.json"), "w") as f:
+            json.dump({
+                "sample_rate": self.sample_rate,
+                "frames": self.frames,
+                "chunk_size": self.chunk_size,
+                "total_chunks": self.total_chunks,
+                "complete": complete
+            }, f)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["AudioOverview"]:
+        """Open a finished overview read-only, or None if there is none"""
+        try:
+            with open(os.path.join(directory, "overview.json")) as f:
+                meta = json.load(f)
+            return cls(directory, **meta, create=False)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def describe(self) -> Dict[str, Any]:
+        """Levels and value encoding, for clients deciding which columns to fetch"""
+        return {
+            "sample_rate": self.sample_rate,
+            "duration": self.duration,
+            "complete": self.complete,
+            "mel_bands": MEL_BANDS,
+            "min_db": MIN_DB,
+            "max_db": MAX_DB,
+            **{
+                kind: [{
+                    "level": level,
+                    "seconds_per_column": samples / self.sample_rate,
+                    "columns": int(columns)
+                } for level, (samples, columns) in enumerate(zip(self.samples_per_column[kind], self.columns[kind]))]
+                for kind in OVERVIEW_KINDS
+            }
+        }
+
+    def choose_level(self, kind: str, start: float, end: float, width: int) -> int:
+        """Finest level with at most `width` columns between `start` and `end` seconds"""
+        for level, samples in enumerate(self.samples_per_column[kind]):
+            if (end - start) * self.sample_rate / samples <= width:
+                return level
+        return len(self.samples_per_column[kind]) - 1
+
+    def read(self, kind: str, level: int, start: float, end: float) -> Tuple[int, np.ndarray]:
+        """First column index and the columns of a level between `start` and `end` seconds"""
+        samples = self.samples_per_column[kind][level]
+        columns = self.columns[kind][level]
+        first = min(max(int(start * self.sample_rate // samples), 0), columns)
+        stop = min(max(-(-int(end * self.sample_rate) // samples), first), columns)
+        data = self.waveform if kind == "waveform" else self.spectrogram
+        offset = self._offsets[kind][level]
+        return first, np.array(data[offset + first:offset + stop])
+
+class OverviewStore:
+    """One directory of overview files per task; least recently used ones are deleted past `max_bytes`"""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def create(self, task_id: str, sample_rate: int, frames: int, chunk_size: int, total_chunks: int) -> AudioOverview:
+        return AudioOverview(os.path.join(self.directory, task_id), sample_rate, frames, chunk_size, total_chunks)
+
+    def load(self, task_id: str) -> Optional[AudioOverview]:
+        directory = os.path.join(self.directory, task_id)
+        overview = AudioOverview.load(directory)
+        if overview is not None:
+            # The modification time doubles as the last-use time for eviction
+            os.utime(directory)
+        return overview
+
+    def finished(self, overview: AudioOverview, complete: bool):
+        """Write out a task's overview and evict old ones if over the limit"""
+        overview.finish(complete)
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.is_dir():
+                size = sum(item.stat().st_size for item in os.scandir(entry.path))
+                entries.append((entry.stat().st_mtime, size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == overview.directory:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
@@ -1,25 +1,47 @@
-import librosa
 import numpy as np
-from typing import Dict, List, Optional
-import soundfile as sf
-from pydub import AudioSegment
+from typing import Any, Dict, List, Optional
 import os
+from ...core.config import settings
 from ...schemas.audio import AudioFeatureType, AudioFeatures
+from .model_registry import model_registry
 import logging
-import whisper
-import torch
-from pathlib import Path
+
+# librosa, torch and whisper are imported where they are used, so importing this
+# module (or running acoustic-only work) does not pay for them.
+
+def inference_device() -> str:
+    """Device for model inference"""
+    import torch
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+def load_whisper_model(name: str, device: str):
+    import whisper
+    return whisper.load_model(name, device=device)
+
+def get_whisper_model(name: Optional[str] = None):
+    """Whisper model from the shared registry, loaded on first use"""
+    name = name or settings.WHISPER_MODEL
+    device = inference_device()
+    return model_registry.get(("whisper", name, device), lambda: load_whisper_model(name, device))
 
 class AudioProcessor:
-    def __init__(self, sample_rate: int = 22050):
+    def __init__(self, sample_rate: int = 22050, whisper_model_name: Optional[str] = None):
         self.sample_rate = sample_rate
         self.logger = logging.getLogger(__name__)
-        # Initialize Whisper model
-        self.whisper_model = whisper.load_model("tiny.en")
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        # Whisper is loaded on the first transcription request
+        self.whisper_model_name = whisper_model_name or settings.WHISPER_MODEL
+
+    @property
+    def whisper_model(self):
+        return get_whisper_model(self.whisper_model_name)
+
+    @property
+    def device(self) -> str:
+        return inference_device()
 
     def load_audio_chunk(self, file_path: str, start_time: float, end_time: float) -> np.ndarray:
         """Load a specific chunk of audio file"""
+        import librosa
         try:
             y, sr = librosa.load(file_path, sr=self.sample_rate, offset=start_time, duration=end_time-start_time)
             return y
@@ -54,16 +76,19 @@ class AudioProcessor:
 
     def _extract_mfcc(self, y: np.ndarray, n_mfcc: int = 13) -> List[float]:
         """Extract MFCCs from audio chunk"""
+        import librosa
         mfccs = librosa.feature.mfcc(y=y, sr=self.sample_rate, n_mfcc=n_mfcc)
         return mfccs.mean(axis=1).tolist()
 
     def _extract_pitch(self, y: np.ndarray) -> float:
         """Extract pitch (fundamental frequency) from audio chunk"""
+        import librosa
         pitches, magnitudes = librosa.piptrack(y=y, sr=self.sample_rate)
         return float(np.mean(pitches[magnitudes > np.max(magnitudes)*0.7]))
 
     def _extract_formants(self, y: np.ndarray) -> List[float]:
         """Extract formant frequencies using LPC"""
+        import librosa
         # Simplified formant extraction using LPC
         frame_length = 2048
         hop_length = 512
@@ -86,11 +111,13 @@ class AudioProcessor:
 
     def _extract_zcr(self, y: np.ndarray) -> float:
         """Extract zero-crossing rate from audio chunk"""
+        import librosa
         zcr = librosa.feature.zero_crossing_rate(y)
         return float(np.mean(zcr))
 
     def _extract_spectral_features(self, y: np.ndarray) -> Dict[str, float]:
         """Extract various spectral features"""
+        import librosa
         spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=self.sample_rate)
         spectral_bandwidth = librosa.feature.spectral_bandwidth(y=y, sr=self.sample_rate)
         spectral_rolloff = librosa.feature.spectral_rolloff(y=y, sr=self.sample_rate)
@@ -103,6 +130,7 @@ class AudioProcessor:
 
     def _extract_emotion_features(self, y: np.ndarray) -> Dict[str, float]:
         """Extract features related to emotional content"""
+        import librosa
         # This is a simplified version. In practice, you'd want to use a trained model
         energy = np.mean(librosa.feature.rms(y=y))
         pitch_mean = np.mean(librosa.piptrack(y=y, sr=self.sample_rate)[0])
@@ -115,6 +143,7 @@ class AudioProcessor:
 
     def _extract_speaking_rate(self, y: np.ndarray) -> float:
         """Estimate speaking rate"""
+        import librosa
         # Simplified speaking rate estimation using energy peaks
         hop_length = 512
         onset_env = librosa.onset.onset_strength(y=y, sr=self.sample_rate, hop_length=hop_length)
@@ -126,6 +155,7 @@ class AudioProcessor:
 
     def _extract_voice_onset_time(self, y: np.ndarray) -> float:
         """Estimate voice onset time"""
+        import librosa
         # Simplified VOT estimation
         energy = librosa.feature.rms(y=y)
         onset_frames = librosa.onset.onset_detect(y=y, sr=self.sample_rate)
@@ -135,43 +165,20 @@ class AudioProcessor:
 
     def process_chunk(self, audio_path: str, start_time: float, end_time: float, feature_types: List[AudioFeatureType]) -> Dict[str, Any]:
         """Process a chunk of audio and extract requested features"""
+        from .feature_extractor import FeatureExtractor
+        from .transcription import transcribe_batch
         try:
             # Load the audio chunk
-            y, sr = librosa.load(audio_path, offset=start_time, duration=end_time-start_time)
+            y = self.load_audio_chunk(audio_path, start_time, end_time)
             
-            features = {}
+            # Acoustic and paralinguistic features
+            features = FeatureExtractor(sample_rate=self.sample_rate).extract_features(y, feature_types)
             
-            # Transcribe audio chunk if needed
+            # Transcribe the decoded samples directly, without a temporary file
             if AudioFeatureType.TRANSCRIPTION in feature_types:
-                # Save temporary chunk for Whisper
-                temp_chunk_path = f"temp_chunk_{start_time}_{end_time}.wav"
-                librosa.output.write_wav(temp_chunk_path, y, sr)
-                
-                try:
-                    # Transcribe with Whisper
-                    result = self.whisper_model.transcribe(temp_chunk_path)
-                    features['transcription'] = result["text"].strip()
-                finally:
-                    # Clean up temporary file
-                    Path(temp_chunk_path).unlink(missing_ok=True)
-            
-            # Process acoustic features if needed
-            if AudioFeatureType.ACOUSTIC in feature_types:
-                features['acoustic'] = self._extract_acoustic_features(y, sr)
-            
-            # Process paralinguistic features if needed
-            if AudioFeatureType.PARALINGUISTIC in feature_types:
-                features['paralinguistic'] = self._extract_paralinguistic_features(y, sr)
+                features['transcription'] = transcribe_batch([(y, self.sample_rate)], self.whisper_model_name)[0]
             
             return features
             
         except Exception as e:
             raise Exception(f"Error processing chunk: {str(e)}")
-
-    def _extract_acoustic_features(self, y: np.ndarray, sr: int) -> Dict[str, Any]:
-        """Extract acoustic features from audio chunk"""
-        # ... existing acoustic feature extraction code ...
-
-    def _extract_paralinguistic_features(self, y: np.ndarray, sr: int) -> Dict[str, Any]:
-        """Extract paralinguistic features from audio chunk"""
-        # ... existing paralinguistic feature extraction code ... 
\ No newline at end of file
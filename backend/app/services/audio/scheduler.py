@@ -0,0 +1,89 @@
+import asyncio
+from collections import deque
+from typing import Deque, Dict, Tuple
+from ...schemas.audio import TaskPriority
+
+# Lanes in the order they are served
+PRIORITY_ORDER = (TaskPriority.HIGH, TaskPriority.NORMAL, TaskPriority.LOW)
+
+class ChunkScheduler:
+    """Global admission control for chunk jobs of all tasks.
+
+    Every chunk job asks for a slot before it is decoded and handed to the
+    workers, and gives it back once its features are in. At most
+    `max_in_flight` jobs hold a slot at any time. Waiting jobs are queued per
+    priority lane; a free slot goes to the highest non-empty lane, and within a
+    lane to the task that has been waiting longest. Each task has at most one
+    job waiting, so tasks in a lane take turns: a long file gets every other
+    slot next to a short one instead of all of them.
+    """
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self._lanes: Dict[TaskPriority, Deque[Tuple[str, asyncio.Future]]] = {
+            priority: deque() for priority in PRIORITY_ORDER
+        }
+        self._in_flight: Dict[str, int] = {}
+        self._running = 0
+
+    async def acquire(self, task_id: str, priority: TaskPriority = TaskPriority.NORMAL):
+        """Wait for a slot for one chunk job of `task_id`"""
+        if self._running < self.max_in_flight and not self.waiting():
+            self._grant(task_id)
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        lane = self._lanes[priority]
+        lane.append((task_id, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was granted just as the job was cancelled
+                self.release(task_id)
+            elif (task_id, waiter) in lane:
+                lane.remove((task_id, waiter))
+            raise
+
+    def release(self, task_id: str):
+        """Return the slot of a finished chunk job and hand it to the next waiter"""
+        if task_id not in self._in_flight:
+            # Already returned by forget()
+            return
+        self._running -= 1
+        remaining = self._in_flight[task_id] - 1
+        if remaining > 0:
+            self._in_flight[task_id] = remaining
+        else:
+            del self._in_flight[task_id]
+        self._wake()
+
+    def forget(self, task_id: str):
+        """Return every slot still held by a cancelled task"""
+        self._running -= self._in_flight.pop(task_id, 0)
+        self._wake()
+
+    def waiting(self) -> int:
+        return sum(len(lane) for lane in self._lanes.values())
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "max_in_flight": self.max_in_flight,
+            "in_flight": self._running,
+            "waiting": {priority.value: len(self._lanes[priority]) for priority in PRIORITY_ORDER},
+            "tasks": dict(self._in_flight)
+        }
+
+    def _grant(self, task_id: str):
+        self._running += 1
+        self._in_flight[task_id] = self._in_flight.get(task_id, 0) + 1
+
+    def _wake(self):
+        for priority in PRIORITY_ORDER:
+            lane = self._lanes[priority]
+            while lane and self._running < self.max_in_flight:
+                task_id, waiter = lane.popleft()
+                if waiter.done():
+                    continue
+                self._grant(task_id)
+                waiter.set_result(None)
@@ -0,0 +1,128 @@
+import threading
+import numpy as np
+from scipy.fft import rfft, rfftfreq
+from scipy.signal import get_window
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+class FrameSpectra(NamedTuple):
+    """Per-frame spectral descriptors of a signal"""
+    times: np.ndarray
+    centroid: np.ndarray
+    bandwidth: np.ndarray
+    rolloff: np.ndarray
+    flux: np.ndarray
+    mean_spectrum: np.ndarray
+    # (frames, n_mels) mel power spectrogram, when a mel basis was given
+    mel_power: Optional[np.ndarray] = None
+
+class STFTEngine:
+    """Windowed, hop-based STFT over bounded blocks of frames.
+
+    The analysis window is built once, and the frame/magnitude buffers are
+    allocated once per thread and reused for every block and every signal, so
+    memory use is bounded by `block_frames * n_fft` (per thread using the
+    engine) regardless of the signal length. An engine can therefore be shared
+    between threads. Frames are centered
+    (the signal is zero-padded by `n_fft // 2` on both sides), matching librosa.
+    """
+
+    def __init__(self, sample_rate: int, n_fft: int = 2048, hop_length: int = 512,
+                 block_frames: int = 256, rolloff_percent: float = 0.85):
+        self.sample_rate = sample_rate
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.block_frames = block_frames
+        self.rolloff_percent = rolloff_percent
+
+        self.window = get_window("hann", n_fft, fftbins=True).astype(np.float32)
+        self.frequencies = rfftfreq(n_fft, 1 / sample_rate)
+        self.num_bins = len(self.frequencies)
+
+        self._buffers = threading.local()
+
+    def _block_buffers(self):
+        """This thread's frame and magnitude buffers"""
+        buffers = self._buffers
+        if not hasattr(buffers, "frames"):
+            buffers.frames = np.empty((self.block_frames, self.n_fft), dtype=np.float32)
+            buffers.magnitudes = np.empty((self.block_frames, self.num_bins), dtype=np.float32)
+        return buffers.frames, buffers.magnitudes
+
+    def num_frames(self, num_samples: int) -> int:
+        """Number of centered frames for a signal of `num_samples` samples"""
+        return 1 + num_samples // self.hop_length
+
+    def frame_times(self, num_frames: int) -> np.ndarray:
+        """Center time (seconds) of each frame"""
+        return np.arange(num_frames) * self.hop_length / self.sample_rate
+
+    def iter_magnitudes(self, audio: np.ndarray) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield `(first_frame_index, magnitudes)` blocks of shape (frames, bins).
+
+        The yielded array is a view into a reusable (per-thread) buffer and is
+        overwritten by the next block; consumers must copy anything they want to keep.
+        """
+        frame_buffer, magnitude_buffer = self._block_buffers()
+        pad = self.n_fft // 2
+        padded = np.pad(np.asarray(audio, dtype=np.float32), pad)
+        frames = np.lib.stride_tricks.sliding_window_view(padded, self.n_fft)[::self.hop_length]
+
+        for start in range(0, len(frames), self.block_frames):
+            count = min(self.block_frames, len(frames) - start)
+            block = frame_buffer[:count]
+            np.multiply(frames[start:start + count], self.window, out=block)
+            magnitudes = magnitude_buffer[:count]
+            np.abs(rfft(block, axis=1), out=magnitudes)
+            yield start, magnitudes
+
+    def analyze(self, audio: np.ndarray, mel_basis: Optional[np.ndarray] = None) -> FrameSpectra:
+        """Compute per-frame centroid, bandwidth, rolloff and flux plus the mean spectrum.
+
+        Frame 0 has no predecessor, so its flux is 0 and not a measurement.
+
+        With a (bins, n_mels) `mel_basis`, each block's power spectrum is also
+        projected onto the mel scale, so MFCCs can reuse the same frames.
+        """
+        n_frames = self.num_frames(len(audio))
+        centroid = np.zeros(n_frames, dtype=np.float32)
+        bandwidth = np.zeros(n_frames, dtype=np.float32)
+        rolloff = np.zeros(n_frames, dtype=np.float32)
+        flux = np.zeros(n_frames, dtype=np.float32)
+        spectrum_sum = np.zeros(self.num_bins, dtype=np.float64)
+        mel_power = None if mel_basis is None else np.empty((n_frames, mel_basis.shape[1]), dtype=np.float32)
+        previous = None
+
+        for start, magnitudes in self.iter_magnitudes(audio):
+            stop = start + len(magnitudes)
+            spectrum_sum += magnitudes.sum(axis=0)
+            if mel_power is not None:
+                np.matmul(magnitudes ** 2, mel_basis, out=mel_power[start:stop])
+
+            totals = magnitudes.sum(axis=1, keepdims=True)
+            norm = magnitudes / np.where(totals > 0, totals, 1.0)
+
+            frame_centroid = norm @ self.frequencies
+            centroid[start:stop] = frame_centroid
+            deviation = (self.frequencies[None, :] - frame_centroid[:, None]) ** 2
+            bandwidth[start:stop] = np.sqrt(np.sum(deviation * norm, axis=1))
+
+            # First bin whose cumulative energy reaches the rolloff percentage
+            reached = np.cumsum(norm, axis=1) >= self.rolloff_percent
+            rolloff_bins = np.argmax(reached, axis=1)
+            rolloff[start:stop] = np.where(reached.any(axis=1), self.frequencies[rolloff_bins], 0.0)
+
+            # Flux between consecutive normalized frames, carried across block boundaries
+            if previous is not None:
+                flux[start] = np.sum((norm[0] - previous) ** 2)
+            flux[start + 1:stop] = np.sum(np.diff(norm, axis=0) ** 2, axis=1)
+            previous = norm[-1].copy()
+
+        return FrameSpectra(
+            times=self.frame_times(n_frames),
+            centroid=centroid,
+            bandwidth=bandwidth,
+            rolloff=rolloff,
+            flux=flux,
+            mean_spectrum=(spectrum_sum / n_frames).astype(np.float32),
+            mel_power=mel_power
+        )
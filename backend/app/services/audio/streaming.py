@@ -0,0 +1,279 @@
+import numpy as np
+import logging
+from scipy.fft import rfft
+from scipy.signal import find_peaks
+from typing import Any, Dict, List, Optional
+from ...schemas.audio import AudioFeatureType, AcousticFeatures, SpectralFeatures, ParalinguisticFeatures
+from .f0 import F0Tracker
+from .feature_extractor import estimate_formants, spectrum_hnr
+from .mfcc import MFCCEngine
+from .stft import STFTEngine
+
+logger = logging.getLogger(__name__)
+
+# Columns of the per-frame scalar statistics kept in the ring buffer
+_SUM_SQUARES, _CROSSINGS, _VOICED, _F0, _F0_SQUARES, _PERIOD, _PERIOD_PAIRS, _PERIOD_CHANGE, \
+    _ENVELOPE, _PEAK, _CENTROID, _BANDWIDTH, _ROLLOFF, _FLUX = range(14)
+_NUM_STATS = 14
+
+# Supported raw PCM encodings and their sample dtypes
+PCM_ENCODINGS = {
+    "pcm_s16le": np.dtype("<i2"),
+    "pcm_f32le": np.dtype("<f4")
+}
+
+class PCMDecoder:
+    """Turns raw interleaved PCM messages into mono float32 samples.
+
+    Bytes of a sample frame split across two messages are carried over to the next call.
+    """
+
+    def __init__(self, encoding: str, channels: int):
+        if encoding not in PCM_ENCODINGS:
+            raise ValueError(f"Unsupported encoding: {encoding}")
+        self.dtype = PCM_ENCODINGS[encoding]
+        self.channels = channels
+        self._frame_bytes = self.dtype.itemsize * channels
+        self._remainder = b""
+
+    def decode(self, data: bytes) -> np.ndarray:
+        if self._remainder:
+            data = self._remainder + data
+        usable = len(data) - len(data) % self._frame_bytes
+        self._remainder = data[usable:]
+
+        samples = np.frombuffer(data[:usable], dtype=self.dtype).astype(np.float32)
+        if self.dtype.kind == "i":
+            samples /= 32768.0
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels).mean(axis=1, dtype=np.float32)
+        return samples
+
+class StreamingFeatureExtractor:
+    """Rolling acoustic and paralinguistic features over a live PCM stream.
+
+    Samples are consumed one hop (`hop_length` samples) at a time. Each hop
+    completes one STFT frame (overlap-save: the previous `n_fft - hop_length`
+    samples are kept), and is reduced to a fixed set of per-frame statistics:
+    sum of squares, zero crossings (the sign of the last sample is carried over,
+    so crossings on hop boundaries are counted), F0 and the period change from
+    the previous frame, mean and peak amplitude, spectral descriptors, the
+    magnitude spectrum and the mel power. Those go into ring buffers covering the last `window_seconds`, with
+    running totals updated by adding the new frame and subtracting the one that
+    falls out, so the cost per frame is constant no matter how long the stream
+    runs. Every `emit_interval` seconds the window is summarized into the same
+    feature models `FeatureExtractor` produces for uploaded files.
+    """
+
+    def __init__(self, sample_rate: int, feature_types: List[AudioFeatureType], window_seconds: float = 2.0,
+                 emit_interval: float = 0.5, n_fft: int = 2048, hop_length: int = 512):
+        self.sample_rate = sample_rate
+        self.feature_types = feature_types
+        self.hop_length = hop_length
+        self.stft = STFTEngine(sample_rate, n_fft=n_fft, hop_length=hop_length, block_frames=1)
+        self.mfcc = MFCCEngine(sample_rate, n_fft=n_fft)
+        self.f0_tracker = F0Tracker(sample_rate, frame_length=n_fft, hop_length=hop_length)
+        self.n_fft = n_fft
+
+        self.window_frames = max(1, int(round(window_seconds * sample_rate / hop_length)))
+        self.emit_frames = max(1, int(round(emit_interval * sample_rate / hop_length)))
+
+        # Ring buffers over the window and their running totals
+        self._stats = np.zeros((self.window_frames, _NUM_STATS), dtype=np.float64)
+        self._stat_totals = np.zeros(_NUM_STATS, dtype=np.float64)
+        self._spectra = np.zeros((self.window_frames, self.stft.num_bins), dtype=np.float32)
+        self._spectrum_total = np.zeros(self.stft.num_bins, dtype=np.float64)
+        self._mel = np.zeros((self.window_frames, self.mfcc.n_mels), dtype=np.float32)
+        self._position = 0
+        self._count = 0
+
+        # State carried between frames
+        self._history = np.zeros(max(n_fft, self.f0_tracker.frame_length), dtype=np.float32)
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._previous_norm: Optional[np.ndarray] = None
+        self._last_negative: Optional[bool] = None
+        self._last_period: Optional[float] = None
+        self._samples_seen = 0
+        self._frames_since_emit = 0
+
+    def feed(self, samples: np.ndarray) -> List[Dict[str, Any]]:
+        """Consume mono float32 samples; returns the feature updates that became due"""
+        if len(self._pending):
+            samples = np.concatenate([self._pending, samples])
+
+        updates = []
+        hop = self.hop_length
+        offset = 0
+        while len(samples) - offset >= hop:
+            self._process_frame(samples[offset:offset + hop])
+            offset += hop
+            self._frames_since_emit += 1
+            if self._frames_since_emit >= self.emit_frames:
+                updates.append(self._emit())
+
+        self._pending = np.array(samples[offset:], dtype=np.float32)
+        return updates
+
+    def flush(self) -> Optional[Dict[str, Any]]:
+        """Summarize frames not covered by an update yet (end of stream); trailing partial hops are dropped"""
+        if self._frames_since_emit == 0:
+            return None
+        return self._emit()
+
+    def _process_frame(self, hop_samples: np.ndarray):
+        hop = len(hop_samples)
+
+        # Overlap-save framing: shift in the new hop and transform the full window
+        self._history[:-hop] = self._history[hop:]
+        self._history[-hop:] = hop_samples
+        magnitudes = np.abs(rfft(self._history[-self.n_fft:] * self.stft.window)).astype(np.float32)
+
+        row = np.zeros(_NUM_STATS, dtype=np.float64)
+        row[_SUM_SQUARES] = np.dot(hop_samples, hop_samples)
+
+        # Zero crossings, including one between the previous hop's last sample and this hop's first
+        negative = np.signbit(hop_samples)
+        crossings = np.count_nonzero(negative[1:] != negative[:-1])
+        if self._last_negative is not None and self._last_negative != negative[0]:
+            crossings += 1
+        self._last_negative = bool(negative[-1])
+        row[_CROSSINGS] = crossings
+
+        # F0 of the latest frame and the period change from the previous voiced frame
+        f0 = self.f0_tracker.estimate(self._history[None, -self.f0_tracker.frame_length:])[0]
+        period = None
+        if not np.isnan(f0):
+            period = 1.0 / f0
+            row[_VOICED] = 1
+            row[_F0] = f0
+            row[_F0_SQUARES] = f0 * f0
+            row[_PERIOD] = period
+            if self._last_period is not None:
+                row[_PERIOD_PAIRS] = 1
+                row[_PERIOD_CHANGE] = abs(period - self._last_period)
+        self._last_period = period
+
+        envelope = np.abs(hop_samples)
+        row[_ENVELOPE] = envelope.mean()
+        row[_PEAK] = envelope.max()
+
+        total = magnitudes.sum()
+        norm = magnitudes / total if total > 0 else magnitudes
+        frequencies = self.stft.frequencies
+        centroid = norm @ frequencies
+        row[_CENTROID] = centroid
+        row[_BANDWIDTH] = np.sqrt(np.sum((frequencies - centroid) ** 2 * norm))
+        reached = np.cumsum(norm) >= self.stft.rolloff_percent
+        row[_ROLLOFF] = frequencies[np.argmax(reached)] if reached.any() else 0.0
+        if self._previous_norm is not None:
+            row[_FLUX] = np.sum((norm - self._previous_norm) ** 2)
+        self._previous_norm = norm
+
+        # Replace the oldest frame in the ring and update the running totals
+        slot = self._position
+        self._stat_totals += row - self._stats[slot]
+        self._stats[slot] = row
+        self._spectrum_total += magnitudes
+        self._spectrum_total -= self._spectra[slot]
+        self._spectra[slot] = magnitudes
+        np.matmul(magnitudes ** 2, self.mfcc.mel_basis, out=self._mel[slot])
+
+        self._position = (slot + 1) % self.window_frames
+        self._count = min(self._count + 1, self.window_frames)
+        self._samples_seen += hop
+
+    def _ordered(self, ring: np.ndarray) -> np.ndarray:
+        """Frames of a ring buffer from oldest to newest"""
+        start = (self._position - self._count) % self.window_frames
+        return ring[(start + np.arange(self._count)) % self.window_frames]
+
+    def _emit(self) -> Dict[str, Any]:
+        self._frames_since_emit = 0
+        num_samples = self._count * self.hop_length
+        end_time = self._samples_seen / self.sample_rate
+        update = {
+            "start_time": end_time - num_samples / self.sample_rate,
+            "end_time": end_time,
+            "features": {}
+        }
+
+        try:
+            if AudioFeatureType.ACOUSTIC in self.feature_types:
+                update["features"]["acoustic"] = self._acoustic_features(num_samples).model_dump()
+            if AudioFeatureType.PARALINGUISTIC in self.feature_types:
+                update["features"]["paralinguistic"] = self._paralinguistic_features(num_samples).model_dump()
+        except Exception as e:
+            logger.error(f"Error extracting streaming features: {str(e)}")
+            raise
+
+        return update
+
+    def _flux_frames(self) -> int:
+        """Frames in the window that have a flux measurement"""
+        first_in_window = self._samples_seen // self.hop_length == self._count
+        return self._count - 1 if first_in_window else self._count
+
+    def _mean_spectrum(self) -> np.ndarray:
+        return (self._spectrum_total / self._count).astype(np.float32)
+
+    def _acoustic_features(self, num_samples: int) -> AcousticFeatures:
+        totals = self._stat_totals
+        spectrum = self._mean_spectrum()
+        frequencies = self.stft.frequencies
+        frames = self._ordered(self._stats)
+
+        # Median F0 of the voiced frames in the window
+        voiced = frames[:, _VOICED] > 0
+        pitch = float(np.median(frames[voiced, _F0])) if np.any(voiced) else 0.0
+
+        envelope = frames[:, _ENVELOPE]
+        onsets = np.flatnonzero(envelope > np.mean(envelope) + 0.5 * np.std(envelope))
+
+        return AcousticFeatures(
+            mfcc=self.mfcc.mfcc_means(self._ordered(self._mel)).tolist(),
+            pitch=pitch,
+            formants=estimate_formants(frequencies, spectrum),
+            energy=float(np.sqrt(max(totals[_SUM_SQUARES], 0.0) / num_samples)),
+            zcr=float(totals[_CROSSINGS] / (2 * num_samples)),
+            spectral=SpectralFeatures(
+                centroid=float(totals[_CENTROID] / self._count),
+                bandwidth=float(totals[_BANDWIDTH] / self._count),
+                # The stream's first frame has no previous frame to differ from
+                flux=float(totals[_FLUX] / self._flux_frames()) if self._flux_frames() else 0.0,
+                rolloff=float(totals[_ROLLOFF] / self._count)
+            ),
+            vot=float(onsets[0] * self.hop_length / self.sample_rate) if len(onsets) > 0 else None
+        )
+
+    def _paralinguistic_features(self, num_samples: int) -> ParalinguisticFeatures:
+        totals = self._stat_totals
+        spectrum = self._mean_spectrum()
+        frames = self._ordered(self._stats)
+
+        pitch_variability = 0.0
+        if totals[_VOICED] > 0:
+            mean_f0 = totals[_F0] / totals[_VOICED]
+            pitch_variability = float(np.sqrt(max(totals[_F0_SQUARES] / totals[_VOICED] - mean_f0 ** 2, 0.0)))
+
+        # Hop-averaged envelope is the smoothed envelope sampled once per hop
+        envelope = frames[:, _ENVELOPE]
+        syllables, _ = find_peaks(envelope, height=np.mean(envelope) * 1.5)
+        duration = num_samples / self.sample_rate
+
+        # Relative period perturbation of adjacent voiced frames
+        jitter = 0.0
+        if totals[_PERIOD_PAIRS] > 0 and totals[_PERIOD] > 0:
+            mean_period = totals[_PERIOD] / totals[_VOICED]
+            jitter = float(totals[_PERIOD_CHANGE] / totals[_PERIOD_PAIRS] / mean_period)
+
+        # Shimmer over the per-hop amplitude peaks
+        amplitudes = frames[:, _PEAK]
+        shimmer = float(np.std(amplitudes) / np.mean(amplitudes)) if len(amplitudes) > 1 and np.mean(amplitudes) > 0 else 0.0
+
+        return ParalinguisticFeatures(
+            pitch_variability=pitch_variability,
+            speech_rate=float(len(syllables) / duration) if duration > 0 else 0.0,
+            jitter=jitter,
+            shimmer=shimmer,
+            hnr=spectrum_hnr(spectrum)
+        )
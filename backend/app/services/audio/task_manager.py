@@ -1,123 +1,831 @@
 import asyncio
-import uuid
-from typing import Dict, List, Optional, Set
-import librosa
+import hashlib
+import multiprocessing
 import numpy as np
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Set, Tuple
 from fastapi import WebSocket
-from ...schemas.audio import AudioAnalysisResponse, ChunkStatus, AudioFeatures
-from .feature_extractor import FeatureExtractor
+from ...schemas.audio import AudioAnalysisResponse, AudioChunk, AudioFeatureType, ChunkStatus, AudioFeatures, TaskPriority
+from ...core.config import settings
+from ...core.metrics import metrics, CHUNKS_TOTAL, EXTRACTION_STAGE_SECONDS, FEATURE_SECONDS, PIPELINE_STAGE_SECONDS
+from .feature_extractor import FeatureExtractor, EXTRACTED_FEATURE_TYPES, extract_chunk_features, extract_mapped_chunk_features
+from .feature_cache import FeatureCache, file_content_hash
+from .decoder import AudioStreamReader
+from .decoded_cache import DecodedAudioCache
+from .feature_table import TaskFeatures
+from .overview import AudioOverview, OverviewStore
+from .vad import pause_aligned_chunks, speech_activity, speech_samples
+from .broadcast import ClientConnection, encode_message
+from .task_store import TaskStore
+from .upload import UploadSink
+from .transcription import TranscriptionBatcher
+from .scheduler import ChunkScheduler
 import logging
 
 logger = logging.getLogger(__name__)
 
 class AudioTaskManager:
     def __init__(self):
+        # Tasks that are still being processed
         self.tasks: Dict[str, AudioAnalysisResponse] = {}
-        self.clients: Dict[str, Set[WebSocket]] = {}
-        self.feature_extractor = FeatureExtractor()
+        # Recently finished or loaded tasks with their last access time, in LRU order
+        self.recent_tasks: "OrderedDict[str, Tuple[AudioAnalysisResponse, float]]" = OrderedDict()
+        # Task ids announced before their upload is complete enough to create the task
+        self.pending_tasks: Dict[str, asyncio.Event] = {}
+        # Chunk features of active and recent tasks as columns; the chunk models carry no
+        # features and are only filled in when a response is built
+        self.features: Dict[str, TaskFeatures] = {}
+        self.clients: Dict[str, Dict[WebSocket, ClientConnection]] = {}
+        self.feature_extractor = FeatureExtractor(sample_rate=settings.ANALYSIS_SAMPLE_RATE)
+        self.store = TaskStore(
+            settings.DATABASE_URL,
+            batch_size=settings.STORE_BATCH_SIZE,
+            flush_interval=settings.STORE_FLUSH_INTERVAL
+        )
+        self.feature_cache = FeatureCache(
+            settings.FEATURE_CACHE_DIR,
+            memory_bytes=settings.FEATURE_CACHE_MEMORY_BYTES,
+            disk_bytes=settings.FEATURE_CACHE_DISK_BYTES,
+            namespace=self.feature_extractor.cache_namespace
+        )
+        self.decoded_cache = DecodedAudioCache(settings.DECODED_CACHE_DIR, settings.DECODED_CACHE_BYTES)
+        self.overview_store = OverviewStore(settings.OVERVIEW_DIR, settings.OVERVIEW_CACHE_BYTES)
+        # Overviews of running tasks, filled in as their chunks are decoded
+        self.overviews: Dict[str, AudioOverview] = {}
+        # Shares the workers between all running tasks
+        self.scheduler = ChunkScheduler(settings.MAX_IN_FLIGHT_CHUNKS)
+        # Background processing of each running task, so it can be cancelled
+        self._runners: Dict[str, asyncio.Task] = {}
+        # Part of every status ETag: chunks rewritten at startup keep their version
+        self._instance_id = uuid.uuid4().hex[:8]
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._transcriber: Optional[TranscriptionBatcher] = None
+        self._register_gauges()
+
+    def _register_gauges(self):
+        """Gauges are read from live state only when /metrics is scraped"""
+        scheduler = self.scheduler
+        metrics.gauge("audio_in_flight_chunks", "Chunk jobs holding a scheduler slot", lambda: scheduler.stats()["in_flight"])
+        metrics.gauge(
+            "audio_queued_chunk_jobs", "Chunk jobs waiting for a scheduler slot",
+            lambda: {(lane,): waiting for lane, waiting in scheduler.stats()["waiting"].items()},
+            ["priority"]
+        )
+        metrics.gauge("audio_active_tasks", "Tasks still being processed", lambda: len(self.tasks))
+        metrics.gauge(
+            "audio_websocket_clients", "Connected WebSocket clients",
+            lambda: sum(len(connections) for connections in self.clients.values())
+        )
+        metrics.gauge(
+            "audio_websocket_queued_messages", "Messages waiting in WebSocket client queues",
+            lambda: sum(connection.queued for connections in self.clients.values() for connection in connections.values())
+        )
 
-    async def create_task(self, file_path: str, feature_types: List[str], chunk_duration: float = 5.0) -> str:
-        """Create a new audio analysis task"""
-        task_id = str(uuid.uuid4())
+    async def create_task(self, file_path: str, feature_types: List[str], chunk_duration: float = 5.0,
+                          content_hash: Optional[str] = None, audio_format: Optional[str] = None,
+                          upload: Optional[UploadSink] = None, task_id: Optional[str] = None,
+                          priority: TaskPriority = TaskPriority.NORMAL, align_to_pauses: bool = False) -> str:
+        """
+        Create a new audio analysis task.
+
+        `upload` may still be receiving data: decoding then starts right away and
+        reads the file as it grows, and the feature cache is only consulted once
+        the upload's content hash is known. The task's chunks are scheduled in
+        the `priority` lane of the shared scheduler. With `align_to_pauses`,
+        every chunk boundary is moved to the nearest pause (within
+        VAD_ALIGN_TOLERANCE seconds) as the audio is decoded.
+        """
+        task_id = task_id or str(uuid.uuid4())
         
         try:
-            # Load audio file
-            audio, sr = librosa.load(file_path, sr=None)
+            if upload is not None:
+                content_hash = upload.content_hash
+                audio_format = audio_format or upload.format
+            elif content_hash is None:
+                content_hash = await asyncio.to_thread(file_content_hash, file_path)
+            
+            # Only the header is read here (off the event loop); samples are decoded and
+            # resampled to the analysis rate chunk by chunk
+            reader = await asyncio.to_thread(
+                AudioStreamReader, file_path, upload, audio_format, settings.ANALYSIS_SAMPLE_RATE
+            )
+            sr = reader.sample_rate
             
             # Calculate chunk size in samples
             chunk_size = int(chunk_duration * sr)
-            total_chunks = int(np.ceil(len(audio) / chunk_size))
+            total_chunks = reader.total_chunks(chunk_size)
             
             # Initialize task status
-            self.tasks[task_id] = AudioAnalysisResponse(
+            task = self.tasks[task_id] = AudioAnalysisResponse(
                 task_id=task_id,
                 total_chunks=total_chunks,
                 chunks=[{
                     "chunk_id": i,
                     "start_time": i * chunk_duration,
-                    "end_time": min((i + 1) * chunk_duration, len(audio) / sr),
+                    "end_time": min((i + 1) * chunk_duration, reader.duration),
                     "status": ChunkStatus.PROCESSING,
                     "features": None,
                     "error": None
                 } for i in range(total_chunks)]
             )
+            self.features[task_id] = TaskFeatures(task.chunks)
+            self.overviews[task_id] = await asyncio.to_thread(
+                self.overview_store.create, task_id, sr, reader.frames, chunk_size, total_chunks
+            )
+            self.store.save_task(task)
             
             # Start processing in background
-            asyncio.create_task(self._process_audio(
+            runner = self._runners[task_id] = asyncio.create_task(self._process_audio(
                 task_id=task_id,
-                audio=audio,
-                sr=sr,
+                reader=reader,
                 chunk_size=chunk_size,
-                feature_types=feature_types
+                chunk_duration=chunk_duration,
+                feature_types=feature_types,
+                content_hash=content_hash,
+                upload=upload,
+                priority=priority,
+                align_to_pauses=align_to_pauses
             ))
+            runner.add_done_callback(lambda _: self._runners.pop(task_id, None))
             
             return task_id
             
         except Exception as e:
             logger.error(f"Error creating task: {str(e)}")
             raise
+        finally:
+            # Wake up clients that connected before the task existed
+            waiter = self.pending_tasks.pop(task_id, None)
+            if waiter is not None:
+                waiter.set()
 
-    async def _process_audio(self, task_id: str, audio: np.ndarray, sr: int, 
-                           chunk_size: int, feature_types: List[str]):
-        """Process audio file in chunks"""
-        task = self.tasks[task_id]
+    def expect_task(self, task_id: str):
+        """Announce a task id before the task exists (its upload is still arriving)"""
+        self.pending_tasks.setdefault(task_id, asyncio.Event())
+
+    def cancel_expected_task(self, task_id: str):
+        """Withdraw an announced task whose upload failed before the task was created"""
+        waiter = self.pending_tasks.pop(task_id, None)
+        if waiter is not None:
+            waiter.set()
+
+    def is_known_task(self, task_id: str) -> bool:
+        """Whether a task id is announced, in progress or finished"""
+        return task_id in self.pending_tasks or self.get_task_status(task_id) is not None
+
+    async def cancel_task(self, task_id: str) -> bool:
+        """
+        Stop a running task. Queued chunk jobs are dropped, extraction that has
+        not started is cancelled, and every unfinished chunk is marked CANCELLED.
+        Returns False if the task is not running.
+        """
+        runner = self._runners.get(task_id)
+        if runner is None or task_id not in self.tasks:
+            return False
         
-        for i in range(task.total_chunks):
+        runner.cancel()
+        try:
+            await runner
+        except asyncio.CancelledError:
+            pass
+        
+        task = self.tasks.get(task_id)
+        if task is None:
+            # Finished before the cancellation took effect
+            return False
+        for i, chunk in enumerate(task.chunks):
+            if chunk.status == ChunkStatus.PROCESSING:
+                chunk.status = ChunkStatus.CANCELLED
+                self._publish_chunk(task_id, i)
+        self._finish_task(task_id)
+        logger.info(f"Cancelled task {task_id}")
+        return True
+
+    async def wait_for_task(self, task_id: str, timeout: float) -> Optional[AudioAnalysisResponse]:
+        """Get a task, waiting up to `timeout` seconds if it has been announced but not created yet"""
+        waiter = self.pending_tasks.get(task_id)
+        if waiter is not None:
             try:
-                # Extract chunk
-                start = i * chunk_size
-                end = min(start + chunk_size, len(audio))
-                chunk = audio[start:end]
-                
-                # Extract features
-                features = self.feature_extractor.extract_features(chunk, feature_types)
+                await asyncio.wait_for(waiter.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self.get_task_status(task_id)
+
+    async def _process_audio(self, task_id: str, reader: AudioStreamReader, chunk_size: int,
+                           chunk_duration: float, feature_types: List[str], content_hash: Optional[str],
+                           upload: Optional[UploadSink] = None, priority: TaskPriority = TaskPriority.NORMAL,
+                           align_to_pauses: bool = False):
+        """Process audio file in chunks, decoding one chunk at a time"""
+        task = self.tasks[task_id]
+        features = self.features[task_id]
+        overview = self.overviews[task_id]
+        vad = self.feature_extractor.vad
+        skip_silence = self.feature_extractor.skip_silence
+        # Bounds decoded-but-unprocessed chunks so decoding never runs ahead of the workers
+        slots = asyncio.Semaphore(settings.MAX_PENDING_CHUNKS)
+        pending: Set[asyncio.Task] = set()
+        
+        # Look up every chunk's feature groups in the cache before decoding anything
+        cache_names = self._cache_names(feature_types, align_to_pauses)
+        if content_hash is not None:
+            cache_keys = self._feature_cache_keys(content_hash, chunk_duration, reader.sample_rate, task.total_chunks, cache_names)
+            with PIPELINE_STAGE_SECONDS.time("cache_lookup"):
+                cached = await asyncio.to_thread(self._lookup_cached_features, cache_keys)
+        else:
+            # The upload is still arriving, so there is nothing to look up yet
+            cache_keys = [None] * task.total_chunks
+            cached = [{} for _ in range(task.total_chunks)]
+        
+        # Fully cached chunks complete immediately and are never analyzed; when aligned
+        # to pauses, only once they have been cut
+        complete = {i for i, groups in enumerate(cached) if len(groups) == len(cache_names)}
+        bounds: Dict[int, Tuple[int, int]] = {}
+        waiting = sorted(complete) if align_to_pauses else []
+        if not align_to_pauses:
+            self._complete_cached(task_id, sorted(complete), cached, bounds, reader.sample_rate)
+        
+        # Files decoded before are sliced straight out of the decoded-audio map, and
+        # workers attach to the map themselves; otherwise a full decode is recorded
+        # into the map for the next run. Chunks aligned to pauses are cut from the
+        # whole stream, so cached chunks are decoded too (but not analyzed).
+        mapped = mapped_path = None
+        writer = None
+        decode_skip = frozenset() if align_to_pauses else complete
+        if content_hash is not None:
+            mapped = await asyncio.to_thread(self.decoded_cache.get, content_hash, reader.sample_rate)
+            if mapped is not None:
+                mapped_path = self.decoded_cache.path(content_hash, reader.sample_rate)
+        if mapped_path is not None:
+            chunks = (
+                (i, mapped[i * chunk_size:(i + 1) * chunk_size])
+                for i in range(task.total_chunks) if i not in decode_skip
+            )
+        else:
+            chunks = reader.iter_chunks(chunk_size, skip=decode_skip)
+            if not decode_skip:
+                writer = await asyncio.to_thread(self.decoded_cache.writer, reader.sample_rate, reader.frames)
+                chunks = writer.recording(chunks)
+        # The overview is computed from the same decoded samples
+        chunks = overview.recording(chunks)
+        # Chunks as (index, first sample, samples)
+        if align_to_pauses:
+            tolerance = int(settings.VAD_ALIGN_TOLERANCE * reader.sample_rate)
+            chunks = (
+                chunk for chunk in pause_aligned_chunks(chunks, chunk_size, tolerance, vad, bounds)
+                if chunk[0] not in complete
+            )
+        else:
+            chunks = ((i, i * chunk_size, chunk) for i, chunk in chunks)
+        
+        try:
+            for i in range(task.total_chunks):
+                if i in complete:
+                    continue
                 
-                # Convert features to proper model
-                audio_features = AudioFeatures(**features)
+                await slots.acquire()
+                try:
+                    # Wait for this task's turn at the shared workers
+                    await self.scheduler.acquire(task_id, priority)
+                except asyncio.CancelledError:
+                    slots.release()
+                    raise
+                try:
+                    # Decode the next chunk off the event loop
+                    with PIPELINE_STAGE_SECONDS.time("decode"):
+                        decoded = await asyncio.to_thread(next, chunks, None)
+                    if decoded is None or len(decoded[2]) == 0:
+                        raise ValueError("Audio stream ended before the expected number of chunks")
+                    index, start, chunk = decoded
+                    if index != i:
+                        raise ValueError(f"Decoder returned chunk {index} where chunk {i} was expected")
+                    # Find the speech regions the expensive feature groups are restricted to
+                    speech = None
+                    if skip_silence:
+                        with PIPELINE_STAGE_SECONDS.time("vad"):
+                            speech = await asyncio.to_thread(vad.detect, chunk)
+                except Exception as e:
+                    slots.release()
+                    self.scheduler.release(task_id)
+                    if writer is not None:
+                        writer.failed = True
+                    logger.error(f"Error decoding chunk {i}: {str(e)}")
+                    task.chunks[i].status = ChunkStatus.FAILED
+                    task.chunks[i].error = str(e)
+                    self._publish_chunk(task_id, i)
+                    continue
+                except asyncio.CancelledError:
+                    slots.release()
+                    self.scheduler.release(task_id)
+                    raise
                 
-                # Update chunk status
-                task.chunks[i].status = ChunkStatus.COMPLETED
-                task.chunks[i].features = audio_features
+                if align_to_pauses:
+                    self._set_chunk_bounds(task_id, i, start, start + len(chunk), reader.sample_rate)
+                    # Cached chunks before this one have been cut by now
+                    ready = [j for j in waiting if j < i]
+                    if ready:
+                        waiting = waiting[len(ready):]
+                        self._complete_cached(task_id, ready, cached, bounds, reader.sample_rate)
                 
+                # Extract only the feature groups that are not cached, in the process pool,
+                # and transcribe the decoded samples directly on the inference executor
+                missing = [ft for ft in feature_types if ft.value not in cached[i]]
+                futures = []
+                to_extract = [ft for ft in missing if ft != AudioFeatureType.TRANSCRIPTION]
+                if to_extract:
+                    source = None if mapped_path is None else (mapped_path, start, start + len(chunk))
+                    futures.append(asyncio.ensure_future(
+                        self._extract(chunk, to_extract, reader.sample_rate, source, speech)
+                    ))
+                if AudioFeatureType.TRANSCRIPTION in missing:
+                    futures.append(asyncio.ensure_future(self._transcribe(chunk, reader.sample_rate, speech)))
+                # Stored even when only transcripts are computed (the extractor reports the same group)
+                detected = {} if speech is None else {"speech": speech_activity(speech, reader.sample_rate, len(chunk))}
+                job = asyncio.create_task(
+                    self._complete_chunk(task_id, i, futures, slots, cached[i], cache_keys[i], detected)
+                )
+                pending.add(job)
+                job.add_done_callback(pending.discard)
+            
+            if pending:
+                await asyncio.gather(*pending)
+        except asyncio.CancelledError:
+            # Cancelled through cancel_task: drop the chunk jobs that are still running
+            for job in pending:
+                job.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            # Jobs cancelled before they started never released their slots
+            self.scheduler.forget(task_id)
+            if writer is not None:
+                writer.discard()
+            await self._close_overview(task_id)
+            raise
+        
+        if waiting:
+            # Cached chunks after the last analyzed one have not been cut yet
+            try:
+                await asyncio.to_thread(deque, chunks, 0)
             except Exception as e:
-                logger.error(f"Error processing chunk {i}: {str(e)}")
-                task.chunks[i].status = ChunkStatus.FAILED
-                task.chunks[i].error = str(e)
+                logger.error(f"Error aligning cached chunks: {str(e)}")
+            self._complete_cached(task_id, waiting, cached, bounds, reader.sample_rate)
+        
+        if content_hash is None and upload is not None:
+            # Cache the results now that the whole upload has been hashed
+            await upload.wait_finished()
+            if upload.content_hash is not None:
+                cache_keys = self._feature_cache_keys(
+                    upload.content_hash, chunk_duration, reader.sample_rate, task.total_chunks, cache_names
+                )
+                entries = []
+                for i, keys in enumerate(cache_keys):
+                    if task.chunks[i].status != ChunkStatus.COMPLETED:
+                        continue
+                    groups = features.get(i) or {}
+                    entries.extend((key, groups[group]) for group, key in keys.items() if group in groups)
+                await asyncio.to_thread(self.feature_cache.put_many, entries)
+        
+        if writer is not None:
+            final_hash = content_hash if content_hash is not None else upload.content_hash if upload is not None else None
+            if final_hash is not None:
+                try:
+                    await asyncio.to_thread(writer.commit, final_hash)
+                except Exception as e:
+                    # The results do not depend on the decoded-audio cache
+                    logger.error(f"Error caching decoded audio: {str(e)}")
+                    await asyncio.to_thread(writer.discard)
+            else:
+                await asyncio.to_thread(writer.discard)
+        
+        # Chunks whose features were all cached were never decoded
+        try:
+            if overview.missing_chunks():
+                await asyncio.to_thread(self._fill_overview, overview, reader, mapped)
+        finally:
+            await self._close_overview(task_id)
+        
+        self._finish_task(task_id)
+
+    @staticmethod
+    def _fill_overview(overview: AudioOverview, reader: AudioStreamReader, mapped: Optional[Any]):
+        """Decode the chunks missing from an overview, in order"""
+        missing = overview.missing_chunks()
+        try:
+            if mapped is not None:
+                for i in missing:
+                    overview.add_chunk(i, mapped[i * overview.chunk_size:(i + 1) * overview.chunk_size])
+            else:
+                skip = set(range(overview.total_chunks)) - set(missing)
+                for i, chunk in reader.iter_chunks(overview.chunk_size, skip=skip):
+                    overview.add_chunk(i, chunk)
+        except Exception as e:
+            logger.error(f"Error completing the overview: {str(e)}")
+
+    async def _close_overview(self, task_id: str):
+        """Write out a task's overview off the event loop; until then it is served as a running one"""
+        overview = self.overviews.get(task_id)
+        if overview is None:
+            return
+        try:
+            await asyncio.to_thread(self.overview_store.finished, overview, not overview.missing_chunks())
+        finally:
+            self.overviews.pop(task_id, None)
+
+    def get_overview(self, task_id: str) -> Optional[AudioOverview]:
+        """The overview of a running task, or of a finished one from disk"""
+        overview = self.overviews.get(task_id)
+        if overview is not None:
+            return overview
+        return self.overview_store.load(task_id)
+
+    def _cache_names(self, feature_types: List[AudioFeatureType], align_to_pauses: bool = False) -> Dict[str, str]:
+        """Cache entry name of every feature group a task stores, by group name"""
+        names = {}
+        for ft in feature_types:
+            if ft in EXTRACTED_FEATURE_TYPES:
+                names[ft.value] = ft.value
+            elif ft == AudioFeatureType.TRANSCRIPTION:
+                # Transcripts depend on the model rather than the extractor version
+                names[ft.value] = f"{ft.value}:{settings.WHISPER_MODEL}"
+        if self.feature_extractor.skip_silence:
+            names["speech"] = "speech"
+        if align_to_pauses:
+            # Chunks cut at pauses hold other samples than fixed-size ones
+            names = {group: f"{name}:pauses={settings.VAD_ALIGN_TOLERANCE}" for group, name in names.items()}
+        return names
+
+    def _feature_cache_keys(self, content_hash: str, chunk_duration: float, sample_rate: int,
+                            total_chunks: int, names: Dict[str, str]) -> List[Dict[str, str]]:
+        """Cache key of every feature group of every chunk"""
+        return [{
+            group: self.feature_cache.key(content_hash, chunk_duration, i, sample_rate, name)
+            for group, name in names.items()
+        } for i in range(total_chunks)]
+
+    def _lookup_cached_features(self, cache_keys: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Cached feature groups per chunk, keyed like the extractor output"""
+        cached = []
+        for keys in cache_keys:
+            groups = {}
+            for group, key in keys.items():
+                value = self.feature_cache.get(key)
+                if value is not None:
+                    groups[group] = value
+            cached.append(groups)
+        return cached
+
+    def _set_chunk_bounds(self, task_id: str, chunk_index: int, start: int, stop: int, sample_rate: int):
+        """Move a chunk to the given sample offsets (its boundaries were aligned to pauses)"""
+        chunk = self.tasks[task_id].chunks[chunk_index]
+        chunk.start_time, chunk.end_time = start / sample_rate, stop / sample_rate
+        self.features[task_id].set_bounds(chunk_index, chunk.start_time, chunk.end_time)
+
+    def _complete_cached(self, task_id: str, chunk_indices: List[int], cached: List[Dict[str, Any]],
+                         bounds: Dict[int, Tuple[int, int]], sample_rate: int):
+        """Complete chunks whose feature groups were all cached, at their pause-aligned bounds if known"""
+        task = self.tasks[task_id]
+        for i in chunk_indices:
+            if i in bounds:
+                self._set_chunk_bounds(task_id, i, *bounds[i], sample_rate)
+            self.features[task_id].set(i, cached[i])
+            task.chunks[i].status = ChunkStatus.COMPLETED
+            self._publish_chunk(task_id, i)
+
+    async def _complete_chunk(self, task_id: str, chunk_index: int, futures: List[asyncio.Future],
+                              slots: asyncio.Semaphore, cached_groups: Dict[str, Any],
+                              cache_keys: Optional[Dict[str, str]], detected: Optional[Dict[str, Any]] = None):
+        """Wait for a chunk's features, publish the result and cache the new groups (`detected` ones included)"""
+        chunk = self.tasks[task_id].chunks[chunk_index]
+        new_entries = []
+        
+        try:
+            features = dict(detected or {})
+            for result in await asyncio.gather(*futures):
+                features.update(result)
+            new_entries = [
+                (key, features[group])
+                for group, key in (cache_keys or {}).items()
+                if group in features
+            ]
             
-            # Notify clients
-            await self._notify_clients(task_id)
+            with PIPELINE_STAGE_SECONDS.time("store"):
+                self.features[task_id].set(chunk_index, {**cached_groups, **features})
+            chunk.status = ChunkStatus.COMPLETED
             
-            # Small delay to prevent overloading
-            await asyncio.sleep(0.1)
+        except Exception as e:
+            logger.error(f"Error processing chunk {chunk_index}: {str(e)}")
+            chunk.status = ChunkStatus.FAILED
+            chunk.error = str(e)
+        finally:
+            slots.release()
+            self.scheduler.release(task_id)
+        
+        # Notify clients
+        self._publish_chunk(task_id, chunk_index)
+        
+        if new_entries:
+            await asyncio.to_thread(self.feature_cache.put_many, new_entries)
+
+    async def _transcribe(self, chunk: Any, sample_rate: int, speech: Optional[Any] = None) -> Dict[str, str]:
+        if speech is not None:
+            # Only the speech regions are transcribed; silent chunks never reach the model
+            if len(speech) == 0:
+                return {"transcription": ""}
+            chunk = speech_samples(chunk, speech)
+        if self._transcriber is None:
+            self._transcriber = TranscriptionBatcher(
+                batch_size=settings.TRANSCRIPTION_BATCH_SIZE,
+                max_delay=settings.TRANSCRIPTION_BATCH_DELAY,
+                workers=settings.INFERENCE_WORKERS
+            )
+        with PIPELINE_STAGE_SECONDS.time("transcribe"):
+            started = time.perf_counter()
+            text = await self._transcriber.transcribe(chunk, sample_rate)
+            FEATURE_SECONDS.observe(time.perf_counter() - started, AudioFeatureType.TRANSCRIPTION.value)
+        return {"transcription": text}
+
+    async def _extract(self, chunk: Any, feature_types: List[AudioFeatureType], sample_rate: int,
+                       source: Optional[Tuple[str, int, int]] = None, speech: Optional[Any] = None) -> Dict[str, Any]:
+        """
+        Extract feature groups in the process pool and record the worker's stage timings.
+
+        With a `(path, start, stop)` source the worker reads the chunk from the
+        decoded-audio map itself, so the samples are not pickled. `speech` are
+        the chunk's regions from voice activity detection, if it ran.
+
+        Chunks go to the pool one job each. Stacked MFCCs
+        (`extract_chunk_features_batch`) are left to the batch CLI: the log and
+        DCT they share are a few ms per minute of audio, while holding chunks
+        back to fill a batch would delay each chunk's result and the decoder's
+        backpressure.
+        """
+        if source is not None:
+            job = (extract_mapped_chunk_features, *source, feature_types, sample_rate, speech)
+        else:
+            job = (extract_chunk_features, chunk, feature_types, sample_rate, speech)
+        with PIPELINE_STAGE_SECONDS.time("extract"):
+            features, timings = await self._submit_extraction(*job)
+        for name, seconds in timings.items():
+            if name in features:
+                FEATURE_SECONDS.observe(seconds, name)
+            else:
+                EXTRACTION_STAGE_SECONDS.observe(seconds, name)
+        return features
+
+    async def _submit_extraction(self, function: Any, *args: Any) -> Any:
+        """
+        Run an extraction entry point in the process pool.
+
+        A worker that dies takes the whole pool down, failing every job in it
+        when that job is awaited. Each such job swaps in a fresh pool (once,
+        however many jobs noticed) and is resubmitted there one time.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(executor, function, *args)
+        except BrokenProcessPool as e:
+            if self._executor is executor:
+                logger.error(f"Feature worker pool is broken ({str(e)}), starting a new one")
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+            return await loop.run_in_executor(self._get_executor(), function, *args)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Lazily start the feature extraction process pool"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=settings.FEATURE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def shutdown(self):
+        """Stop the feature extraction process pool and inference executor and flush the task store"""
+        for runner in list(self._runners.values()):
+            runner.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._transcriber is not None:
+            self._transcriber.shutdown()
+            self._transcriber = None
+        self.store.close()
 
     def get_task_status(self, task_id: str) -> Optional[AudioAnalysisResponse]:
-        """Get the current status of a task"""
-        return self.tasks.get(task_id)
+        """Get the current status of a task, reading through to the store for older tasks"""
+        task = self.tasks.get(task_id)
+        if task is not None:
+            return task
+        
+        entry = self.recent_tasks.get(task_id)
+        if entry is not None:
+            task = entry[0]
+        else:
+            task = self.store.load_task(task_id)
+            if task is not None:
+                self.features[task_id] = self._take_features(task)
+        
+        if task is not None:
+            self.recent_tasks[task_id] = (task, time.monotonic())
+            self.recent_tasks.move_to_end(task_id)
+        self._evict_recent_tasks()
+        return task
+
+    def task_response(self, task_id: str) -> Optional[AudioAnalysisResponse]:
+        """A task with the features of every chunk filled in, for returning from the API"""
+        task = self.get_task_status(task_id)
+        if task is None:
+            return None
+        return task.model_copy(update={"chunks": [self.chunk_response(task_id, chunk) for chunk in task.chunks]})
+
+    def feature_columns(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Feature columns of a task's completed chunks (see `TaskFeatures.columns`), or None for an unknown task"""
+        task = self.get_task_status(task_id)
+        if task is None:
+            return None
+        completed = np.array([chunk.status == ChunkStatus.COMPLETED for chunk in task.chunks], dtype=bool)
+        return self.features[task_id].columns(completed)
+
+    def status_etag(self, task: AudioAnalysisResponse, since: int = 0, cursor: Optional[int] = None, offset: int = 0,
+                    limit: Optional[int] = None, fields: Optional[List[str]] = None) -> str:
+        """
+        Entity tag of a status page (see `status_page`), which changes with the
+        task version and differs between pages and projections of one version
+        """
+        query = f"{since}|{cursor}|{offset}|{limit}|{','.join(fields) if fields is not None else ''}"
+        digest = hashlib.sha256(query.encode()).hexdigest()[:16]
+        return f'"{self._instance_id}-{task.version}-{digest}"'
+
+    def status_page(self, task_id: str, since: int = 0, cursor: Optional[int] = None, offset: int = 0,
+                    limit: Optional[int] = None, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Part of a task's status: the chunks changed after version `since` that
+        come after chunk id `cursor`, paged by `offset` and `limit`.
+
+        With `fields`, chunks carry only those chunk attributes and feature
+        paths (plus their id), read straight from the feature table.
+        `next_cursor` is the id to pass as `cursor` for the next page, or None
+        on the last one.
+        """
+        task = self.get_task_status(task_id)
+        if task is None:
+            return None
+        
+        chunks = task.chunks
+        if cursor is not None:
+            chunks = chunks[max(cursor + 1, 0):]
+        if since > 0:
+            chunks = [chunk for chunk in chunks if chunk.version > since]
+        end = offset + limit if limit is not None else len(chunks)
+        page = chunks[offset:end]
+        
+        if fields is None:
+            items = [self.chunk_response(task_id, chunk) for chunk in page]
+        else:
+            items = [self._project_chunk(task_id, chunk, fields) for chunk in page]
+        return {
+            "task_id": task.task_id,
+            "total_chunks": task.total_chunks,
+            "version": task.version,
+            "chunks": items,
+            "next_cursor": page[-1].chunk_id if page and end < len(chunks) else None
+        }
+
+    def _project_chunk(self, task_id: str, chunk: AudioChunk, fields: List[str]) -> Dict[str, Any]:
+        item = {"chunk_id": chunk.chunk_id}
+        feature_paths = []
+        for name in fields:
+            if name in AudioChunk.model_fields and name != "features":
+                item[name] = getattr(chunk, name)
+            else:
+                feature_paths.append(name)
+        if feature_paths:
+            features = self.features.get(task_id)
+            if "features" in feature_paths:
+                item["features"] = self.chunk_response(task_id, chunk).features
+            elif features is not None:
+                item["features"] = features.project(chunk.chunk_id, feature_paths)
+            else:
+                item["features"] = None
+        return item
+
+    def chunk_response(self, task_id: str, chunk: AudioChunk) -> AudioChunk:
+        """A chunk with its features filled in from the task's feature table"""
+        features = self.features.get(task_id)
+        groups = features.get(chunk.chunk_id) if features is not None else None
+        if groups is None:
+            return chunk
+        return chunk.model_copy(update={"features": AudioFeatures(**groups)})
+
+    @staticmethod
+    def _take_features(task: AudioAnalysisResponse) -> TaskFeatures:
+        """Move the features of a task read from the store into a feature table"""
+        features = TaskFeatures(task.chunks)
+        for chunk in task.chunks:
+            if chunk.features is not None:
+                features.set(chunk.chunk_id, chunk.features.model_dump())
+                chunk.features = None
+        return features
+
+    def _finish_task(self, task_id: str):
+        """Move a task whose chunks are all done out of the active set"""
+        task = self.tasks.pop(task_id, None)
+        if task is not None:
+            self.recent_tasks[task_id] = (task, time.monotonic())
+            self._evict_recent_tasks()
+
+    def _evict_recent_tasks(self):
+        """Drop finished tasks beyond the LRU size or TTL once they are safely in the store"""
+        now = time.monotonic()
+        overflow = len(self.recent_tasks) - settings.TASK_CACHE_SIZE
+        
+        for task_id, (task, last_access) in list(self.recent_tasks.items()):
+            expired = now - last_access > settings.TASK_CACHE_TTL
+            if (overflow > 0 or expired) and task_id not in self.clients and self.store.is_persisted(task):
+                del self.recent_tasks[task_id]
+                self.features.pop(task_id, None)
+                self.store.forget(task_id)
+                overflow -= 1
 
     def register_client(self, task_id: str, websocket: WebSocket):
         """Register a WebSocket client for task updates"""
         if task_id not in self.clients:
-            self.clients[task_id] = set()
-        self.clients[task_id].add(websocket)
+            self.clients[task_id] = {}
+        self.clients[task_id][websocket] = ClientConnection(
+            websocket,
+            max_queued=settings.WS_MAX_QUEUED_MESSAGES,
+            send_timeout=settings.WS_SEND_TIMEOUT,
+            on_close=lambda connection: self.unregister_client(task_id, connection.websocket)
+        )
 
     def unregister_client(self, task_id: str, websocket: WebSocket):
         """Unregister a WebSocket client"""
-        if task_id in self.clients:
-            self.clients[task_id].discard(websocket)
-            if not self.clients[task_id]:
-                del self.clients[task_id]
-
-    async def _notify_clients(self, task_id: str):
-        """Notify all clients about task updates"""
-        if task_id in self.clients and task_id in self.tasks:
-            dead_clients = set()
-            
-            for websocket in self.clients[task_id]:
-                try:
-                    await websocket.send_json(self.tasks[task_id].model_dump())
-                except Exception:
-                    dead_clients.add(websocket)
+        connections = self.clients.get(task_id)
+        if connections is None:
+            return
+        connection = connections.pop(websocket, None)
+        if not connections:
+            del self.clients[task_id]
+        if connection is not None:
+            connection.close()
+
+    def send_message(self, task_id: str, websocket: WebSocket, message: Dict[str, Any]):
+        """Queue a message for one registered client, behind any pending updates"""
+        connection = self.clients.get(task_id, {}).get(websocket)
+        if connection is not None:
+            connection.offer(encode_message(message))
+
+    def snapshot_message(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Full task state, sent when a client connects or cannot be patched"""
+        task = self.task_response(task_id)
+        if task is None:
+            return None
+        return {
+            "type": "snapshot",
+            "version": task.version,
+            "task": task
+        }
+
+    def changes_since(self, task_id: str, since: int) -> Optional[Dict[str, Any]]:
+        """Chunks that changed after version `since`, for clients resyncing after a gap or reconnect"""
+        task = self.get_task_status(task_id)
+        if task is None:
+            return None
+        if since <= 0 or since > task.version:
+            # Unknown or future version: the client has to start over
+            return self.snapshot_message(task_id)
+        return {
+            "type": "patch",
+            "version": task.version,
+            "chunks": [self.chunk_response(task_id, chunk) for chunk in task.chunks if chunk.version > since]
+        }
+
+    def _publish_chunk(self, task_id: str, chunk_index: int):
+        """Bump the task version and send the changed chunk to all clients"""
+        with PIPELINE_STAGE_SECONDS.time("publish"):
+            task = self.tasks[task_id]
+            task.version += 1
+            task.chunks[chunk_index].version = task.version
+            chunk = self.chunk_response(task_id, task.chunks[chunk_index])
+            self.store.save_chunk(task_id, task.version, chunk)
             
-            # Remove dead clients
-            for websocket in dead_clients:
-                self.unregister_client(task_id, websocket) 
\ No newline at end of file
+            self._notify_clients(task_id, {
+                "type": "chunk",
+                "version": task.version,
+                "chunk": chunk
+            })
+        CHUNKS_TOTAL.inc(chunk.status.value)
+
+    def _notify_clients(self, task_id: str, message: Dict[str, Any]):
+        """Encode an update once and queue it for every client watching the task"""
+        connections = self.clients.get(task_id)
+        if not connections:
+            return
+        
+        payload = encode_message(message)
+        # Slow clients are dropped (and unregistered) by offer() instead of delaying the others
+        for connection in list(connections.values()):
+            connection.offer(payload)
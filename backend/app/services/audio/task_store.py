@@ -0,0 +1,225 @@
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+from pydantic_core import to_json
+from ...schemas.audio import AudioAnalysisResponse, AudioChunk, ChunkStatus
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    task_id TEXT PRIMARY KEY,
+    total_chunks INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    task_id TEXT NOT NULL,
+    chunk_id INTEGER NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    status TEXT NOT NULL,
+    features TEXT,
+    error TEXT,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (task_id, chunk_id)
+);
+"""
+
+_UPSERT_TASK = """
+INSERT INTO tasks (task_id, total_chunks, version, created_at, updated_at) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(task_id) DO UPDATE SET version = MAX(version, excluded.version), updated_at = excluded.updated_at
+"""
+
+_UPSERT_CHUNK = """
+INSERT INTO chunks (task_id, chunk_id, start_time, end_time, status, features, error, version)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(task_id, chunk_id) DO UPDATE SET
+    start_time = excluded.start_time, end_time = excluded.end_time, status = excluded.status,
+    features = excluded.features, error = excluded.error, version = excluded.version
+"""
+
+def sqlite_path(database_url: str) -> str:
+    """Filesystem path of a `sqlite:///...` URL"""
+    prefix = "sqlite:///"
+    if not database_url.startswith(prefix):
+        raise ValueError(f"Only sqlite DATABASE_URLs are supported, got: {database_url}")
+    return database_url[len(prefix):]
+
+class TaskStore:
+    """SQLite-backed store for tasks and chunk results.
+
+    Writes are queued and applied by a background thread in batched
+    transactions, so callers on the event loop never wait on disk. Reads open
+    their own connection (the database runs in WAL mode, so they do not block
+    the writer).
+    """
+
+    def __init__(self, database_url: str, batch_size: int = 256, flush_interval: float = 0.5):
+        self.path = sqlite_path(database_url)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # Highest task version known to be committed, per task
+        self.persisted_versions: Dict[str, int] = {}
+
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            # Work that was in flight when the server stopped will never finish
+            conn.execute(
+                "UPDATE chunks SET status = ?, error = ? WHERE status = ?",
+                (ChunkStatus.FAILED.value, "Interrupted by server restart", ChunkStatus.PROCESSING.value)
+            )
+
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._run, name="task-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save_task(self, task: AudioAnalysisResponse):
+        """Queue the task row and all of its chunks"""
+        now = time.time()
+        self._queue.put((
+            task.task_id,
+            task.version,
+            (task.task_id, task.total_chunks, task.version, now, now),
+            [self._chunk_row(task.task_id, chunk) for chunk in task.chunks],
+            now
+        ))
+
+    def save_chunk(self, task_id: str, task_version: int, chunk: AudioChunk):
+        """Queue a single chunk update"""
+        now = time.time()
+        self._queue.put((
+            task_id,
+            task_version,
+            None,
+            [self._chunk_row(task_id, chunk)],
+            now
+        ))
+
+    def is_persisted(self, task: AudioAnalysisResponse) -> bool:
+        """Whether every update of the task up to its current version has been committed"""
+        return self.persisted_versions.get(task.task_id, -1) >= task.version
+
+    def forget(self, task_id: str):
+        """Stop tracking the persisted version of a task that is no longer held in memory"""
+        self.persisted_versions.pop(task_id, None)
+
+    def load_task(self, task_id: str) -> Optional[AudioAnalysisResponse]:
+        """Read a task and its chunks back from the database"""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT total_chunks, version FROM tasks WHERE task_id = ?", (task_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            chunk_rows = conn.execute(
+                "SELECT chunk_id, start_time, end_time, status, features, error, version "
+                "FROM chunks WHERE task_id = ? ORDER BY chunk_id",
+                (task_id,)
+            ).fetchall()
+
+        total_chunks, version = row
+        self.persisted_versions[task_id] = version
+        return AudioAnalysisResponse(
+            task_id=task_id,
+            total_chunks=total_chunks,
+            version=version,
+            chunks=[{
+                "chunk_id": chunk_id,
+                "start_time": start_time,
+                "end_time": end_time,
+                "status": status,
+                "features": json.loads(features) if features else None,
+                "error": error,
+                "version": chunk_version
+            } for chunk_id, start_time, end_time, status, features, error, chunk_version in chunk_rows]
+        )
+
+    def close(self):
+        """Flush pending writes and stop the writer thread"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    @staticmethod
+    def _chunk_row(task_id: str, chunk: AudioChunk) -> Tuple:
+        return (
+            task_id,
+            chunk.chunk_id,
+            chunk.start_time,
+            chunk.end_time,
+            chunk.status.value,
+            to_json(chunk.features).decode() if chunk.features is not None else None,
+            chunk.error,
+            chunk.version
+        )
+
+    def _run(self):
+        conn = self._connect()
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is _STOP:
+                    break
+
+                # Collect more updates until the batch is full or the flush interval passes
+                batch = [item]
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                self._write(conn, batch)
+        finally:
+            conn.close()
+
+    def _write(self, conn: sqlite3.Connection, batch: List[Tuple]):
+        task_rows = []
+        chunk_rows = []
+        task_updates = []
+        versions: Dict[str, int] = {}
+
+        for task_id, version, task_row, rows, updated_at in batch:
+            if task_row is not None:
+                task_rows.append(task_row)
+            else:
+                task_updates.append((version, updated_at, task_id))
+            chunk_rows.extend(rows)
+            versions[task_id] = max(versions.get(task_id, -1), version)
+
+        try:
+            with conn:
+                conn.executemany(_UPSERT_TASK, task_rows)
+                conn.executemany(
+                    "UPDATE tasks SET version = MAX(version, ?), updated_at = ? WHERE task_id = ?",
+                    task_updates
+                )
+                conn.executemany(_UPSERT_CHUNK, chunk_rows)
+        except Exception as e:
+            logger.error(f"Error writing {len(batch)} task updates: {str(e)}")
+            return
+
+        for task_id, version in versions.items():
+            self.persisted_versions[task_id] = max(self.persisted_versions.get(task_id, -1), version)
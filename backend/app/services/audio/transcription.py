@@ -0,0 +1,122 @@
+import asyncio
+import logging
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from math import gcd
+from typing import List, Optional, Tuple
+from scipy.signal import resample_poly
+from .processor import get_whisper_model
+
+logger = logging.getLogger(__name__)
+
+# Whisper consumes 16 kHz audio in 30 second windows
+WHISPER_SAMPLE_RATE = 16000
+WHISPER_WINDOW_SECONDS = 30
+
+def to_whisper_rate(audio: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Resample a mono chunk to 16 kHz float32 in memory"""
+    if sample_rate == WHISPER_SAMPLE_RATE:
+        return np.asarray(audio, dtype=np.float32)
+    divisor = gcd(WHISPER_SAMPLE_RATE, sample_rate)
+    return resample_poly(audio, WHISPER_SAMPLE_RATE // divisor, sample_rate // divisor).astype(np.float32)
+
+def transcribe_batch(chunks: List[Tuple[np.ndarray, int]], model_name: Optional[str] = None) -> List[str]:
+    """
+    Transcribe several decoded chunks with one batched Whisper decode.
+
+    Each `(audio, sample_rate)` chunk is resampled to 16 kHz and split into
+    30 second windows; the log-mel spectrograms of all windows are stacked and
+    decoded together, and the texts are joined back per chunk.
+    """
+    import torch
+    import whisper
+
+    model = get_whisper_model(model_name)
+    window = WHISPER_SAMPLE_RATE * WHISPER_WINDOW_SECONDS
+
+    mels = []
+    owners = []
+    for index, (audio, sample_rate) in enumerate(chunks):
+        audio = to_whisper_rate(audio, sample_rate)
+        for start in range(0, max(len(audio), 1), window):
+            segment = whisper.pad_or_trim(torch.from_numpy(audio[start:start + window]))
+            mels.append(whisper.log_mel_spectrogram(segment, n_mels=model.dims.n_mels))
+            owners.append(index)
+
+    options = whisper.DecodingOptions(
+        language=None if model.is_multilingual else "en",
+        fp16=model.device.type == "cuda",
+        without_timestamps=True
+    )
+    results = whisper.decode(model, torch.stack(mels).to(model.device), options)
+
+    texts: List[List[str]] = [[] for _ in chunks]
+    for owner, result in zip(owners, results):
+        text = result.text.strip()
+        if text:
+            texts[owner].append(text)
+    return [" ".join(parts) for parts in texts]
+
+class TranscriptionBatcher:
+    """Groups transcription requests that arrive close together into batches.
+
+    Requests are collected until `batch_size` are waiting or `max_delay`
+    seconds have passed since the first one, then decoded together on a
+    dedicated inference executor whose size bounds how many batches run at once.
+    """
+
+    def __init__(self, batch_size: int, max_delay: float, workers: int, model_name: Optional[str] = None):
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.model_name = model_name
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="inference")
+        self._pending: List[Tuple[np.ndarray, int, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    async def transcribe(self, audio: np.ndarray, sample_rate: int) -> str:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((audio, sample_rate, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._flush)
+        return await future
+
+    def shutdown(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        loop = asyncio.get_running_loop()
+        job = loop.run_in_executor(
+            self.executor,
+            transcribe_batch,
+            [(audio, sample_rate) for audio, sample_rate, _ in batch],
+            self.model_name
+        )
+
+        def deliver(job: asyncio.Future):
+            futures = [future for _, _, future in batch]
+            if job.cancelled() or job.exception() is not None:
+                error = job.exception() if not job.cancelled() else asyncio.CancelledError()
+                logger.error(f"Error transcribing {len(batch)} chunks: {str(error)}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+                return
+            for future, text in zip(futures, job.result()):
+                if not future.done():
+                    future.set_result(text)
+
+        job.add_done_callback(deliver)
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import io
+import os
+import threading
+from typing import Optional
+import aiofiles
+
+# Bytes of the upload kept for format sniffing
+SNIFF_BYTES = 64
+
+def sniff_audio_format(header: bytes) -> Optional[str]:
+    """Guess the container format from the first bytes of a file"""
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return "wav"
+    if header[:4] == b"FORM" and header[8:12] in (b"AIFF", b"AIFC"):
+        return "aiff"
+    if header[:4] == b"fLaC":
+        return "flac"
+    if header[:4] == b"OggS":
+        return "ogg"
+    if header[:3] == b"ID3" or (len(header) > 1 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0 and header[1] & 0x06):
+        return "mp3"
+    if header[4:8] == b"ftyp":
+        return "mp4"
+    if header[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if len(header) > 1 and header[0] == 0xFF and header[1] & 0xF6 == 0xF0:
+        return "aac"
+    return None
+
+class UploadSink:
+    """Receives an upload block by block, writing it to disk asynchronously.
+
+    The content hash and format are computed in the same pass as the write, and
+    readers in other threads can wait for more bytes (see `GrowingFile`), which
+    lets decoding start before the upload has finished.
+    """
+
+    def __init__(self, path: str, expected_size: Optional[int] = None):
+        self.path = path
+        self.expected_size = expected_size
+        self.bytes_written = 0
+        self.content_hash: Optional[str] = None
+        self.format: Optional[str] = None
+        self.complete = False
+        self.error: Optional[Exception] = None
+
+        self._digest = hashlib.sha256()
+        self._header = b""
+        self._file = None
+        self._condition = threading.Condition()
+        self._finished = asyncio.Event()
+
+    async def open(self):
+        self._file = await aiofiles.open(self.path, "wb")
+
+    async def write(self, block: bytes):
+        """Append a block, updating the hash and sniffing the format on the first bytes"""
+        if len(self._header) < SNIFF_BYTES:
+            self._header += block[:SNIFF_BYTES - len(self._header)]
+            if len(self._header) >= SNIFF_BYTES:
+                self.format = sniff_audio_format(self._header)
+        self._digest.update(block)
+
+        await self._file.write(block)
+        # Make the bytes visible to readers of the path
+        await self._file.flush()
+
+        with self._condition:
+            self.bytes_written += len(block)
+            self._condition.notify_all()
+
+    async def finish(self):
+        """Mark the upload as complete"""
+        await self._file.close()
+        if self.format is None:
+            self.format = sniff_audio_format(self._header)
+        self.content_hash = self._digest.hexdigest()
+        self._set_complete()
+
+    async def abort(self, error: Exception):
+        """Mark the upload as failed; waiting readers raise `error`"""
+        if self._file is not None:
+            await self._file.close()
+        self.error = error
+        self._set_complete()
+
+    async def wait_finished(self):
+        """Wait (on the event loop) until the upload completed or failed"""
+        await self._finished.wait()
+
+    def wait_for(self, size: int) -> int:
+        """Block until at least `size` bytes are on disk or the upload ended; returns bytes available"""
+        with self._condition:
+            while self.bytes_written < size and not self.complete:
+                self._condition.wait()
+            if self.error is not None:
+                raise IOError(f"Upload failed: {str(self.error)}")
+            return self.bytes_written
+
+    def total_size(self) -> int:
+        """Final size of the upload, waiting for completion if the client did not announce it"""
+        if self.expected_size is not None:
+            return self.expected_size
+        return self.wait_for(float("inf"))
+
+    def _set_complete(self):
+        with self._condition:
+            self.complete = True
+            self._condition.notify_all()
+        self._finished.set()
+
+class GrowingFile(io.RawIOBase):
+    """Read-only file object over an upload that may still be in progress.
+
+    Reads past the bytes received so far block until they arrive, so decoders
+    (soundfile accepts file objects) can run concurrently with the upload.
+    """
+
+    def __init__(self, sink: UploadSink):
+        super().__init__()
+        self._sink = sink
+        self._file = open(sink.path, "rb")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        available = self._sink.wait_for(self._position + len(buffer))
+        count = min(len(buffer), available - self._position)
+        if count <= 0:
+            return 0
+        self._file.seek(self._position)
+        count = self._file.readinto(memoryview(buffer)[:count])
+        self._position += count
+        return count
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            self._position = offset
+        elif whence == os.SEEK_CUR:
+            self._position += offset
+        else:
+            self._position = self._sink.total_size() + offset
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        self._file.close()
+        super().close()
@@ -0,0 +1,158 @@
+import numpy as np
+from scipy.fft import rfft
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+class VoiceActivityDetector:
+    """Energy and spectral-flatness voice activity detection.
+
+    The signal is cut into non-overlapping frames of `frame_seconds`. A frame
+    is speech when it is louder than `energy_db` (dBFS) and than the chunk's
+    noise floor (its 10th-percentile frame energy) plus `noise_margin_db`, and
+    its power spectrum is peaky rather than noise-like (spectral flatness
+    below `max_flatness`). Pauses shorter than `min_silence` seconds are
+    bridged, speech shorter than `min_speech` is dropped, and every region is
+    widened by `padding` on both sides.
+    """
+
+    def __init__(self, sample_rate: int, frame_seconds: float = 0.02, energy_db: float = -50.0,
+                 noise_margin_db: float = 6.0, max_flatness: float = 0.45, min_speech: float = 0.1,
+                 min_silence: float = 0.3, padding: float = 0.1):
+        self.sample_rate = sample_rate
+        self.frame_length = max(1, int(round(frame_seconds * sample_rate)))
+        self.energy_db = energy_db
+        self.noise_margin_db = noise_margin_db
+        self.max_flatness = max_flatness
+        self.min_speech_frames = int(np.ceil(min_speech * sample_rate / self.frame_length))
+        self.min_silence_frames = int(np.ceil(min_silence * sample_rate / self.frame_length))
+        self.padding = int(round(padding * sample_rate))
+        self._window = np.hanning(self.frame_length).astype(np.float32)
+
+    @property
+    def namespace(self) -> str:
+        """Identifies the settings that affect detected regions"""
+        return (
+            f"{self.frame_length}:{self.energy_db}:{self.noise_margin_db}:{self.max_flatness}:"
+            f"{self.min_speech_frames}:{self.min_silence_frames}:{self.padding}"
+        )
+
+    def frame_features(self, audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Energy (dBFS) and spectral flatness of every whole frame of `audio`"""
+        n_frames = len(audio) // self.frame_length
+        frames = np.asarray(audio[:n_frames * self.frame_length], dtype=np.float32).reshape(n_frames, self.frame_length)
+        energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1, dtype=np.float64) + 1e-12)
+        power = np.abs(rfft(frames * self._window, axis=1)) ** 2 + 1e-12
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        return energy_db, flatness
+
+    def speech_frames(self, audio: np.ndarray) -> np.ndarray:
+        """Per-frame speech decision before smoothing"""
+        return self._speech_mask(*self.frame_features(audio))
+
+    def _speech_mask(self, energy_db: np.ndarray, flatness: np.ndarray) -> np.ndarray:
+        if len(energy_db) == 0:
+            return np.zeros(0, dtype=bool)
+        threshold = max(self.energy_db, float(np.percentile(energy_db, 10)) + self.noise_margin_db)
+        return (energy_db > threshold) & (flatness < self.max_flatness)
+
+    def detect(self, audio: np.ndarray) -> np.ndarray:
+        """Speech regions of `audio` as an (n, 2) array of `[start, stop)` sample offsets"""
+        speech = self.speech_frames(audio)
+        starts, stops = _runs(speech)
+        if len(starts) == 0:
+            return np.zeros((0, 2), dtype=np.int64)
+
+        # Bridge short pauses, then drop what is still too short to be speech
+        keep = np.concatenate([[True], starts[1:] - stops[:-1] >= self.min_silence_frames])
+        starts = starts[keep]
+        stops = stops[np.concatenate([keep[1:], [True]])]
+        long_enough = stops - starts >= self.min_speech_frames
+        starts, stops = starts[long_enough], stops[long_enough]
+        if len(starts) == 0:
+            return np.zeros((0, 2), dtype=np.int64)
+
+        # Frame runs to padded sample ranges; padding may join neighbours again
+        begin = np.maximum(starts * self.frame_length - self.padding, 0)
+        end = np.minimum(stops * self.frame_length + self.padding, len(audio))
+        joined = np.concatenate([[True], begin[1:] > end[:-1]])
+        begin = begin[joined]
+        end = end[np.concatenate([joined[1:], [True]])]
+        return np.stack([begin, end], axis=1).astype(np.int64)
+
+    def find_pause(self, audio: np.ndarray) -> int:
+        """
+        Sample offset in `audio` that is best to cut at: the middle of its
+        longest non-speech stretch, or of its quietest frame when it is all speech.
+        """
+        energy_db, flatness = self.frame_features(audio)
+        if len(energy_db) == 0:
+            return len(audio) // 2
+        starts, stops = _runs(~self._speech_mask(energy_db, flatness))
+        if len(starts) > 0:
+            longest = np.argmax(stops - starts)
+            middle = (starts[longest] + stops[longest]) / 2
+        else:
+            middle = np.argmin(energy_db) + 0.5
+        return int(middle * self.frame_length)
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Start and stop indices of the runs of True in a boolean array"""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+def speech_samples(audio: np.ndarray, regions: np.ndarray) -> np.ndarray:
+    """The samples of the speech regions, concatenated"""
+    if len(regions) == 0:
+        return audio[:0]
+    if len(regions) == 1:
+        return audio[regions[0][0]:regions[0][1]]
+    return np.concatenate([audio[start:stop] for start, stop in regions])
+
+def speech_activity(regions: np.ndarray, sample_rate: int, num_samples: int) -> Dict[str, Any]:
+    """The `speech` feature group of a chunk: its speech ratio and regions in seconds"""
+    voiced = int(np.sum(regions[:, 1] - regions[:, 0])) if len(regions) else 0
+    return {
+        "ratio": voiced / num_samples if num_samples else 0.0,
+        "regions": [[start / sample_rate, stop / sample_rate] for start, stop in regions.tolist()]
+    }
+
+def pause_aligned_chunks(chunks: Iterable[Tuple[int, np.ndarray]], chunk_size: int, tolerance: int,
+                         detector: VoiceActivityDetector,
+                         bounds: Optional[Dict[int, Tuple[int, int]]] = None) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """
+    Re-cut contiguous fixed-size chunks so that every boundary falls on a pause.
+
+    Each boundary is moved to the pause `detector` finds within `tolerance`
+    samples of its nominal position, so the number of chunks stays the same.
+    `chunks` must yield every chunk in order. Yields `(index, start, samples)`
+    and, with `bounds`, records each chunk's `(start, stop)` sample offsets there.
+    """
+    # Tolerance below half a chunk keeps every chunk non-empty
+    tolerance = min(tolerance, chunk_size // 4)
+    buffer = np.zeros(0, dtype=np.float32)
+    # Offset of buffer[0] in the stream and index of the chunk starting there
+    start = index = 0
+
+    def cut(end: int) -> Tuple[int, int, np.ndarray]:
+        nonlocal buffer, start, index
+        low = (index + 1) * chunk_size - tolerance - start
+        at = low + detector.find_pause(buffer[low:end - start])
+        chunk = (index, start, buffer[:at])
+        if bounds is not None:
+            bounds[index] = (start, start + at)
+        buffer, start, index = buffer[at:], start + at, index + 1
+        return chunk
+
+    for _, samples in chunks:
+        buffer = np.concatenate([buffer, samples])
+        # Cut once the whole search window around the next boundary has been decoded
+        while start + len(buffer) >= (index + 1) * chunk_size + tolerance:
+            yield cut((index + 1) * chunk_size + tolerance)
+
+    # End of the stream: boundaries before the end search what is left, the last chunk takes the rest
+    while len(buffer) > 0:
+        if start + len(buffer) <= (index + 1) * chunk_size:
+            if bounds is not None:
+                bounds[index] = (start, start + len(buffer))
+            yield index, start, buffer
+            return
+        yield cut(start + len(buffer))
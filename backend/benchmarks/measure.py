@@ -0,0 +1,87 @@
+import gc
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict
+
+def peak_rss_bytes() -> int:
+    """High-water resident set size of this process"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _reset_peak_rss() -> bool:
+    """Reset the RSS high-water mark (Linux only); returns False where it cannot be reset"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+def measure(fn: Callable[[], Any], audio_seconds: float, min_time: float = 0.5,
+            max_repeats: int = 5) -> Dict[str, Any]:
+    """
+    Time `fn` and record its memory use.
+
+    `fn` is called once to warm up, then repeated until `min_time` seconds have
+    passed (at most `max_repeats` times); the fastest call counts. Allocations
+    are measured in a separate traced call, since tracemalloc slows everything
+    down. The real-time factor is processing time over audio duration, so lower
+    is faster and 1.0 keeps up with real time.
+    """
+    fn()
+    gc.collect()
+    rss_reset = _reset_peak_rss()
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < max_repeats and (not timings or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+    peak_rss = peak_rss_bytes()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, alloc_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(timings)
+    return {
+        "repeats": len(timings),
+        "seconds": best,
+        "mean_seconds": sum(timings) / len(timings),
+        "rtf": best / audio_seconds if audio_seconds > 0 else None,
+        "peak_rss_bytes": peak_rss,
+        # Without a reset this is the process-wide peak so far, not this case's
+        "peak_rss_is_per_case": rss_reset,
+        "alloc_peak_bytes": alloc_peak
+    }
+
+def environment() -> Dict[str, Any]:
+    """Machine and library versions, stored with every result file"""
+    import platform
+    import numpy as np
+    import scipy
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")
+    }
@@ -0,0 +1,230 @@
+"""
+Throughput benchmarks for feature extraction and the task pipeline.
+
+Run from the backend directory:
+
+    python -m benchmarks.run --output benchmarks/results/baseline.json
+    python -m benchmarks.run --baseline benchmarks/results/baseline.json
+
+Every FeatureExtractor method is timed on synthetic signals for each chunk
+duration and sample rate, and the whole AudioTaskManager flow (decode,
+schedule, extract in the process pool, publish) is timed on a synthetic file.
+With --baseline, cases that got slower than the threshold are reported and the
+exit status is 1.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import soundfile as sf
+
+from app.core.config import settings
+from app.schemas.audio import AudioFeatureType, ChunkStatus
+from app.services.audio.feature_extractor import FeatureExtractor
+from .measure import peak_rss_bytes, environment, measure
+from .signals import SIGNALS
+
+SAMPLE_RATES = [16000, 22050, 48000]
+CHUNK_DURATIONS = [1.0, 5.0, 60.0]
+EXTRACTED = [AudioFeatureType.ACOUSTIC, AudioFeatureType.PARALINGUISTIC]
+
+# Each method as it is called during extraction; the ones taking a ChunkAnalysis
+# include building it, since that is where the shared STFT and F0 work happens
+METHODS: Dict[str, Callable[[FeatureExtractor, np.ndarray], Any]] = {
+    "extract_features": lambda ex, audio: ex.extract_features(audio, EXTRACTED),
+    "_extract_acoustic_features": lambda ex, audio: ex._extract_acoustic_features(
+        ex._analyze(audio, [AudioFeatureType.ACOUSTIC])
+    ),
+    "_compute_spectral_features": lambda ex, audio: ex._compute_spectral_features(ex._analyze(audio, [])),
+    "_extract_paralinguistic_features": lambda ex, audio: ex._extract_paralinguistic_features(
+        ex._analyze(audio, [AudioFeatureType.PARALINGUISTIC])
+    ),
+    # librosa-based helpers, kept to catch them getting wired back in
+    "_extract_pitch": lambda ex, audio: ex._extract_pitch(audio),
+    "_extract_emotion_scores": lambda ex, audio: ex._extract_emotion_scores(audio),
+    "_extract_speaking_rate": lambda ex, audio: ex._extract_speaking_rate(audio),
+    "_calculate_pitch_variability": lambda ex, audio: ex._calculate_pitch_variability(audio),
+    "_calculate_speech_rate": lambda ex, audio: ex._calculate_speech_rate(audio),
+    "_calculate_voice_quality": lambda ex, audio: ex._calculate_voice_quality(audio),
+    "_calculate_hnr": lambda ex, audio: ex._calculate_hnr(audio)
+}
+
+def run_methods(methods: List[str], signals: List[str], rates: List[int], durations: List[float],
+                min_time: float, max_repeats: int) -> List[Dict[str, Any]]:
+    results = []
+    for rate in rates:
+        extractor = FeatureExtractor(sample_rate=rate, spectral_time_series=False)
+        for duration in durations:
+            for signal in signals:
+                audio = SIGNALS[signal](duration, rate)
+                for method in methods:
+                    result = measure(
+                        lambda: METHODS[method](extractor, audio), duration,
+                        min_time=min_time, max_repeats=max_repeats
+                    )
+                    results.append(_report({
+                        "case": f"{method}/{signal}/{rate}/{duration:g}s",
+                        "kind": "method",
+                        "method": method,
+                        "signal": signal,
+                        "sample_rate": rate,
+                        "chunk_duration": duration,
+                        **result
+                    }))
+    return results
+
+async def _run_pipeline(signals: List[str], rates: List[int], durations: List[float],
+                        file_seconds: float, repeats: int, workdir: str) -> List[Dict[str, Any]]:
+    from app.services.audio.task_manager import AudioTaskManager
+
+    # Keep the benchmark's tasks and cache entries out of the real ones
+    settings.DATABASE_URL = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    settings.FEATURE_CACHE_DIR = os.path.join(workdir, "feature_cache")
+    manager = AudioTaskManager()
+
+    async def run_task(path: str, chunk_duration: float) -> float:
+        started = time.perf_counter()
+        # A fresh content hash every run, so no chunk is served from the feature cache
+        task_id = await manager.create_task(path, EXTRACTED, chunk_duration, content_hash=uuid.uuid4().hex)
+        while True:
+            task = manager.get_task_status(task_id)
+            if all(chunk.status != ChunkStatus.PROCESSING for chunk in task.chunks):
+                break
+            await asyncio.sleep(0.005)
+        elapsed = time.perf_counter() - started
+        failed = [chunk.error for chunk in task.chunks if chunk.status != ChunkStatus.COMPLETED]
+        if failed:
+            raise RuntimeError(f"Pipeline benchmark chunk failed: {failed[0]}")
+        return elapsed
+
+    results = []
+    try:
+        for rate in rates:
+            for signal in signals:
+                path = os.path.join(workdir, f"{signal}_{rate}.wav")
+                sf.write(path, SIGNALS[signal](file_seconds, rate), rate, subtype="FLOAT")
+                # Warm up: start the worker processes and their extractors
+                await run_task(path, CHUNK_DURATIONS[0])
+                for duration in durations:
+                    timings = [await run_task(path, duration) for _ in range(repeats)]
+                    best = min(timings)
+                    results.append(_report({
+                        "case": f"pipeline/{signal}/{rate}/{duration:g}s",
+                        "kind": "pipeline",
+                        "signal": signal,
+                        "sample_rate": rate,
+                        "chunk_duration": duration,
+                        "file_seconds": file_seconds,
+                        "repeats": repeats,
+                        "seconds": best,
+                        "mean_seconds": sum(timings) / len(timings),
+                        "rtf": best / file_seconds,
+                        "peak_rss_bytes": peak_rss_bytes(),
+                        "peak_rss_is_per_case": False,
+                        "worker_peak_rss_bytes": _worker_peak_rss(manager),
+                        "alloc_peak_bytes": None
+                    }))
+    finally:
+        manager.shutdown()
+    return results
+
+def _worker_peak_rss(manager) -> Optional[int]:
+    """Largest RSS high-water mark among the extraction worker processes (Linux only)"""
+    executor = manager._executor
+    if executor is None or not getattr(executor, "_processes", None):
+        return None
+    peaks = []
+    for pid in executor._processes:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        peaks.append(int(line.split()[1]) * 1024)
+        except OSError:
+            continue
+    return max(peaks) if peaks else None
+
+def run_pipeline(signals: List[str], rates: List[int], durations: List[float],
+                 file_seconds: float, repeats: int) -> List[Dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as workdir:
+        return asyncio.run(_run_pipeline(signals, rates, durations, file_seconds, repeats, workdir))
+
+def _report(result: Dict[str, Any]) -> Dict[str, Any]:
+    alloc = result.get("alloc_peak_bytes")
+    print(
+        f"{result['case']:<58} rtf {result['rtf']:8.4f}  {result['seconds'] * 1000:9.1f} ms"
+        f"  rss {result['peak_rss_bytes'] / 2 ** 20:7.1f} MB"
+        + (f"  alloc {alloc / 2 ** 20:7.1f} MB" if alloc is not None else ""),
+        flush=True
+    )
+    return result
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float) -> List[str]:
+    """Cases whose real-time factor grew by more than `threshold` relative to the baseline"""
+    with open(baseline_path) as f:
+        baseline = {result["case"]: result for result in json.load(f)["results"]}
+
+    regressions = []
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        previous = baseline.get(result["case"])
+        if previous is None or not previous.get("rtf"):
+            continue
+        ratio = result["rtf"] / previous["rtf"]
+        marker = ""
+        if ratio > 1 + threshold:
+            marker = "  REGRESSION"
+            regressions.append(result["case"])
+        elif ratio < 1 - threshold:
+            marker = "  faster"
+        print(f"{result['case']:<58} {previous['rtf']:8.4f} -> {result['rtf']:8.4f}  x{ratio:5.2f}{marker}")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--methods", nargs="+", choices=list(METHODS), default=list(METHODS))
+    parser.add_argument("--signals", nargs="+", choices=list(SIGNALS), default=list(SIGNALS))
+    parser.add_argument("--rates", nargs="+", type=int, default=SAMPLE_RATES)
+    parser.add_argument("--durations", nargs="+", type=float, default=CHUNK_DURATIONS)
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds to keep repeating each method case")
+    parser.add_argument("--max-repeats", type=int, default=5)
+    parser.add_argument("--skip-methods", action="store_true", help="only run the pipeline benchmark")
+    parser.add_argument("--skip-pipeline", action="store_true", help="only run the method benchmarks")
+    parser.add_argument("--pipeline-signals", nargs="+", choices=list(SIGNALS), default=["speech"])
+    parser.add_argument("--pipeline-seconds", type=float, default=120.0, help="length of the pipeline test file")
+    parser.add_argument("--pipeline-repeats", type=int, default=2)
+    parser.add_argument("--output", help="write results as JSON (use it later as a --baseline)")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+
+    results = []
+    if not args.skip_methods:
+        results += run_methods(args.methods, args.signals, args.rates, args.durations, args.min_time, args.max_repeats)
+    if not args.skip_pipeline:
+        results += run_pipeline(
+            args.pipeline_signals, args.rates, args.durations, args.pipeline_seconds, args.pipeline_repeats
+        )
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump({"environment": environment(), "results": results}, f, indent=2)
+        print(f"\nWrote {len(results)} results to {args.output}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
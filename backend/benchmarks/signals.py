@@ -0,0 +1,61 @@
+import numpy as np
+from typing import Callable, Dict
+
+# Fixed seed so every run benchmarks the same samples
+SEED = 1234
+
+def tone(duration: float, sample_rate: int) -> np.ndarray:
+    """220 Hz sine with a few harmonics"""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    audio = sum(np.sin(2 * np.pi * 220 * k * t) / k for k in range(1, 5))
+    return (0.3 * audio).astype(np.float32)
+
+def chirp(duration: float, sample_rate: int) -> np.ndarray:
+    """Logarithmic sweep from 50 Hz to just below Nyquist, restarting every second"""
+    t = (np.arange(int(duration * sample_rate)) / sample_rate) % 1.0
+    f0, f1 = 50.0, 0.45 * sample_rate
+    k = np.log(f1 / f0)
+    phase = 2 * np.pi * f0 * (np.exp(k * t) - 1) / k
+    return (0.5 * np.sin(phase)).astype(np.float32)
+
+def noise(duration: float, sample_rate: int) -> np.ndarray:
+    """White Gaussian noise"""
+    rng = np.random.default_rng(SEED)
+    return (0.1 * rng.standard_normal(int(duration * sample_rate))).astype(np.float32)
+
+def speech_like(duration: float, sample_rate: int) -> np.ndarray:
+    """
+    Voiced bursts at a syllable-like rate: a glottal pulse train with a drifting
+    F0, shaped by two formant resonances, gated by a smooth ~4 Hz envelope and
+    mixed with a little breath noise.
+    """
+    from scipy.signal import lfilter
+
+    rng = np.random.default_rng(SEED)
+    n = int(duration * sample_rate)
+    t = np.arange(n) / sample_rate
+
+    # F0 drifting between roughly 100 and 160 Hz
+    f0 = 130 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    phase = np.cumsum(f0) / sample_rate
+    pulses = (np.diff(np.floor(phase), prepend=0) > 0).astype(np.float64)
+
+    source = pulses + 0.02 * rng.standard_normal(n)
+    for formant, bandwidth in ((700, 130), (1220, 70)):
+        if formant < sample_rate / 2:
+            r = np.exp(-np.pi * bandwidth / sample_rate)
+            theta = 2 * np.pi * formant / sample_rate
+            source = lfilter([1 - r], [1, -2 * r * np.cos(theta), r * r], source)
+
+    # Syllable envelope: raised cosine bursts with short pauses
+    syllables = np.maximum(np.sin(2 * np.pi * 4 * t + rng.uniform(0, np.pi)), 0) ** 2
+    audio = source * syllables
+    peak = np.max(np.abs(audio))
+    return (0.5 * audio / peak if peak > 0 else audio).astype(np.float32)
+
+SIGNALS: Dict[str, Callable[[float, int], np.ndarray]] = {
+    "tone": tone,
+    "chirp": chirp,
+    "noise": noise,
+    "speech": speech_like
+}
@@ -0,0 +1,58 @@
+import io
+import os
+import tempfile
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+# Keep the task store and the caches of the app under test out of the working tree;
+# settings are read when app modules are first imported
+_STATE_DIR = tempfile.mkdtemp(prefix="audio-research-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_STATE_DIR, 'app.db')}")
+os.environ.setdefault("FEATURE_CACHE_DIR", os.path.join(_STATE_DIR, "feature_cache"))
+os.environ.setdefault("DECODED_CACHE_DIR", os.path.join(_STATE_DIR, "decoded_cache"))
+os.environ.setdefault("OVERVIEW_DIR", os.path.join(_STATE_DIR, "overviews"))
+
+SAMPLE_RATE = 22050
+
+def tone(frequency: float, seconds: float, sample_rate: int = SAMPLE_RATE, amplitude: float = 0.5) -> np.ndarray:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    return np.random.default_rng(0)
+
+@pytest.fixture(scope="session")
+def client():
+    """API client for the whole session: the app's shutdown stops the shared task manager"""
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+def wav_bytes(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    data = io.BytesIO()
+    sf.write(data, audio, sample_rate, format="WAV")
+    return data.getvalue()
+
+def analyze(client, audio: np.ndarray, chunk_duration: float = 1.0, feature_types: str = '["acoustic"]') -> str:
+    """Upload `audio` through /analyze and wait until every chunk is done; returns the task id"""
+    response = client.post(
+        "/api/v1/analyze",
+        files={"file": ("audio.wav", wav_bytes(audio), "audio/wav")},
+        data={"feature_types": feature_types, "chunk_duration": str(chunk_duration)}
+    )
+    assert response.status_code == 200, response.text
+    task_id = response.json()["task_id"]
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        chunks = client.get(f"/api/v1/status/{task_id}", params={"fields": "status"}).json()["chunks"]
+        if all(chunk["status"] != "PROCESSING" for chunk in chunks):
+            return task_id
+        time.sleep(0.1)
+    pytest.fail("Task did not finish")
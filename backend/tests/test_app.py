@@ -0,0 +1,18 @@
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+@pytest.mark.parametrize("module", ["app.main", "main"])
+def test_entrypoints_serve_the_same_api(module):
+    # Not entered as a context, so its shutdown does not stop the shared task manager
+    client = TestClient(importlib.import_module(module).app)
+    paths = client.get("/api/v1/openapi.json").json()["paths"]
+    assert {"/", "/api/v1/analyze", "/api/v1/status/{task_id}"} <= set(paths)
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert "audio_active_tasks" in response.text
+
+    cors = client.get("/", headers={"Origin": "http://localhost:5173"})
+    assert "ETag" in cors.headers["access-control-expose-headers"]
@@ -0,0 +1,83 @@
+import json
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.cli import batch
+from conftest import SAMPLE_RATE, tone
+
+ARGS = ["--features", "acoustic", "--chunk-duration", "0.5", "--workers", "1", "--format", "npz", "--rows-per-part", "3"]
+
+@pytest.fixture
+def recordings(tmp_path):
+    source = tmp_path / "recordings"
+    (source / "nested").mkdir(parents=True)
+    paths = []
+    for i, frequency in enumerate([150.0, 200.0, 250.0, 300.0]):
+        path = source / ("nested" if i % 2 else ".") / f"voice-{i}.wav"
+        sf.write(str(path), tone(frequency, 1.5), SAMPLE_RATE)
+        paths.append(os.path.normpath(str(path)))
+    (source / "broken.wav").write_bytes(b"RIFF" + b"\0" * 60)
+    (source / "notes.txt").write_text("not audio")
+    return str(source), sorted(paths)
+
+def read_checkpoint(output: str):
+    with open(os.path.join(output, batch.CHECKPOINT_FILE)) as f:
+        return [json.loads(line) for line in f]
+
+def read_parts(output: str):
+    parts = sorted(name for name in os.listdir(output) if name.startswith("part-"))
+    columns = [dict(np.load(os.path.join(output, name))) for name in parts]
+    return parts, {name: np.concatenate([part[name] for part in columns]) for name in columns[0]}
+
+def test_rerun_after_an_interruption_skips_finished_files(recordings, tmp_path, monkeypatch):
+    source, paths = recordings
+    output = str(tmp_path / "results")
+
+    # Interrupted right after the first part file (one file of three chunks) is checkpointed
+    write_part = batch.BatchRunner._write_part
+
+    def interrupted(self):
+        write_part(self)
+        if self.checkpoint.parts:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(batch.BatchRunner, "_write_part", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        batch.main([source, "--output", output, *ARGS])
+    first_run = [entry["file"] for entry in read_checkpoint(output) if entry["status"] == "done"]
+    assert len(first_run) == 1
+    monkeypatch.setattr(batch.BatchRunner, "_write_part", write_part)
+
+    analyzed = []
+    jobs = batch.BatchRunner._jobs
+
+    def recording_jobs(self, todo):
+        analyzed.extend(todo)
+        return jobs(self, todo)
+
+    monkeypatch.setattr(batch.BatchRunner, "_jobs", recording_jobs)
+    assert batch.main([source, "--output", output, *ARGS]) == 0
+    assert first_run[0] not in analyzed
+
+    entries = read_checkpoint(output)
+    assert sorted(entry["file"] for entry in entries if entry["status"] == "done") == paths
+    assert [entry["file"] for entry in entries if entry["status"] == "failed"] == [os.path.join(source, "broken.wav")]
+
+    # Every chunk of every file exactly once, across the parts of both runs
+    parts, columns = read_parts(output)
+    assert len(parts) == len(paths)
+    rows = sorted(zip(columns["path"].tolist(), columns["chunk_id"].tolist()))
+    assert rows == [(path, chunk_id) for path in paths for chunk_id in range(3)]
+    assert np.all(columns["acoustic.energy"] > 0)
+    assert not [name for name in os.listdir(output) if name.endswith(".tmp")]
+
+    # Nothing is left to do, and failed files are only retried on request
+    analyzed.clear()
+    batch.main([source, "--output", output, *ARGS])
+    assert analyzed == []
+    batch.main([source, "--output", output, *ARGS, "--retry-failed"])
+    assert analyzed == [os.path.join(source, "broken.wav")]
+    assert len(read_parts(output)[0]) == len(paths)
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from app.services.audio import task_manager as task_manager_module
+from app.services.audio.broadcast import ClientConnection, encode_message
+from app.services.audio.task_manager import AudioTaskManager
+
+class FakeWebSocket:
+    """Records sent payloads; a stalled socket never finishes a send"""
+
+    def __init__(self, stalled: bool = False):
+        self.sent = []
+        self.closed_with = None
+        self.stalled = stalled
+
+    async def send_text(self, payload: str):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.sent.append(payload)
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.closed_with = code
+
+@pytest.fixture
+def manager():
+    manager = AudioTaskManager()
+    yield manager
+    manager.shutdown()
+
+def test_updates_are_encoded_once_for_all_clients(manager, monkeypatch):
+    encoded = []
+
+    def counting_encode(message):
+        encoded.append(message)
+        return encode_message(message)
+
+    monkeypatch.setattr(task_manager_module, "encode_message", counting_encode)
+
+    async def main():
+        sockets = [FakeWebSocket() for _ in range(5)]
+        for websocket in sockets:
+            manager.register_client("task", websocket)
+        for version in range(1, 4):
+            manager._notify_clients("task", {"type": "chunk", "version": version})
+        await asyncio.sleep(0.01)
+        return sockets
+
+    sockets = asyncio.run(main())
+    assert len(encoded) == 3
+    for websocket in sockets:
+        assert [payload for payload in websocket.sent] == [encode_message({"type": "chunk", "version": v}) for v in (1, 2, 3)]
+    # Every client was handed the very same encoded payload
+    assert all(websocket.sent[0] is sockets[0].sent[0] for websocket in sockets)
+
+def test_slow_client_is_dropped_without_blocking_the_others(manager, monkeypatch):
+    monkeypatch.setattr(task_manager_module.settings, "WS_MAX_QUEUED_MESSAGES", 4)
+
+    async def main():
+        fast, slow = FakeWebSocket(), FakeWebSocket(stalled=True)
+        manager.register_client("task", fast)
+        manager.register_client("task", slow)
+        for version in range(1, 11):
+            manager._notify_clients("task", {"version": version})
+            # Give the fast client's sender a chance to drain between updates
+            await asyncio.sleep(0.001)
+        await asyncio.sleep(0.01)
+        return fast, slow
+
+    fast, slow = asyncio.run(main())
+    assert len(fast.sent) == 10
+    # Closed as too slow and unregistered; it reconnects with ?since= to catch up
+    assert slow.closed_with == 1013
+    assert list(manager.clients["task"]) == [fast]
+
+def test_stalled_send_times_out():
+    async def main():
+        websocket = FakeWebSocket(stalled=True)
+        dropped = []
+        connection = ClientConnection(websocket, max_queued=8, send_timeout=0.05, on_close=dropped.append)
+        assert connection.offer("update")
+        await asyncio.sleep(0.2)
+        return websocket, connection, dropped
+
+    websocket, connection, dropped = asyncio.run(main())
+    assert connection.closed and dropped == [connection]
+    assert websocket.closed_with == 1011
+    assert not connection.offer("later")
@@ -0,0 +1,90 @@
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from app.services.audio.decoded_cache import STALE_TEMP_SECONDS, DecodedAudioCache
+
+def temp_files(cache_dir) -> list:
+    return [name for name in os.listdir(cache_dir) if name.startswith(".")]
+
+def test_committed_samples_read_back(tmp_path, rng):
+    cache = DecodedAudioCache(str(tmp_path), max_bytes=1 << 20)
+    samples = rng.standard_normal(5000).astype(np.float32)
+    writer = cache.writer(16000, len(samples))
+    for start in range(0, len(samples), 1024):
+        writer.write(samples[start:start + 1024])
+
+    assert writer.commit("hash") == cache.path("hash", 16000)
+    cached = cache.get("hash", 16000)
+    np.testing.assert_array_equal(cached, samples)
+    assert not cached.flags.writeable
+    assert cache.get("hash", 22050) is None
+    assert cache.stats()["files"] == 1
+    assert temp_files(tmp_path) == []
+
+def test_short_decodes_are_trimmed_and_long_ones_dropped(tmp_path, rng):
+    cache = DecodedAudioCache(str(tmp_path), max_bytes=1 << 20)
+    samples = rng.standard_normal(3000).astype(np.float32)
+
+    # The header overestimated the length
+    writer = cache.writer(16000, 4000)
+    writer.write(samples)
+    writer.commit("short")
+    np.testing.assert_array_equal(cache.get("short", 16000), samples)
+
+    # The header underestimated it: nothing is cached
+    writer = cache.writer(16000, 2000)
+    writer.write(samples)
+    assert writer.failed
+    assert writer.commit("long") is None
+    assert cache.get("long", 16000) is None
+    assert temp_files(tmp_path) == []
+
+def test_least_recently_used_files_are_evicted(tmp_path):
+    size = 4000
+    cache = DecodedAudioCache(str(tmp_path), max_bytes=2 * size * 4 + 1024)
+
+    def add(content_hash: str):
+        writer = cache.writer(16000, size)
+        writer.write(np.zeros(size, dtype=np.float32))
+        return writer.commit(content_hash)
+
+    now = time.time()
+    os.utime(add("a"), (now - 200, now - 200))
+    os.utime(add("b"), (now - 100, now - 100))
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a", 16000) is not None
+    add("c")
+
+    assert cache.get("b", 16000) is None
+    assert cache.get("a", 16000) is not None and cache.get("c", 16000) is not None
+
+def test_starting_a_second_cache_keeps_writes_in_progress(tmp_path, rng):
+    cache = DecodedAudioCache(str(tmp_path), max_bytes=1 << 20)
+    samples = rng.standard_normal(2000).astype(np.float32)
+    writer = cache.writer(16000, 4000)
+    writer.write(samples)
+
+    # e.g. another server process starting on the same directory
+    other = DecodedAudioCache(str(tmp_path), max_bytes=1 << 20)
+    writer.commit("hash")
+    np.testing.assert_array_equal(other.get("hash", 16000), samples)
+
+def test_temp_files_of_dead_writers_are_removed(tmp_path):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    crashed = tmp_path / f".{dead.pid}-0123.tmp.npy"
+    crashed_trim = tmp_path / f".{dead.pid}-0123.tmp.npy.trim.npy"
+    live = tmp_path / f".{os.getppid()}-4567.tmp.npy"
+    unnamed_old = tmp_path / ".89ab.tmp.npy"
+    unnamed_recent = tmp_path / ".cdef.tmp.npy"
+    for path in (crashed, crashed_trim, live, unnamed_old, unnamed_recent):
+        path.write_bytes(b"")
+    old = time.time() - STALE_TEMP_SECONDS - 60
+    os.utime(unnamed_old, (old, old))
+
+    DecodedAudioCache(str(tmp_path), max_bytes=1 << 20)
+    assert sorted(temp_files(tmp_path)) == sorted([live.name, unnamed_recent.name])
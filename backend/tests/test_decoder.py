@@ -0,0 +1,67 @@
+import audioread
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.cli.batch import analyze_chunk_range
+from app.schemas.audio import AudioFeatureType
+from app.services.audio.decoder import AudioStreamReader
+from conftest import SAMPLE_RATE
+
+SOURCE_RATE = 44100
+
+@pytest.fixture
+def wav_path(tmp_path, rng) -> str:
+    t = np.arange(10 * SOURCE_RATE) / SOURCE_RATE
+    audio = 0.4 * np.sin(2 * np.pi * 220 * t) + 0.02 * rng.standard_normal(len(t))
+    path = str(tmp_path / "tone.wav")
+    sf.write(path, audio.astype(np.float32), SOURCE_RATE, subtype="PCM_16")
+    return path
+
+@pytest.fixture
+def audioread_opens(monkeypatch):
+    """Counts how often audioread decodes a file from its start"""
+    opens = []
+    original = audioread.audio_open
+
+    def counting_open(path, *args, **kwargs):
+        opens.append(path)
+        return original(path, *args, **kwargs)
+
+    monkeypatch.setattr(audioread, "audio_open", counting_open)
+    return opens
+
+def audioread_reader(path: str) -> AudioStreamReader:
+    # Pretending the container is aac makes the reader fall back to audioread, which reads WAV natively
+    reader = AudioStreamReader(path, audio_format="aac", target_rate=SAMPLE_RATE)
+    assert reader.backend == "audioread" and not reader.seekable
+    return reader
+
+def test_resampled_chunks_match_a_whole_file_resampling(wav_path):
+    reader = AudioStreamReader(wav_path, target_rate=SAMPLE_RATE)
+    assert reader.seekable
+    whole = np.concatenate([chunk for _, chunk in reader.iter_chunks(SAMPLE_RATE)])
+    assert len(whole) == reader.frames == 10 * SAMPLE_RATE
+
+    # Chunks after a skipped run come from a restarted stream that has settled by then
+    chunks = dict(reader.iter_chunks(SAMPLE_RATE, skip={1, 2, 5}))
+    assert sorted(chunks) == [0, 3, 4, 6, 7, 8, 9]
+    for index, chunk in chunks.items():
+        np.testing.assert_allclose(chunk, whole[index * SAMPLE_RATE:(index + 1) * SAMPLE_RATE], atol=1e-4)
+
+def test_audioread_sources_are_decoded_in_one_pass(wav_path, audioread_opens):
+    reader = audioread_reader(wav_path)
+    seekable = dict(AudioStreamReader(wav_path, target_rate=SAMPLE_RATE).iter_chunks(SAMPLE_RATE, skip={1, 2, 5}))
+    del audioread_opens[:]
+
+    chunks = dict(reader.iter_chunks(SAMPLE_RATE, skip={1, 2, 5}))
+    assert len(audioread_opens) == 1
+    assert sorted(chunks) == sorted(seekable)
+    for index, chunk in chunks.items():
+        np.testing.assert_allclose(chunk, seekable[index], atol=1e-4)
+
+def test_batch_job_extracts_in_batches(wav_path):
+    rows = analyze_chunk_range(wav_path, 2, 7, 1.0, [AudioFeatureType.ACOUSTIC], SAMPLE_RATE, batch_chunks=2)
+    assert [row[0] for row in rows] == [2, 3, 4, 5, 6]
+    assert [(row[1], row[2]) for row in rows] == [(i, i + 1.0) for i in range(2, 7)]
+    assert all("acoustic" in row[3] for row in rows)
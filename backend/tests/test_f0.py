@@ -0,0 +1,84 @@
+import librosa
+import numpy as np
+import pytest
+
+from app.schemas.audio import AudioFeatureType
+from app.services.audio.f0 import F0Tracker
+from app.services.audio.feature_extractor import FeatureExtractor
+from conftest import SAMPLE_RATE, tone
+
+def vibrato(center: float, depth: float, rate: float, seconds: float) -> np.ndarray:
+    """Harmonic tone whose F0 swings `depth` Hz around `center`"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = center + depth * np.sin(2 * np.pi * rate * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    return (0.3 * sum(np.sin(k * phase) / k for k in range(1, 5))).astype(np.float32)
+
+@pytest.mark.parametrize("frequency", [82.0, 110.0, 220.0, 440.0, 880.0])
+def test_tracks_pure_tones(frequency):
+    track = F0Tracker(SAMPLE_RATE).track(tone(frequency, 1.0))
+    # Edge frames are half padding
+    inner = track.f0[2:-2]
+    assert np.all(track.voiced[2:-2])
+    np.testing.assert_allclose(inner, frequency, rtol=0.005)
+    assert track.median() == pytest.approx(frequency, rel=0.002)
+
+def test_silence_and_noise_floor_are_unvoiced(rng):
+    tracker = F0Tracker(SAMPLE_RATE)
+    assert not tracker.track(np.zeros(SAMPLE_RATE, dtype=np.float32)).voiced.any()
+    quiet = (1e-5 * rng.standard_normal(SAMPLE_RATE)).astype(np.float32)
+    track = tracker.track(quiet)
+    assert not track.voiced.any()
+    assert (track.median(), track.std(), track.jitter()) == (0.0, 0.0, 0.0)
+
+def test_gap_between_tones_is_unvoiced():
+    gap = np.zeros(SAMPLE_RATE // 2, dtype=np.float32)
+    track = F0Tracker(SAMPLE_RATE).track(np.concatenate([tone(200, 0.5), gap, tone(200, 0.5)]))
+    in_gap = (track.times > 0.6) & (track.times < 0.9)
+    assert not track.voiced[in_gap].any()
+    assert track.voiced[(track.times > 0.1) & (track.times < 0.4)].all()
+
+def test_std_is_the_spread_of_f0_in_hz():
+    # A sinusoidal swing of depth d has a standard deviation of d / sqrt(2)
+    track = F0Tracker(SAMPLE_RATE).track(vibrato(200, 10, 1, 2.0))
+    assert track.std() == pytest.approx(10 / np.sqrt(2), rel=0.05)
+    assert F0Tracker(SAMPLE_RATE).track(tone(200, 2.0)).std() < 0.1
+
+def test_pitch_variability_is_the_f0_std_everywhere():
+    audio = vibrato(200, 10, 1, 2.0)
+    extractor = FeatureExtractor(sample_rate=SAMPLE_RATE)
+    # A steady tone is not speech; compare over the whole signal
+    extractor.skip_silence = False
+    expected = extractor.f0_tracker.track(audio).std()
+    features = extractor.extract_features(audio, [AudioFeatureType.PARALINGUISTIC])
+    assert features["paralinguistic"]["pitch_variability"] == pytest.approx(expected)
+    assert extractor._calculate_pitch_variability(audio) == pytest.approx(expected)
+
+def test_jitter_grows_with_period_perturbation():
+    tracker = F0Tracker(SAMPLE_RATE)
+    steady = tracker.track(tone(200, 2.0)).jitter()
+    wobbly = tracker.track(vibrato(200, 5, 5, 2.0)).jitter()
+    assert steady < 1e-3
+    # Adjacent frames are 23 ms apart: a 5 Hz swing of 2.5% moves the period
+    # about 1.2% per frame, a little less once averaged over a frame
+    assert 0.005 < wobbly < 0.015
+
+@pytest.mark.parametrize("center", [120.0, 250.0])
+def test_matches_librosa(center):
+    audio = vibrato(center, 8, 2, 2.0)
+    track = F0Tracker(SAMPLE_RATE, fmin=65, fmax=1000).track(audio)
+
+    yin = librosa.yin(audio, fmin=65, fmax=1000, sr=SAMPLE_RATE, frame_length=2048, hop_length=512)
+    assert len(yin) == len(track.f0)
+    # librosa's yin reports a value for every frame; compare where ours is voiced
+    inner = slice(2, -2)
+    assert track.voiced[inner].mean() > 0.95
+    voiced = track.voiced[inner]
+    np.testing.assert_allclose(track.f0[inner][voiced], yin[inner][voiced], rtol=0.01)
+
+    pyin, voiced, _ = librosa.pyin(audio, fmin=65, fmax=1000, sr=SAMPLE_RATE, frame_length=2048, hop_length=512)
+    both = track.voiced & voiced
+    assert both[inner].mean() > 0.9
+    # pYIN snaps to a 10-cent grid and smooths with its HMM
+    np.testing.assert_allclose(track.f0[both], pyin[both], rtol=0.02)
+    assert track.std() == pytest.approx(float(np.std(pyin[voiced])), rel=0.1)
@@ -0,0 +1,26 @@
+from app.services.audio.feature_cache import FeatureCache
+
+def test_overwriting_an_entry_counts_its_size_once(tmp_path):
+    cache = FeatureCache(str(tmp_path), memory_bytes=1 << 20, disk_bytes=1 << 20)
+    key = cache.key("hash", 5.0, 0, 22050, "acoustic")
+
+    cache.put_many([(key, {"value": "x" * 100})])
+    first = cache.stats()["disk_bytes"]
+    cache.put_many([(key, {"value": "x" * 100})])
+    assert cache.stats()["disk_bytes"] == first
+    cache.put_many([(key, {"value": "x" * 10})])
+    assert cache.stats()["disk_bytes"] == first - 90
+
+    # Matches what a fresh cache finds on disk
+    assert FeatureCache(str(tmp_path), 1 << 20, 1 << 20).stats()["disk_bytes"] == cache.stats()["disk_bytes"]
+
+def test_lookups_fall_back_to_disk(tmp_path):
+    cache = FeatureCache(str(tmp_path), memory_bytes=1 << 20, disk_bytes=1 << 20)
+    key = cache.key("hash", 5.0, 0, 22050, "acoustic")
+    cache.put_many([(key, {"energy": 0.5})])
+
+    reopened = FeatureCache(str(tmp_path), memory_bytes=1 << 20, disk_bytes=1 << 20)
+    assert reopened.get(key) == {"energy": 0.5}
+    assert reopened.get(cache.key("hash", 5.0, 1, 22050, "acoustic")) is None
+    stats = reopened.stats()
+    assert (stats["disk_hits"], stats["misses"]) == (1, 1)
@@ -0,0 +1,85 @@
+import io
+
+import numpy as np
+import pytest
+
+from app.schemas.audio import AudioFeatureType
+from app.services.audio.feature_table import FeatureTable, TaskFeatures, _DrainedBuffer, iter_table_bytes
+
+def acoustic(value: float, vot=None):
+    return {
+        "mfcc": [value] * 13,
+        "pitch": value,
+        "formants": [value, 2 * value],
+        "energy": value,
+        "zcr": value,
+        "spectral": {"centroid": value, "bandwidth": value, "flux": value, "rolloff": value},
+        "vot": vot
+    }
+
+@pytest.fixture
+def columns():
+    table = FeatureTable([AudioFeatureType.ACOUSTIC, AudioFeatureType.PARALINGUISTIC], capacity=1)
+    # Grows past its capacity; the second row has no paralinguistic group
+    table.append(0, 0.0, 5.0, {"acoustic": acoustic(0.1, vot=0.02), "paralinguistic": {"pitch_variability": 3.5}})
+    table.append(1, 5.0, 10.0, {"acoustic": acoustic(0.2)})
+    table.append(2, 10.0, 12.5, {"acoustic": acoustic(0.3)})
+    return table.columns()
+
+def test_rows_read_back_in_the_extractor_layout():
+    table = FeatureTable([AudioFeatureType.ACOUSTIC])
+    table.append(7, 0.0, 5.0, {"acoustic": acoustic(0.1)})
+    row = table.row(0)["acoustic"]
+    assert row["spectral"]["centroid"] == 0.1
+    assert row["formants"] == [0.1, 0.2]
+    assert row["vot"] is None
+
+def test_columns_hold_blocks_and_missing_values(columns):
+    assert columns["chunk_id"].tolist() == [0, 1, 2]
+    assert columns["acoustic.mfcc"].shape == (3, 13)
+    np.testing.assert_array_equal(np.isnan(columns["acoustic.formants"][:, 2]), True)
+    assert np.isnan(columns["acoustic.vot"][1:]).all()
+    assert np.isnan(columns["paralinguistic.pitch_variability"][1:]).all()
+
+def test_npz_round_trip_through_a_non_seekable_stream(columns):
+    assert not _DrainedBuffer().seekable()
+    data = b"".join(iter_table_bytes(columns, "npz"))
+    with np.load(io.BytesIO(data)) as loaded:
+        assert set(loaded.files) == set(columns)
+        for name, column in columns.items():
+            np.testing.assert_array_equal(loaded[name], column)
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_arrow_formats_round_trip(columns, format):
+    pa = pytest.importorskip("pyarrow")
+    data = b"".join(iter_table_bytes(columns, format, batch_rows=2))
+    if format == "parquet":
+        import pyarrow.parquet as pq
+        table = pq.read_table(pa.BufferReader(data))
+    else:
+        table = pa.ipc.open_stream(data).read_all()
+    assert table.num_rows == 3
+    for name, column in columns.items():
+        values = table.column(name)
+        if column.ndim == 2:
+            values = values.combine_chunks().flatten().to_numpy(zero_copy_only=False).reshape(column.shape)
+        else:
+            values = values.to_numpy()
+        np.testing.assert_array_equal(values, column)
+
+def test_unknown_format_is_rejected(columns):
+    with pytest.raises(ValueError):
+        next(iter_table_bytes(columns, "csv"))
+
+def test_task_features_add_transcripts_and_speech_ratio():
+    chunks = [type("Chunk", (), {"chunk_id": i, "start_time": i * 5.0, "end_time": (i + 1) * 5.0})() for i in range(3)]
+    features = TaskFeatures(chunks)
+    features.set(0, {"acoustic": acoustic(0.1), "transcription": "hello", "speech": {"ratio": 0.5, "regions": [[0, 2.5]]}})
+    features.set(2, {"transcription": "there"})
+
+    columns = features.columns(np.array([True, False, True]))
+    assert columns["chunk_id"].tolist() == [0, 2]
+    assert columns["transcription"].tolist() == ["hello", "there"]
+    assert columns["speech_ratio"][0] == 0.5 and np.isnan(columns["speech_ratio"][1])
+    assert features.get(0)["speech"]["ratio"] == 0.5
+    assert features.project(0, ["acoustic.energy", "transcription"]) == {"acoustic": {"energy": 0.1}, "transcription": "hello"}
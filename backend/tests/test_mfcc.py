@@ -0,0 +1,52 @@
+import librosa
+import numpy as np
+import pytest
+
+from app.schemas.audio import AudioFeatureType
+from app.services.audio.feature_extractor import FeatureExtractor
+from app.services.audio.mfcc import MFCCEngine, mel_basis
+from app.services.audio.stft import STFTEngine
+from conftest import SAMPLE_RATE, tone
+
+@pytest.fixture
+def speechlike(rng) -> np.ndarray:
+    # Harmonics with a moving fundamental over a noise floor
+    t = np.arange(2 * SAMPLE_RATE) / SAMPLE_RATE
+    f0 = 140 + 30 * np.sin(2 * np.pi * 1.5 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    harmonics = sum(np.sin(k * phase) / k for k in range(1, 8))
+    return (0.2 * harmonics + 0.01 * rng.standard_normal(len(t))).astype(np.float32)
+
+def test_mel_basis_matches_librosa():
+    expected = librosa.filters.mel(sr=SAMPLE_RATE, n_fft=2048, n_mels=128)
+    np.testing.assert_allclose(mel_basis(SAMPLE_RATE, 2048, 128), expected.T, rtol=1e-4, atol=1e-7)
+
+def test_mfcc_matches_librosa(speechlike):
+    engine = MFCCEngine(SAMPLE_RATE)
+    spectra = STFTEngine(SAMPLE_RATE).analyze(speechlike, engine.mel_basis)
+    expected = librosa.feature.mfcc(y=speechlike, sr=SAMPLE_RATE, n_mfcc=13)
+
+    coefficients = engine.mfcc(spectra.mel_power)
+    assert coefficients.shape == expected.T.shape
+    # Float32 frames against librosa's float64 pipeline: compare within a fraction of a dB
+    np.testing.assert_allclose(coefficients, expected.T, atol=0.05 * np.abs(expected).max())
+    np.testing.assert_allclose(engine.mfcc_means(spectra.mel_power), expected.mean(axis=1), atol=0.5)
+
+def test_stacked_chunks_match_single_chunks(speechlike):
+    engine = MFCCEngine(SAMPLE_RATE)
+    stft = STFTEngine(SAMPLE_RATE)
+    chunks = [speechlike, 0.1 * speechlike, tone(300, 2.0)]
+    mel_power = np.stack([stft.analyze(chunk, engine.mel_basis).mel_power for chunk in chunks])
+
+    stacked = engine.mfcc_means(mel_power)
+    for chunk_means, chunk_mel in zip(stacked, mel_power):
+        # The top_db clip is per chunk, so a quieter neighbour changes nothing
+        np.testing.assert_allclose(chunk_means, engine.mfcc_means(chunk_mel), rtol=1e-5, atol=1e-4)
+
+def test_batch_extraction_matches_single_extraction(speechlike):
+    extractor = FeatureExtractor(SAMPLE_RATE)
+    chunks = [speechlike, tone(300, 2.0), speechlike[:SAMPLE_RATE]]
+    batch = extractor.extract_features_batch(chunks, [AudioFeatureType.ACOUSTIC])
+    for chunk, features in zip(chunks, batch):
+        single = extractor.extract_features(chunk, [AudioFeatureType.ACOUSTIC])
+        np.testing.assert_allclose(features["acoustic"]["mfcc"], single["acoustic"]["mfcc"], rtol=1e-5, atol=1e-4)
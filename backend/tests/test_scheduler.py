@@ -0,0 +1,75 @@
+import asyncio
+
+from app.schemas.audio import TaskPriority
+from app.services.audio.scheduler import ChunkScheduler
+
+def test_tasks_in_a_lane_take_turns():
+    async def main():
+        scheduler = ChunkScheduler(max_in_flight=1)
+        order = []
+
+        async def task(task_id: str, chunks: int):
+            # Like a task runner: one job waiting at a time, released once its features are in
+            for _ in range(chunks):
+                await scheduler.acquire(task_id)
+                order.append(task_id)
+                await asyncio.sleep(0)
+                scheduler.release(task_id)
+
+        await asyncio.gather(task("long", 6), task("short", 3))
+        assert scheduler.stats()["in_flight"] == 0
+        return order
+
+    assert asyncio.run(main()) == ["long", "short"] * 3 + ["long"] * 3
+
+def test_high_priority_overtakes_waiting_normal_jobs():
+    async def main():
+        scheduler = ChunkScheduler(max_in_flight=1)
+        order = []
+        await scheduler.acquire("running")
+
+        async def job(task_id: str, priority: TaskPriority):
+            await scheduler.acquire(task_id, priority)
+            order.append(task_id)
+            scheduler.release(task_id)
+
+        jobs = [
+            asyncio.create_task(job("normal", TaskPriority.NORMAL)),
+            asyncio.create_task(job("low", TaskPriority.LOW)),
+        ]
+        await asyncio.sleep(0)
+        jobs.append(asyncio.create_task(job("high", TaskPriority.HIGH)))
+        await asyncio.sleep(0)
+        assert scheduler.stats()["waiting"] == {"high": 1, "normal": 1, "low": 1}
+
+        scheduler.release("running")
+        await asyncio.gather(*jobs)
+        return order
+
+    assert asyncio.run(main()) == ["high", "normal", "low"]
+
+def test_forget_returns_the_slots_of_a_cancelled_task():
+    async def main():
+        scheduler = ChunkScheduler(max_in_flight=2)
+        await scheduler.acquire("cancelled")
+        await scheduler.acquire("cancelled")
+
+        waiting = asyncio.create_task(scheduler.acquire("other"))
+        stuck = asyncio.create_task(scheduler.acquire("cancelled"))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+
+        # The task's waiting job is cancelled and its running jobs never release
+        stuck.cancel()
+        scheduler.forget("cancelled")
+        await asyncio.wait_for(waiting, 1)
+        assert stuck.cancelled()
+        assert scheduler.stats()["tasks"] == {"other": 1}
+
+        # A late release of a forgotten job does not free a slot twice
+        scheduler.release("cancelled")
+        assert scheduler.stats()["in_flight"] == 1
+        await asyncio.wait_for(scheduler.acquire("next"), 1)
+        assert scheduler.stats()["in_flight"] == 2
+
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from conftest import analyze, tone
+
+@pytest.fixture(scope="module")
+def task_id(client) -> str:
+    return analyze(client, np.concatenate([tone(150 + 50 * i, 1.0) for i in range(4)]))
+
+def test_status_is_documented_as_a_page(client):
+    operation = client.get("/api/v1/openapi.json").json()["paths"]["/api/v1/status/{task_id}"]["get"]
+    schema = operation["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema["$ref"].endswith("/AudioStatusPage")
+
+def test_pages_follow_the_cursor(client, task_id):
+    first = client.get(f"/api/v1/status/{task_id}", params={"limit": 3, "fields": "status,acoustic.energy"}).json()
+    assert [chunk["chunk_id"] for chunk in first["chunks"]] == [0, 1, 2]
+    assert set(first["chunks"][0]) == {"chunk_id", "status", "features"}
+    assert set(first["chunks"][0]["features"]["acoustic"]) == {"energy"}
+
+    second = client.get(f"/api/v1/status/{task_id}", params={"limit": 3, "cursor": first["next_cursor"]}).json()
+    assert [chunk["chunk_id"] for chunk in second["chunks"]] == [3]
+    assert second["next_cursor"] is None
+    assert second["chunks"][0]["features"]["acoustic"]["mfcc"]
+
+def test_every_chunk_completes(client, task_id):
+    chunks = client.get(f"/api/v1/status/{task_id}", params={"fields": "status"}).json()["chunks"]
+    assert [chunk["status"] for chunk in chunks] == ["COMPLETED"] * 4
+
+def test_etags_differ_between_pages_of_one_version(client, task_id):
+    url = f"/api/v1/status/{task_id}"
+    first = client.get(url, params={"limit": 2})
+    second = client.get(url, params={"limit": 2, "cursor": 1})
+    projected = client.get(url, params={"limit": 2, "fields": "status"})
+    assert len({first.headers["etag"], second.headers["etag"], projected.headers["etag"]}) == 3
+
+    # Each page revalidates against its own tag only
+    assert client.get(url, params={"limit": 2}, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+    # Fields given comma-separated or as repeated parameters name the same page
+    repeated = client.get(url, params=[("limit", 2), ("fields", "status"), ("fields", "error")])
+    assert client.get(url, params={"limit": 2, "fields": "status,error"}).headers["etag"] == repeated.headers["etag"]
+    stale = client.get(url, params={"limit": 2, "cursor": 1}, headers={"If-None-Match": first.headers["etag"]})
+    assert stale.status_code == 200
+    assert [chunk["chunk_id"] for chunk in stale.json()["chunks"]] == [2, 3]
@@ -0,0 +1,77 @@
+import threading
+
+import librosa
+import numpy as np
+import pytest
+
+from app.services.audio.stft import STFTEngine
+from conftest import SAMPLE_RATE, tone
+
+@pytest.fixture
+def signal(rng) -> np.ndarray:
+    # A chirp plus noise, so every descriptor changes from frame to frame
+    t = np.arange(3 * SAMPLE_RATE) / SAMPLE_RATE
+    chirp = np.sin(2 * np.pi * (200 + 600 * t) * t)
+    return (0.4 * chirp + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+
+def test_descriptors_match_librosa(signal):
+    engine = STFTEngine(SAMPLE_RATE, n_fft=2048, hop_length=512)
+    spectra = engine.analyze(signal)
+    magnitudes = np.abs(librosa.stft(signal, n_fft=2048, hop_length=512))
+
+    assert len(spectra.times) == magnitudes.shape[1]
+    np.testing.assert_allclose(spectra.mean_spectrum, magnitudes.mean(axis=1), rtol=1e-3, atol=1e-3)
+    centroid = librosa.feature.spectral_centroid(S=magnitudes, sr=SAMPLE_RATE)[0]
+    np.testing.assert_allclose(spectra.centroid, centroid, rtol=1e-3)
+    bandwidth = librosa.feature.spectral_bandwidth(S=magnitudes, sr=SAMPLE_RATE)[0]
+    np.testing.assert_allclose(spectra.bandwidth, bandwidth, rtol=1e-3)
+    rolloff = librosa.feature.spectral_rolloff(S=magnitudes, sr=SAMPLE_RATE)[0]
+    # Rolloff is a bin frequency; float32 cumulative sums may land one bin off
+    assert np.max(np.abs(spectra.rolloff - rolloff)) <= SAMPLE_RATE / 2048 + 1e-3
+
+def test_flux_of_first_frame_is_not_a_measurement(signal):
+    spectra = STFTEngine(SAMPLE_RATE).analyze(signal)
+    assert spectra.flux[0] == 0
+    assert np.all(spectra.flux[1:] > 0)
+
+def test_block_size_does_not_change_results(signal):
+    whole = STFTEngine(SAMPLE_RATE, block_frames=256).analyze(signal)
+    blocked = STFTEngine(SAMPLE_RATE, block_frames=7).analyze(signal)
+    for name in ("centroid", "bandwidth", "rolloff", "flux", "mean_spectrum"):
+        np.testing.assert_allclose(getattr(blocked, name), getattr(whole, name), rtol=1e-5, atol=1e-7)
+
+def test_mel_projection_uses_the_same_frames(signal):
+    engine = STFTEngine(SAMPLE_RATE)
+    basis = librosa.filters.mel(sr=SAMPLE_RATE, n_fft=2048).T.astype(np.float32)
+    spectra = engine.analyze(signal, basis)
+    expected = (np.abs(librosa.stft(signal, n_fft=2048, hop_length=512)) ** 2).T @ basis
+    np.testing.assert_allclose(spectra.mel_power, expected, rtol=1e-3, atol=1e-6)
+
+def test_engine_can_be_shared_between_threads():
+    engine = STFTEngine(SAMPLE_RATE, block_frames=4)
+    signals = [tone(frequency, 2.0) for frequency in (220, 440, 880, 1760)]
+    expected = [engine.analyze(signal).centroid for signal in signals]
+
+    results = [None] * len(signals)
+    barrier = threading.Barrier(len(signals))
+
+    def run(i):
+        barrier.wait()
+        for _ in range(5):
+            results[i] = engine.analyze(signals[i]).centroid
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(signals))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for result, reference in zip(results, expected):
+        np.testing.assert_array_equal(result, reference)
+
+def test_extractor_flux_mean_skips_first_frame(signal):
+    from app.services.audio.feature_extractor import FeatureExtractor
+
+    extractor = FeatureExtractor(SAMPLE_RATE)
+    analysis = extractor._analyze(signal, [])
+    flux = extractor._compute_spectral_features(analysis).flux
+    assert flux == pytest.approx(float(np.mean(analysis.frame_spectra.flux[1:])))
@@ -0,0 +1,112 @@
+import json
+
+import numpy as np
+import pytest
+
+from app.schemas.audio import AudioFeatureType
+from app.services.audio.streaming import PCMDecoder, StreamingFeatureExtractor
+
+STREAM_RATE = 16000
+FEATURES = [AudioFeatureType.ACOUSTIC, AudioFeatureType.PARALINGUISTIC]
+
+def voice(seconds: float, rng) -> np.ndarray:
+    t = np.arange(int(seconds * STREAM_RATE)) / STREAM_RATE
+    f0 = 150 + 20 * np.sin(2 * np.pi * 2 * t)
+    audio = 0.4 * np.sin(2 * np.pi * np.cumsum(f0) / STREAM_RATE) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+    return (audio + 0.02 * rng.standard_normal(len(t))).astype(np.float32)
+
+def pcm_s16(audio: np.ndarray, channels: int = 1) -> bytes:
+    samples = np.round(np.clip(audio, -1, 1) * 32767).astype("<i2")
+    return np.repeat(samples[:, None], channels, axis=1).tobytes()
+
+def fragments(data: bytes, rng):
+    """Splits `data` at random offsets, including odd ones inside a sample"""
+    cuts = np.sort(rng.choice(np.arange(1, len(data)), size=len(data) // 1500, replace=False))
+    return [data[start:stop] for start, stop in zip([0, *cuts], [*cuts, len(data)])]
+
+def run(extractor: StreamingFeatureExtractor, decoder: PCMDecoder, messages):
+    updates = []
+    for message in messages:
+        updates.extend(extractor.feed(decoder.decode(message)))
+    updates.append(extractor.flush())
+    return updates
+
+def test_decoder_carries_split_frames_over(rng):
+    data = pcm_s16(voice(0.5, rng), channels=2)
+    whole = PCMDecoder("pcm_s16le", 2).decode(data)
+
+    messages = fragments(data, rng)
+    assert any(len(message) % 4 for message in messages)
+    decoder = PCMDecoder("pcm_s16le", 2)
+    parts = [decoder.decode(message) for message in messages]
+    np.testing.assert_array_equal(np.concatenate(parts), whole)
+
+def test_updates_do_not_depend_on_message_sizes(rng):
+    data = pcm_s16(voice(3.0, rng), channels=2)
+
+    def extractor():
+        return StreamingFeatureExtractor(STREAM_RATE, FEATURES, window_seconds=1.0, emit_interval=0.25)
+
+    whole = run(extractor(), PCMDecoder("pcm_s16le", 2), [data])
+    split = run(extractor(), PCMDecoder("pcm_s16le", 2), fragments(data, rng))
+    assert len(whole) > 4
+    assert split == whole
+
+def test_zero_crossings_on_hop_boundaries_are_counted():
+    hop = 512
+    # The sign flips exactly between hops, never inside one
+    audio = np.repeat(np.tile([0.5, -0.5], 40), hop).astype(np.float32)
+    extractor = StreamingFeatureExtractor(STREAM_RATE, [AudioFeatureType.ACOUSTIC], window_seconds=1.0, emit_interval=60.0, hop_length=hop)
+    extractor.feed(audio)
+
+    update = extractor.flush()
+    frames = extractor.window_frames
+    # Every frame in the window starts with a crossing from the previous hop
+    assert update["features"]["acoustic"]["zcr"] == pytest.approx(frames / (2 * frames * hop))
+
+def test_running_totals_match_the_window_after_it_wraps(rng):
+    audio = voice(3.0, rng)
+    extractor = StreamingFeatureExtractor(STREAM_RATE, FEATURES, window_seconds=0.5, emit_interval=60.0)
+    extractor.feed(audio)
+    hop = extractor.hop_length
+    frames = len(audio) // hop
+    assert frames > 3 * extractor.window_frames
+
+    np.testing.assert_allclose(extractor._stat_totals, extractor._stats.sum(axis=0), rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(extractor._spectrum_total, extractor._spectra.sum(axis=0), rtol=1e-5, atol=1e-3)
+
+    # Recomputed from the samples of the frames still in the window
+    window = audio[(frames - extractor.window_frames) * hop:frames * hop]
+    update = extractor.flush()
+    acoustic = update["features"]["acoustic"]
+    assert acoustic["energy"] == pytest.approx(np.sqrt(np.mean(window.astype(np.float64) ** 2)), rel=1e-6)
+    negative = np.signbit(audio[(frames - extractor.window_frames) * hop - 1:frames * hop])
+    assert acoustic["zcr"] == pytest.approx(np.count_nonzero(negative[1:] != negative[:-1]) / (2 * len(window)))
+    assert update["end_time"] - update["start_time"] == pytest.approx(0.5, abs=hop / STREAM_RATE)
+
+def test_stream_websocket(client, rng):
+    data = pcm_s16(voice(3.0, rng))
+    url = f"/api/v1/ws/stream?sample_rate={STREAM_RATE}&feature_types=acoustic"
+
+    with client.websocket_connect(url) as ws:
+        ready = json.loads(ws.receive_text())
+        assert ready["type"] == "ready"
+
+        for start in range(0, len(data), 6001):
+            ws.send_bytes(data[start:start + 6001])
+        ws.send_text(json.dumps({"type": "end"}))
+
+        messages = []
+        while True:
+            message = ws.receive()
+            if message["type"] == "websocket.close":
+                break
+            messages.append(json.loads(message["text"]))
+
+    assert all(message["type"] == "features" for message in messages)
+    # Updates every emit interval, then the remainder on "end"
+    hops = len(data) // 2 // 512
+    emit_frames = round(ready["emit_interval"] * STREAM_RATE / 512)
+    assert len(messages) == hops // emit_frames + 1
+    assert messages[-1]["end_time"] == pytest.approx(hops * 512 / STREAM_RATE)
+    assert set(messages[0]["features"]) == {"acoustic"}
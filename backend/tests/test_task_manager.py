@@ -0,0 +1,105 @@
+import asyncio
+import functools
+import os
+import threading
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from app.schemas.audio import AudioFeatureType, ChunkStatus
+from app.services.audio import task_manager as task_manager_module
+from app.services.audio.decoded_cache import DecodedAudioWriter
+from app.services.audio.task_manager import AudioTaskManager
+from conftest import SAMPLE_RATE
+
+def dies_once(marker: str, function, *args):
+    """Kills the worker process on its first call (across processes), then runs `function`"""
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    return function(*args)
+
+@pytest.fixture
+def manager():
+    manager = AudioTaskManager()
+    yield manager
+    manager.shutdown()
+
+@pytest.fixture
+def wav_path(tmp_path, rng) -> str:
+    t = np.arange(3 * SAMPLE_RATE) / SAMPLE_RATE
+    audio = 0.3 * np.sin(2 * np.pi * 180 * t) + 0.05 * rng.standard_normal(len(t))
+    path = str(tmp_path / "speech.wav")
+    sf.write(path, audio.astype(np.float32), SAMPLE_RATE)
+    return path
+
+def run_task(manager: AudioTaskManager, path: str, **options):
+    async def main():
+        task_id = await manager.create_task(path, [AudioFeatureType.ACOUSTIC], chunk_duration=1.0, **options)
+        await manager._runners[task_id]
+        return manager.task_response(task_id)
+    return asyncio.run(main())
+
+def test_chunks_complete_after_a_worker_dies(manager, wav_path, tmp_path, monkeypatch):
+    marker = str(tmp_path / "worker-died")
+    for name in ("extract_chunk_features", "extract_mapped_chunk_features"):
+        real = getattr(task_manager_module, name)
+        monkeypatch.setattr(task_manager_module, name, functools.partial(dies_once, marker, real))
+
+    task = run_task(manager, wav_path)
+    assert os.path.exists(marker)
+    assert [chunk.status for chunk in task.chunks] == [ChunkStatus.COMPLETED] * 3
+    assert all(chunk.features.acoustic is not None for chunk in task.chunks)
+
+def test_feature_columns_cover_completed_chunks(manager, wav_path):
+    task = run_task(manager, wav_path)
+    columns = manager.feature_columns(task.task_id)
+    assert columns["chunk_id"].tolist() == [0, 1, 2]
+    np.testing.assert_allclose(columns["acoustic.energy"], [chunk.features.acoustic.energy for chunk in task.chunks])
+    assert manager.feature_columns("unknown") is None
+
+def test_overview_is_written_off_the_event_loop(manager, wav_path, monkeypatch):
+    threads = []
+    finished = manager.overview_store.finished
+
+    def recording_finished(*args):
+        threads.append(threading.current_thread())
+        return finished(*args)
+
+    monkeypatch.setattr(manager.overview_store, "finished", recording_finished)
+    task = run_task(manager, wav_path)
+    assert threads and threads[0] is not threading.main_thread()
+    assert task.task_id not in manager.overviews
+    overview = manager.get_overview(task.task_id)
+    assert overview is not None and overview.complete
+
+def test_evicted_tasks_are_no_longer_tracked_by_the_store(manager, wav_path, monkeypatch):
+    monkeypatch.setattr(task_manager_module.settings, "TASK_CACHE_SIZE", 0)
+    task = run_task(manager, wav_path)
+    manager.store.close()
+
+    # Evicted as soon as it is persisted, and a reload from the store is tracked only until evicted again
+    manager._evict_recent_tasks()
+    assert task.task_id not in manager.recent_tasks
+    assert task.task_id not in manager.store.persisted_versions
+    assert manager.get_task_status(task.task_id).version == task.version
+    assert task.task_id not in manager.store.persisted_versions
+
+def test_failing_to_cache_decoded_audio_still_finishes_the_task(wav_path, tmp_path, monkeypatch):
+    # Fresh caches, so the file is decoded and recorded
+    monkeypatch.setattr(task_manager_module.settings, "DECODED_CACHE_DIR", str(tmp_path / "decoded"))
+    monkeypatch.setattr(task_manager_module.settings, "FEATURE_CACHE_DIR", str(tmp_path / "features"))
+
+    def vanished(self, content_hash):
+        raise FileNotFoundError("temporary file removed")
+
+    monkeypatch.setattr(DecodedAudioWriter, "commit", vanished)
+    manager = AudioTaskManager()
+    try:
+        task = run_task(manager, wav_path)
+        assert [chunk.status for chunk in task.chunks] == [ChunkStatus.COMPLETED] * 3
+        assert task.task_id not in manager.tasks and task.task_id not in manager.overviews
+        assert os.listdir(tmp_path / "decoded") == []
+    finally:
+        manager.shutdown()
@@ -0,0 +1,89 @@
+import time
+
+from app.schemas.audio import AudioAnalysisResponse, AudioChunk, AudioFeatures, ChunkStatus
+from app.services.audio.task_store import TaskStore
+
+def make_task(task_id: str, total_chunks: int = 3) -> AudioAnalysisResponse:
+    return AudioAnalysisResponse(
+        task_id=task_id,
+        total_chunks=total_chunks,
+        chunks=[
+            AudioChunk(chunk_id=i, start_time=float(i), end_time=i + 1.0, status=ChunkStatus.PROCESSING)
+            for i in range(total_chunks)
+        ]
+    )
+
+def complete(task: AudioAnalysisResponse, chunk_id: int, text: str) -> AudioChunk:
+    task.version += 1
+    chunk = task.chunks[chunk_id]
+    chunk.status = ChunkStatus.COMPLETED
+    chunk.features = AudioFeatures(transcription=text)
+    chunk.version = task.version
+    return chunk
+
+def wait_persisted(store: TaskStore, task: AudioAnalysisResponse, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not store.is_persisted(task):
+        assert time.monotonic() < deadline, "writer did not commit the task"
+        time.sleep(0.01)
+
+def test_saved_task_loads_back(tmp_path):
+    store = TaskStore(f"sqlite:///{tmp_path / 'tasks.db'}", flush_interval=0.01)
+    task = make_task("a")
+    store.save_task(task)
+    for chunk_id in range(3):
+        chunk = complete(task, chunk_id, f"chunk {chunk_id}")
+        store.save_chunk("a", task.version, chunk)
+    wait_persisted(store, task)
+
+    loaded = store.load_task("a")
+    assert loaded == task
+    assert store.load_task("missing") is None
+    store.close()
+
+def test_processing_chunks_fail_after_a_restart(tmp_path):
+    url = f"sqlite:///{tmp_path / 'tasks.db'}"
+    store = TaskStore(url, flush_interval=0.01)
+    task = make_task("a")
+    store.save_task(task)
+    chunk = complete(task, 0, "hello")
+    store.save_chunk("a", task.version, chunk)
+    store.close()
+
+    restarted = TaskStore(url)
+    loaded = restarted.load_task("a")
+    assert loaded.version == task.version
+    assert loaded.chunks[0] == task.chunks[0]
+    assert [chunk.status for chunk in loaded.chunks[1:]] == [ChunkStatus.FAILED] * 2
+    assert all(chunk.error == "Interrupted by server restart" for chunk in loaded.chunks[1:])
+    # What was read back is known to be committed
+    assert restarted.is_persisted(loaded)
+    restarted.close()
+
+def test_pending_writes_are_flushed_on_close(tmp_path):
+    url = f"sqlite:///{tmp_path / 'tasks.db'}"
+    # Nothing would be written for a minute unless close() flushes the batch
+    store = TaskStore(url, batch_size=10_000, flush_interval=60.0)
+    task = make_task("a", total_chunks=50)
+    store.save_task(task)
+    for chunk_id in range(50):
+        chunk = complete(task, chunk_id, f"chunk {chunk_id}")
+        store.save_chunk("a", task.version, chunk)
+    store.close()
+
+    assert store.is_persisted(task)
+    loaded = TaskStore(url).load_task("a")
+    assert loaded.version == 50
+    assert [chunk.status for chunk in loaded.chunks] == [ChunkStatus.COMPLETED] * 50
+
+def test_forget_drops_the_persisted_version(tmp_path):
+    store = TaskStore(f"sqlite:///{tmp_path / 'tasks.db'}", flush_interval=0.01)
+    task = make_task("a")
+    store.save_task(task)
+    wait_persisted(store, task)
+
+    store.forget("a")
+    assert "a" not in store.persisted_versions
+    assert not store.is_persisted(task)
+    store.forget("a")
+    store.close()
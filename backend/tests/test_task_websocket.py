@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from conftest import analyze, tone
+
+@pytest.fixture(scope="module")
+def task_id(client) -> str:
+    return analyze(client, np.concatenate([tone(300 + 40 * i, 1.0) for i in range(4)]))
+
+def test_new_clients_get_a_snapshot(client, task_id):
+    with client.websocket_connect(f"/api/v1/ws/{task_id}") as ws:
+        message = ws.receive_json()
+    assert message["type"] == "snapshot"
+    assert message["version"] == 4
+    assert len(message["task"]["chunks"]) == 4
+
+def test_reconnecting_clients_get_the_chunks_they_missed(client, task_id):
+    with client.websocket_connect(f"/api/v1/ws/{task_id}?since=2") as ws:
+        message = ws.receive_json()
+    assert message["type"] == "patch"
+    assert message["version"] == 4
+    assert sorted(chunk["version"] for chunk in message["chunks"]) == [3, 4]
+    assert all(chunk["features"]["acoustic"] for chunk in message["chunks"])
+
+def test_resync_answers_with_a_patch(client, task_id):
+    with client.websocket_connect(f"/api/v1/ws/{task_id}") as ws:
+        assert ws.receive_json()["type"] == "snapshot"
+        ws.send_json({"type": "resync", "since": 3})
+        patch = ws.receive_json()
+        # A version the server never had means starting over
+        ws.send_json({"type": "resync", "since": 99})
+        snapshot = ws.receive_json()
+    assert patch["type"] == "patch" and [chunk["version"] for chunk in patch["chunks"]] == [4]
+    assert snapshot["type"] == "snapshot"
+
+def test_unknown_tasks_are_closed(client):
+    from starlette.websockets import WebSocketDisconnect
+    with client.websocket_connect("/api/v1/ws/no-such-task") as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == 4004
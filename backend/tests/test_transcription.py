@@ -0,0 +1,115 @@
+import asyncio
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from app.services.audio import transcription
+from app.services.audio.transcription import TranscriptionBatcher, WHISPER_SAMPLE_RATE, transcribe_batch
+
+class FakeBatch(list):
+    def to(self, device):
+        return self
+
+@pytest.fixture
+def fake_whisper(monkeypatch):
+    """Whisper and torch stand-ins: each window "transcribes" to its first sample value"""
+    torch = types.ModuleType("torch")
+    torch.Tensor = type("Tensor", (), {})
+    torch.from_numpy = lambda array: array
+    torch.stack = FakeBatch
+    window = WHISPER_SAMPLE_RATE * transcription.WHISPER_WINDOW_SECONDS
+    decoded = []
+
+    def decode(model, mels, options):
+        decoded.append(len(mels))
+        return [types.SimpleNamespace(text=f" {mel[0]:g} " if mel[0] else "") for mel in mels]
+
+    whisper = types.ModuleType("whisper")
+    whisper.pad_or_trim = lambda audio: np.pad(audio, (0, window - len(audio)))
+    whisper.log_mel_spectrogram = lambda audio, n_mels: audio
+    whisper.DecodingOptions = lambda **options: options
+    whisper.decode = decode
+    model = types.SimpleNamespace(
+        dims=types.SimpleNamespace(n_mels=80),
+        is_multilingual=False,
+        device=types.SimpleNamespace(type="cpu")
+    )
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    monkeypatch.setitem(sys.modules, "whisper", whisper)
+    monkeypatch.setattr(transcription, "get_whisper_model", lambda name: model)
+    return decoded
+
+def windows(*values: float, seconds: float = 30) -> np.ndarray:
+    """16 kHz audio whose consecutive 30 second windows are constant at `values`"""
+    return np.concatenate([
+        np.full(int(seconds * WHISPER_SAMPLE_RATE), value, dtype=np.float32) for value in values
+    ])
+
+def test_windows_of_all_chunks_are_decoded_together(fake_whisper):
+    chunks = [
+        (windows(1, 2, 3), WHISPER_SAMPLE_RATE),
+        (windows(4, seconds=5), WHISPER_SAMPLE_RATE),
+        # Silent windows decode to nothing and are dropped from the text
+        (windows(0, 5), WHISPER_SAMPLE_RATE)
+    ]
+    assert transcribe_batch(chunks) == ["1 2 3", "4", "5"]
+    assert fake_whisper == [6]
+
+def test_chunks_are_resampled_to_16k(fake_whisper):
+    # 45 s at 22.05 kHz are 720000 samples at 16 kHz: two windows
+    audio = np.full(22050 * 45, 0.5, dtype=np.float32)
+    [text] = transcribe_batch([(audio, 22050)])
+    # The resampling filter ramps up at the edges
+    assert [float(part) for part in text.split()] == pytest.approx([0.5, 0.5], abs=0.1)
+    assert fake_whisper == [2]
+
+class RecordingBatches:
+    """Stands in for `transcribe_batch`, answering each chunk with its length"""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, chunks, model_name=None):
+        self.batches.append([len(audio) for audio, _ in chunks])
+        return [str(len(audio)) for audio, _ in chunks]
+
+def run_batcher(batcher: TranscriptionBatcher, lengths, spacing: float = 0.0):
+    async def main():
+        async def request(length, delay):
+            await asyncio.sleep(delay)
+            return await batcher.transcribe(np.zeros(length, dtype=np.float32), WHISPER_SAMPLE_RATE)
+        try:
+            return await asyncio.gather(*(request(length, i * spacing) for i, length in enumerate(lengths)))
+        finally:
+            batcher.shutdown()
+    return asyncio.run(main())
+
+def test_full_batches_are_sent_at_once(monkeypatch):
+    recorder = RecordingBatches()
+    monkeypatch.setattr(transcription, "transcribe_batch", recorder)
+    batcher = TranscriptionBatcher(batch_size=3, max_delay=60.0, workers=1)
+
+    texts = run_batcher(batcher, [10, 20, 30, 40, 50, 60])
+    assert texts == ["10", "20", "30", "40", "50", "60"]
+    assert recorder.batches == [[10, 20, 30], [40, 50, 60]]
+
+def test_partial_batch_is_sent_after_the_delay(monkeypatch):
+    recorder = RecordingBatches()
+    monkeypatch.setattr(transcription, "transcribe_batch", recorder)
+    batcher = TranscriptionBatcher(batch_size=4, max_delay=0.3, workers=1)
+
+    # Two requests within the delay share a batch; the third starts a new one
+    texts = run_batcher(batcher, [1, 2, 3], spacing=0.2)
+    assert texts == ["1", "2", "3"]
+    assert recorder.batches == [[1, 2], [3]]
+
+def test_errors_reach_every_request_of_the_batch(monkeypatch):
+    def failing(chunks, model_name=None):
+        raise RuntimeError("model failed")
+
+    monkeypatch.setattr(transcription, "transcribe_batch", failing)
+    batcher = TranscriptionBatcher(batch_size=2, max_delay=60.0, workers=1)
+    with pytest.raises(RuntimeError, match="model failed"):
+        run_batcher(batcher, [1, 2])
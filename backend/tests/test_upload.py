@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import os
+
+import pytest
+
+from app.api.v1 import audio as audio_api
+from app.services.audio.upload import GrowingFile, UploadSink
+from conftest import tone, wav_bytes
+
+def test_reads_block_until_the_bytes_arrive(tmp_path):
+    async def main():
+        sink = UploadSink(str(tmp_path / "upload"))
+        await sink.open()
+        await sink.write(b"a" * 10)
+        reader = GrowingFile(sink)
+
+        read = asyncio.create_task(asyncio.to_thread(reader.read, 25))
+        await asyncio.sleep(0.05)
+        assert not read.done()
+
+        await sink.write(b"b" * 20)
+        data = await asyncio.wait_for(read, 5)
+        reader.close()
+        await sink.finish()
+        return data
+
+    assert asyncio.run(main()) == b"a" * 10 + b"b" * 15
+
+def test_reads_stop_at_the_end_of_a_finished_upload(tmp_path):
+    async def main():
+        sink = UploadSink(str(tmp_path / "upload"))
+        await sink.open()
+        await sink.write(b"x" * 10)
+        reader = GrowingFile(sink)
+
+        # Seeking from the end waits for the final size when it was not announced
+        seek = asyncio.create_task(asyncio.to_thread(reader.seek, -4, os.SEEK_END))
+        await asyncio.sleep(0.05)
+        assert not seek.done()
+        await sink.write(b"y" * 6)
+        await sink.finish()
+        assert await asyncio.wait_for(seek, 5) == 12
+
+        tail = await asyncio.to_thread(reader.read)
+        reader.seek(0)
+        everything = await asyncio.to_thread(reader.read, 100)
+        reader.close()
+        return sink, tail, everything
+
+    sink, tail, everything = asyncio.run(main())
+    assert tail == b"yyyy"
+    assert everything == b"x" * 10 + b"y" * 6
+    # A finished upload never blocks, however many bytes are asked for
+    assert sink.wait_for(1000) == 16
+    assert sink.content_hash == hashlib.sha256(everything).hexdigest()
+
+def test_waiting_readers_see_an_aborted_upload(tmp_path):
+    async def main():
+        sink = UploadSink(str(tmp_path / "upload"), expected_size=100)
+        await sink.open()
+        await sink.write(b"x" * 10)
+        assert sink.wait_for(5) == 10
+
+        waiting = asyncio.create_task(asyncio.to_thread(sink.wait_for, 50))
+        await asyncio.sleep(0.05)
+        await sink.abort(ConnectionError("client went away"))
+        with pytest.raises(IOError, match="client went away"):
+            await asyncio.wait_for(waiting, 5)
+
+    asyncio.run(main())
+
+def test_streamed_and_buffered_uploads_hash_alike(client, monkeypatch):
+    body = wav_bytes(tone(220.0, 2.0))
+    hashes = []
+    create_task = audio_api.task_manager.create_task
+
+    async def recording_create_task(*args, **kwargs):
+        task_id = await create_task(*args, **kwargs)
+        upload = kwargs.get("upload")
+        if upload is not None:
+            await upload.wait_finished()
+            hashes.append(upload.content_hash)
+        else:
+            hashes.append(kwargs["content_hash"])
+        return task_id
+
+    monkeypatch.setattr(audio_api.task_manager, "create_task", recording_create_task)
+
+    response = client.post(
+        "/api/v1/analyze",
+        files={"file": ("tone.wav", body, "audio/wav")},
+        data={"feature_types": '["acoustic"]', "chunk_duration": "1.0"}
+    )
+    assert response.status_code == 200
+
+    def blocks():
+        # Odd sizes, so the header and the samples arrive split
+        for start in range(0, len(body), 4093):
+            yield body[start:start + 4093]
+
+    response = client.post(
+        "/api/v1/analyze/stream",
+        params={"feature_types": "acoustic", "chunk_duration": 1.0, "filename": "tone.wav"},
+        content=blocks()
+    )
+    assert response.status_code == 200
+    assert hashes == [hashlib.sha256(body).hexdigest()] * 2
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from app.services.audio.vad import (
+    VoiceActivityDetector, pause_aligned_chunks, speech_activity, speech_samples
+)
+from conftest import SAMPLE_RATE
+
+def voiced(seconds: float, f0: float = 150.0) -> np.ndarray:
+    """Harmonic, speech-like sound (low spectral flatness)"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (0.3 * sum(np.sin(2 * np.pi * k * f0 * t) / k for k in range(1, 6))).astype(np.float32)
+
+def pause(seconds: float, rng) -> np.ndarray:
+    return (1e-4 * rng.standard_normal(int(seconds * SAMPLE_RATE))).astype(np.float32)
+
+def seconds(samples) -> np.ndarray:
+    return np.asarray(samples) / SAMPLE_RATE
+
+@pytest.fixture
+def detector() -> VoiceActivityDetector:
+    return VoiceActivityDetector(SAMPLE_RATE)
+
+def test_speech_regions_are_found_between_pauses(detector, rng):
+    # Speech at 0.5-1.5 s and 2.5-3.5 s
+    audio = np.concatenate([pause(0.5, rng), voiced(1.0), pause(1.0, rng), voiced(1.0), pause(0.5, rng)])
+    regions = seconds(detector.detect(audio))
+    # Padded by 0.1 s on each side, to the 20 ms frame grid
+    np.testing.assert_allclose(regions, [[0.4, 1.6], [2.4, 3.6]], atol=0.03)
+
+    activity = speech_activity(detector.detect(audio), SAMPLE_RATE, len(audio))
+    assert activity["ratio"] == pytest.approx(2.4 / 4.0, abs=0.02)
+    assert len(speech_samples(audio, detector.detect(audio))) == pytest.approx(2.4 * SAMPLE_RATE, rel=0.02)
+
+def test_silence_and_loud_noise_are_not_speech(detector, rng):
+    assert len(detector.detect(np.zeros(SAMPLE_RATE, dtype=np.float32))) == 0
+    noise = (0.3 * rng.standard_normal(2 * SAMPLE_RATE)).astype(np.float32)
+    assert len(detector.detect(noise)) == 0
+    assert len(speech_samples(noise, detector.detect(noise))) == 0
+
+def test_short_pauses_are_bridged_and_short_bursts_dropped(detector, rng):
+    # A 0.1 s gap (below min_silence) and a 40 ms click (below min_speech)
+    audio = np.concatenate([
+        pause(0.5, rng), voiced(0.6), pause(0.1, rng), voiced(0.6), pause(1.0, rng), voiced(0.04), pause(1.0, rng)
+    ])
+    regions = seconds(detector.detect(audio))
+    np.testing.assert_allclose(regions, [[0.4, 1.9]], atol=0.03)
+
+def test_find_pause_picks_the_middle_of_the_longest_gap(detector, rng):
+    audio = np.concatenate([voiced(0.5), pause(0.2, rng), voiced(0.5), pause(0.6, rng), voiced(0.5)])
+    assert seconds(detector.find_pause(audio)) == pytest.approx(1.2 + 0.3, abs=0.03)
+
+def test_chunk_boundaries_move_into_pauses(detector, rng):
+    # Nominal 2 s boundaries fall inside speech; pauses are at 2.1-2.4 s and 4.1-4.4 s
+    audio = np.concatenate([
+        voiced(2.1), pause(0.3, rng), voiced(1.7), pause(0.3, rng), voiced(1.3)
+    ])
+    chunk_size = 2 * SAMPLE_RATE
+    fixed = [(i, audio[i * chunk_size:(i + 1) * chunk_size]) for i in range(int(np.ceil(len(audio) / chunk_size)))]
+    bounds = {}
+    aligned = list(pause_aligned_chunks(iter(fixed), chunk_size, SAMPLE_RATE // 2, detector, bounds))
+
+    assert [index for index, _, _ in aligned] == [0, 1, 2]
+    np.testing.assert_array_equal(np.concatenate([samples for _, _, samples in aligned]), audio)
+    cuts = seconds([start for _, start, _ in aligned[1:]])
+    np.testing.assert_allclose(cuts, [2.25, 4.25], atol=0.03)
+    assert [bounds[i] for i in range(3)] == [(start, start + len(samples)) for _, start, samples in aligned]
+
+def test_tolerance_is_clamped_to_a_quarter_chunk(detector, rng):
+    # Pauses far from the nominal boundaries, beyond a quarter chunk
+    audio = np.concatenate([voiced(1.2), pause(0.4, rng), voiced(2.4), pause(0.4, rng), voiced(1.6)])
+    chunk_size = 2 * SAMPLE_RATE
+    fixed = [(i, audio[i * chunk_size:(i + 1) * chunk_size]) for i in range(int(np.ceil(len(audio) / chunk_size)))]
+    aligned = list(pause_aligned_chunks(iter(fixed), chunk_size, 10 * chunk_size, detector))
+
+    assert len(aligned) == len(fixed)
+    for index, start, samples in aligned:
+        assert len(samples) > 0
+        if index > 0:
+            assert abs(start - index * chunk_size) <= chunk_size // 4
+    np.testing.assert_array_equal(np.concatenate([samples for _, _, samples in aligned]), audio)
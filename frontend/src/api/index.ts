@@ -1,5 +1,13 @@
 import axios from 'axios'
-import { AudioFeatureType, AudioAnalysisResponse } from '../types'
+import { AudioFeatureType } from '../types'
+import {
+  AudioAnalysisResponse,
+  AudioAnalysisStatusPage,
+  AudioOverview,
+  OverviewColumns,
+  OverviewKind,
+  StatusQuery,
+} from '../types/index'
 
 const API_BASE_URL = 'http://localhost:8000/api/v1'
 
@@ -56,8 +64,9 @@ export const analyzeAudio = async (
   }
 }
 
-export const connectToWebSocket = (taskId: string): WebSocket => {
-  const ws = new WebSocket(`ws://localhost:8000/api/v1/ws/${taskId}`)
+export const connectToWebSocket = (taskId: string, since: number = 0): WebSocket => {
+  // `since` lets a reconnecting client receive only the chunks it missed
+  const ws = new WebSocket(`ws://localhost:8000/api/v1/ws/${taskId}?since=${since}`)
   
   ws.onopen = () => {
     console.log('WebSocket connected')
@@ -74,12 +83,41 @@ export const connectToWebSocket = (taskId: string): WebSocket => {
   return ws
 }
 
-export const getTaskStatus = async (taskId: string): Promise<AudioAnalysisResponse> => {
+export const getTaskStatus = async (taskId: string, query: StatusQuery = {}): Promise<AudioAnalysisStatusPage> => {
   try {
-    const response = await api.get<AudioAnalysisResponse>(`/status/${taskId}`)
+    // The browser revalidates with the ETag, so unchanged polls are answered with 304
+    const { fields, ...params } = query
+    const response = await api.get<AudioAnalysisStatusPage>(`/status/${taskId}`, {
+      params: fields ? { ...params, fields: fields.join(',') } : params
+    })
     return response.data
   } catch (error: any) {
     console.error('Error getting task status:', error.response?.data || error.message)
     throw new Error('Failed to get analysis status. Please try again.');
   }
-} 
\ No newline at end of file
+} 
+export const getOverview = async (taskId: string): Promise<AudioOverview> => {
+  const response = await api.get<AudioOverview>(`/tasks/${taskId}/overview`)
+  return response.data
+}
+
+// Only the columns between `start` and `end` seconds, at the level closest to `width` columns
+export const getOverviewColumns = async (
+  taskId: string,
+  kind: OverviewKind,
+  start: number,
+  end: number,
+  width: number
+): Promise<OverviewColumns> => {
+  const response = await api.get<ArrayBuffer>(`/tasks/${taskId}/overview/${kind}`, {
+    params: { start, end, width: Math.max(1, Math.round(width)) },
+    responseType: 'arraybuffer',
+  })
+  const headers = response.headers
+  return {
+    level: Number(headers['x-level']),
+    firstColumn: Number(headers['x-first-column']),
+    secondsPerColumn: Number(headers['x-seconds-per-column']),
+    data: kind === 'waveform' ? new Int8Array(response.data) : new Uint8Array(response.data),
+  }
+}
@@ -86,6 +86,12 @@ export const AnalysisResults = ({ results }: AnalysisResultsProps) => {
           variant: 'subtle',
           children: 'Failed'
         };
+      case ChunkStatus.CANCELLED:
+        return {
+          colorScheme: 'orange',
+          variant: 'subtle',
+          children: 'Cancelled'
+        };
       default:
         return {
           colorScheme: 'gray',
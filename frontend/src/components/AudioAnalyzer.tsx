@@ -16,6 +16,7 @@ import { FeatureSelector } from './FeatureSelector'
 import { AudioVisualizer } from './AudioVisualizer'
 import { AnalysisResults } from './AnalysisResults'
 import { AudioFeatureType, ChunkStatus } from '../types'
+import { AudioAnalysisResponse, AudioChunk, TaskUpdateMessage } from '../types/index'
 import { analyzeAudio, connectToWebSocket } from '../api'
 
 export const AudioAnalyzer = () => {
@@ -58,20 +59,69 @@ export const AudioAnalyzer = () => {
 
   useEffect(() => {
     if (taskId) {
-      const ws = connectToWebSocket(taskId)
-      
-      ws.onmessage = (event) => {
-        const data = JSON.parse(event.data)
-        setResults(data)
-        
-        // Calculate progress
-        const completed = data.chunks.filter(
-          (chunk: any) => chunk.status === ChunkStatus.COMPLETED
-        ).length
-        setProgress((completed / data.total_chunks) * 100)
+      let current: AudioAnalysisResponse | null = null
+      let ws: WebSocket
+      let closed = false
+      // A resync was requested and its patch has not arrived yet
+      let resyncPending = false
+
+      const applyChunks = (task: AudioAnalysisResponse, chunks: AudioChunk[], version: number) => {
+        const updated = task.chunks.slice()
+        chunks.forEach((chunk) => {
+          updated[chunk.chunk_id] = chunk
+        })
+        return { ...task, chunks: updated, version }
       }
 
+      const connect = () => {
+        ws = connectToWebSocket(taskId, current?.version ?? 0)
+        resyncPending = false
+
+        ws.onmessage = (event) => {
+          const message: TaskUpdateMessage = JSON.parse(event.data)
+
+          if (message.type === 'snapshot') {
+            current = message.task
+            resyncPending = false
+          } else if (!current || message.version <= current.version) {
+            // Stale or duplicate update
+            return
+          } else if (message.type === 'patch') {
+            current = applyChunks(current, message.chunks, message.version)
+            resyncPending = false
+          } else if (message.version === current.version + 1) {
+            current = applyChunks(current, [message.chunk], message.version)
+          } else {
+            // Missed an update: ask the server once for everything after our version;
+            // chunk messages until its patch arrives are covered by it
+            if (!resyncPending) {
+              resyncPending = true
+              ws.send(JSON.stringify({ type: 'resync', since: current.version }))
+            }
+            return
+          }
+
+          setResults(current)
+
+          // Calculate progress
+          const completed = current.chunks.filter(
+            (chunk) => chunk.status === ChunkStatus.COMPLETED
+          ).length
+          setProgress((completed / current.total_chunks) * 100)
+        }
+
+        ws.onclose = () => {
+          const finished = current?.chunks.every((chunk) => chunk.status !== ChunkStatus.PROCESSING)
+          if (!closed && !finished) {
+            setTimeout(connect, 1000)
+          }
+        }
+      }
+
+      connect()
+
       return () => {
+        closed = true
         ws.close()
       }
     }
@@ -148,6 +198,7 @@ export const AudioAnalyzer = () => {
                       <Box>
                         <AudioVisualizer
                           file={file}
+                          taskId={taskId}
                           results={results}
                           progress={progress}
                         />
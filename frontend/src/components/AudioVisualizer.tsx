@@ -1,55 +1,255 @@
-import { useEffect, useRef, useState } from 'react'
+import { useEffect, useRef, useState, type MouseEvent as ReactMouseEvent } from 'react'
 import { Box, IconButton, HStack, Text } from '@chakra-ui/react'
-import { FiPlay, FiPause } from 'react-icons/fi'
-import WaveSurfer from 'wavesurfer.js'
+import { FiPlay, FiPause, FiZoomIn, FiZoomOut, FiMaximize2 } from 'react-icons/fi'
+import { AudioOverview, OverviewColumns } from '../types/index'
+import { getOverview, getOverviewColumns } from '../api'
 
 interface AudioVisualizerProps {
   file: File
+  taskId: string | null
   results: any
   progress: number
 }
 
-export const AudioVisualizer = ({ file, results, progress }: AudioVisualizerProps) => {
+const WAVEFORM_HEIGHT = 100
+const SPECTROGRAM_HEIGHT = 96
+const MIN_VIEW_SECONDS = 0.05
+const ZOOM_STEP = 1.5
+// Overview levels are polled until every chunk has been decoded
+const OVERVIEW_POLL_MS = 2000
+
+// Dark blue through purple to yellow, indexed by the spectrogram byte value
+const PALETTE = (() => {
+  const stops = [[8, 16, 64], [92, 28, 120], [200, 60, 80], [250, 170, 40], [252, 252, 160]]
+  const palette = new Uint8ClampedArray(256 * 4)
+  for (let value = 0; value < 256; value++) {
+    const position = (value / 255) * (stops.length - 1)
+    const index = Math.min(Math.floor(position), stops.length - 2)
+    const weight = position - index
+    for (let channel = 0; channel < 3; channel++) {
+      palette[value * 4 + channel] = stops[index][channel] * (1 - weight) + stops[index + 1][channel] * weight
+    }
+    palette[value * 4 + 3] = 255
+  }
+  return palette
+})()
+
+export const AudioVisualizer = ({ file, taskId }: AudioVisualizerProps) => {
   const containerRef = useRef<HTMLDivElement>(null)
-  const wavesurferRef = useRef<WaveSurfer | null>(null)
+  const waveformRef = useRef<HTMLCanvasElement>(null)
+  const spectrogramRef = useRef<HTMLCanvasElement>(null)
+  const audioRef = useRef<HTMLAudioElement | null>(null)
+  const [overview, setOverview] = useState<AudioOverview | null>(null)
+  // Visible time range in seconds
+  const [view, setView] = useState<[number, number] | null>(null)
+  const [width, setWidth] = useState(0)
+  const [waveform, setWaveform] = useState<OverviewColumns | null>(null)
+  const [spectrogram, setSpectrogram] = useState<OverviewColumns | null>(null)
   const [isPlaying, setIsPlaying] = useState(false)
   const [currentTime, setCurrentTime] = useState(0)
 
+  // Play the local file as is; the waveform comes from the server, so nothing is decoded here
   useEffect(() => {
-    if (containerRef.current && file) {
-      // Initialize WaveSurfer
-      const wavesurfer = WaveSurfer.create({
-        container: containerRef.current,
-        waveColor: '#3182ce',
-        progressColor: '#2b6cb0',
-        cursorColor: '#2c5282',
-        height: 100,
-        normalize: true,
-        responsive: true,
-      })
-
-      // Load audio file
-      wavesurfer.loadBlob(file)
-
-      // Add event listeners
-      wavesurfer.on('play', () => setIsPlaying(true))
-      wavesurfer.on('pause', () => setIsPlaying(false))
-      wavesurfer.on('audioprocess', (time) => setCurrentTime(time))
-
-      wavesurferRef.current = wavesurfer
-
-      return () => {
-        wavesurfer.destroy()
-      }
+    const url = URL.createObjectURL(file)
+    const audio = new Audio(url)
+    audio.addEventListener('play', () => setIsPlaying(true))
+    audio.addEventListener('pause', () => setIsPlaying(false))
+    audio.addEventListener('timeupdate', () => setCurrentTime(audio.currentTime))
+    audioRef.current = audio
+
+    return () => {
+      audio.pause()
+      audioRef.current = null
+      URL.revokeObjectURL(url)
     }
   }, [file])
 
+  useEffect(() => {
+    const container = containerRef.current
+    if (!container) return
+    const observer = new ResizeObserver(([entry]) => setWidth(Math.floor(entry.contentRect.width)))
+    observer.observe(container)
+    return () => observer.disconnect()
+  }, [])
+
+  useEffect(() => {
+    setOverview(null)
+    setView(null)
+    setWaveform(null)
+    setSpectrogram(null)
+    if (!taskId) return
+
+    let cancelled = false
+    let timer: number | undefined
+    const load = async () => {
+      try {
+        const next = await getOverview(taskId)
+        if (cancelled) return
+        setOverview(next)
+        setView((current) => current ?? [0, next.duration])
+        if (!next.complete) {
+          timer = window.setTimeout(load, OVERVIEW_POLL_MS)
+        }
+      } catch (error) {
+        // The task may not have been created yet
+        if (!cancelled) {
+          timer = window.setTimeout(load, OVERVIEW_POLL_MS)
+        }
+      }
+    }
+    load()
+
+    return () => {
+      cancelled = true
+      window.clearTimeout(timer)
+    }
+  }, [taskId])
+
+  // Fetch only the visible columns, at about one column per pixel
+  useEffect(() => {
+    if (!taskId || !overview || !view || width === 0) return
+    let cancelled = false
+    const [start, end] = view
+    // Wait for zooming to settle before fetching
+    const timer = window.setTimeout(() => {
+      Promise.all([
+        getOverviewColumns(taskId, 'waveform', start, end, width),
+        getOverviewColumns(taskId, 'spectrogram', start, end, width),
+      ])
+        .then(([nextWaveform, nextSpectrogram]) => {
+          if (!cancelled) {
+            setWaveform(nextWaveform)
+            setSpectrogram(nextSpectrogram)
+          }
+        })
+        .catch((error) => console.error('Error loading overview columns:', error))
+    }, 100)
+
+    return () => {
+      cancelled = true
+      window.clearTimeout(timer)
+    }
+  }, [taskId, overview, view, width])
+
+  useEffect(() => {
+    const canvas = waveformRef.current
+    const context = canvas?.getContext('2d')
+    if (!canvas || !context || width === 0) return
+    canvas.width = width
+    canvas.height = WAVEFORM_HEIGHT
+    context.clearRect(0, 0, width, WAVEFORM_HEIGHT)
+    if (!view) return
+
+    const [start, end] = view
+    const secondsPerPixel = (end - start) / width
+    const middle = WAVEFORM_HEIGHT / 2
+    if (waveform) {
+      const { data, firstColumn, secondsPerColumn } = waveform
+      // Normalize to the loudest visible column
+      let peak = 1
+      for (let i = 0; i < data.length; i++) {
+        peak = Math.max(peak, Math.abs(data[i]))
+      }
+      const columnWidth = Math.max(1, secondsPerColumn / secondsPerPixel)
+      context.fillStyle = '#3182ce'
+      for (let column = 0; column < data.length / 2; column++) {
+        const min = data[column * 2]
+        const max = data[column * 2 + 1]
+        // Not decoded yet
+        if (min > max) continue
+        const x = ((firstColumn + column) * secondsPerColumn - start) / secondsPerPixel
+        const top = middle - (max / peak) * middle
+        const bottom = middle - (min / peak) * middle
+        context.fillRect(x, top, columnWidth, Math.max(1, bottom - top))
+      }
+    }
+
+    context.fillStyle = '#2c5282'
+    context.fillRect((currentTime - start) / secondsPerPixel, 0, 1, WAVEFORM_HEIGHT)
+  }, [waveform, view, width, currentTime])
+
+  useEffect(() => {
+    const canvas = spectrogramRef.current
+    const context = canvas?.getContext('2d')
+    if (!canvas || !context || width === 0) return
+    canvas.width = width
+    canvas.height = SPECTROGRAM_HEIGHT
+    context.clearRect(0, 0, width, SPECTROGRAM_HEIGHT)
+    if (!view || !overview || !spectrogram) return
+
+    const bands = overview.mel_bands
+    const columns = spectrogram.data.length / bands
+    if (columns === 0) return
+    // One pixel per column and band, low frequencies at the bottom, then scaled onto the canvas
+    const image = new ImageData(columns, bands)
+    for (let column = 0; column < columns; column++) {
+      for (let band = 0; band < bands; band++) {
+        const value = spectrogram.data[column * bands + band]
+        const offset = ((bands - 1 - band) * columns + column) * 4
+        image.data.set(PALETTE.subarray(value * 4, value * 4 + 4), offset)
+      }
+    }
+    const tile = document.createElement('canvas')
+    tile.width = columns
+    tile.height = bands
+    tile.getContext('2d')?.putImageData(image, 0, 0)
+
+    const [start, end] = view
+    const secondsPerPixel = (end - start) / width
+    const { firstColumn, secondsPerColumn } = spectrogram
+    context.drawImage(
+      tile,
+      (firstColumn * secondsPerColumn - start) / secondsPerPixel,
+      0,
+      (columns * secondsPerColumn) / secondsPerPixel,
+      SPECTROGRAM_HEIGHT
+    )
+  }, [spectrogram, overview, view, width])
+
+  const zoom = (factor: number, center?: number) => {
+    if (!view || !overview) return
+    const [start, end] = view
+    const span = Math.min(Math.max((end - start) * factor, MIN_VIEW_SECONDS), overview.duration)
+    const focus = center ?? (start + end) / 2
+    const nextStart = Math.min(Math.max(focus - (focus - start) * (span / (end - start)), 0), overview.duration - span)
+    setView([nextStart, nextStart + span])
+  }
+
+  // Wheel zooms around the pointer, shift+wheel pans; registered natively so the page does not scroll
+  useEffect(() => {
+    const container = containerRef.current
+    if (!container || !view || !overview) return
+    const onWheel = (event: WheelEvent) => {
+      event.preventDefault()
+      const [start, end] = view
+      const pointer = start + ((event.offsetX || 0) / Math.max(width, 1)) * (end - start)
+      if (event.shiftKey) {
+        const shift = (Math.sign(event.deltaY) * (end - start)) / 10
+        const nextStart = Math.min(Math.max(start + shift, 0), overview.duration - (end - start))
+        setView([nextStart, nextStart + (end - start)])
+      } else {
+        zoom(event.deltaY > 0 ? ZOOM_STEP : 1 / ZOOM_STEP, pointer)
+      }
+    }
+    container.addEventListener('wheel', onWheel, { passive: false })
+    return () => container.removeEventListener('wheel', onWheel)
+  })
+
+  const seek = (event: ReactMouseEvent<HTMLDivElement>) => {
+    const audio = audioRef.current
+    if (!audio || !view || width === 0) return
+    const [start, end] = view
+    const x = event.clientX - event.currentTarget.getBoundingClientRect().left
+    audio.currentTime = start + (x / width) * (end - start)
+    setCurrentTime(audio.currentTime)
+  }
+
   const togglePlayPause = () => {
-    if (wavesurferRef.current) {
+    if (audioRef.current) {
       if (isPlaying) {
-        wavesurferRef.current.pause()
+        audioRef.current.pause()
       } else {
-        wavesurferRef.current.play()
+        audioRef.current.play()
       }
     }
   }
@@ -62,8 +262,26 @@ export const AudioVisualizer = ({ file, results, progress }: AudioVisualizerProp
 
   return (
     <Box mt={6}>
-      <Box ref={containerRef} />
+      <Box ref={containerRef} cursor="pointer" onClick={seek}>
+        <canvas ref={waveformRef} style={{ display: 'block', width: '100%', height: WAVEFORM_HEIGHT }} />
+        <canvas
+          ref={spectrogramRef}
+          style={{ display: 'block', width: '100%', height: SPECTROGRAM_HEIGHT, marginTop: 4 }}
+        />
+      </Box>
+      {!overview && (
+        <Text mt={2} fontSize="sm" color="gray.500" textAlign="center">
+          The waveform appears once analysis has started
+        </Text>
+      )}
       <HStack mt={4} spacing={4} justify="center">
+        <IconButton
+          aria-label="Zoom out"
+          icon={<FiZoomOut />}
+          onClick={() => zoom(ZOOM_STEP)}
+          isDisabled={!overview}
+          variant="ghost"
+        />
         <IconButton
           aria-label={isPlaying ? 'Pause' : 'Play'}
           icon={isPlaying ? <FiPause /> : <FiPlay />}
@@ -72,10 +290,24 @@ export const AudioVisualizer = ({ file, results, progress }: AudioVisualizerProp
           size="lg"
           isRound
         />
+        <IconButton
+          aria-label="Zoom in"
+          icon={<FiZoomIn />}
+          onClick={() => zoom(1 / ZOOM_STEP)}
+          isDisabled={!overview}
+          variant="ghost"
+        />
+        <IconButton
+          aria-label="Show all"
+          icon={<FiMaximize2 />}
+          onClick={() => overview && setView([0, overview.duration])}
+          isDisabled={!overview}
+          variant="ghost"
+        />
         <Text color="gray.600">
           {formatTime(currentTime)}
         </Text>
       </HStack>
     </Box>
   )
-} 
\ No newline at end of file
+}
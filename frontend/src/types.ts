@@ -8,7 +8,8 @@ export enum ChunkStatus {
   PENDING = "PENDING",
   PROCESSING = "PROCESSING",
   COMPLETED = "COMPLETED",
-  FAILED = "FAILED"
+  FAILED = "FAILED",
+  CANCELLED = "CANCELLED"
 }
 
 // ... rest of the types ... 
\ No newline at end of file
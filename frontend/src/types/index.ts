@@ -9,6 +9,7 @@ export enum ChunkStatus {
   PROCESSING = "PROCESSING",
   COMPLETED = "COMPLETED",
   FAILED = "FAILED",
+  CANCELLED = "CANCELLED",
 }
 
 export interface AcousticFeatures {
@@ -34,6 +35,12 @@ export interface ParalinguisticFeatures {
   hnr: number;
 }
 
+// Present when the server skips silence; regions are [start, end] seconds from the chunk start
+export interface SpeechActivity {
+  ratio: number;
+  regions: [number, number][];
+}
+
 export interface AudioChunk {
   chunk_id: number;
   start_time: number;
@@ -42,12 +49,63 @@ export interface AudioChunk {
   features?: {
     acoustic?: AcousticFeatures;
     paralinguistic?: ParalinguisticFeatures;
+    transcription?: string;
+    speech?: SpeechActivity;
   };
   error?: string;
+  version: number;
 }
 
 export interface AudioAnalysisResponse {
   task_id: string;
   total_chunks: number;
   chunks: AudioChunk[];
-} 
\ No newline at end of file
+  version: number;
+}
+
+// GET /status with `limit`, `since` or `fields`; projected chunks only carry the requested fields
+export interface StatusQuery {
+  since?: number;
+  cursor?: number;
+  offset?: number;
+  limit?: number;
+  fields?: string[];
+}
+
+export interface AudioAnalysisStatusPage extends AudioAnalysisResponse {
+  next_cursor: number | null;
+}
+
+// GET /tasks/{task_id}/overview: zoom levels of the waveform and spectrogram overview
+export interface OverviewLevel {
+  level: number;
+  seconds_per_column: number;
+  columns: number;
+}
+
+export interface AudioOverview {
+  sample_rate: number;
+  duration: number;
+  complete: boolean;
+  mel_bands: number;
+  min_db: number;
+  max_db: number;
+  waveform: OverviewLevel[];
+  spectrogram: OverviewLevel[];
+}
+
+export type OverviewKind = 'waveform' | 'spectrogram'
+
+// Raw columns of one level: int8 (min, max) pairs for the waveform, mel_bands bytes per spectrogram column
+export interface OverviewColumns {
+  level: number;
+  firstColumn: number;
+  secondsPerColumn: number;
+  data: Int8Array | Uint8Array;
+}
+
+// Messages sent on /ws/{task_id}
+export type TaskUpdateMessage =
+  | { type: 'snapshot'; version: number; task: AudioAnalysisResponse }
+  | { type: 'chunk'; version: number; chunk: AudioChunk }
+  | { type: 'patch'; version: number; chunks: AudioChunk[] } 
\ No newline at end of file